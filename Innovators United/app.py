@@ -1,12 +1,32 @@
-﻿from flask import Flask, request, jsonify, render_template, session, redirect, url_for
-import json
+﻿from flask import (Flask, request, jsonify, render_template, session, redirect, url_for, Response, send_file, g,
+                   before_render_template, template_rendered)
+import gzip
 import os
+import time
 from datetime import datetime, timedelta
+from functools import wraps
 import secrets
 import re
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from itertools import chain
+from archive import ProjectArchive
+from assets import AssetManifest
+from events import EventLog
+from exports import (EXPORT_FORMATS, PROJECT_EXPORT_FIELDS, USER_EXPORT_FIELDS, parse_date_range,
+                     record_filter, stream_export)
+from idempotency import IdempotencyError, IdempotencyStore
+from ids import new_id
+from invoices import INVOICE_FORMATS, InvoiceRenderer
+from listing import ProjectListing
+from metrics import registry as metrics
+from notifications import EmailOutbox
+from owners import ProjectOwners
+from pricing import PricingEngine
+from profiling import RequestProfiler
+from search import ProjectSearchIndex
+from stats import ProjectStats
+from storage import open_store
+from uploads import UploadError, UploadStore
+from users import UserDirectory
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'dev-secret-key-12345')
@@ -16,17 +36,101 @@ ADMIN_USERNAME = "admin"
 ADMIN_PASSWORD = "ABPPS12345"
 
 # Email configuration (for notifications)
-SMTP_SERVER = "smtp.gmail.com"
-SMTP_PORT = 587
+# Point these at a local debugging SMTP server (and SMTP_USE_TLS=0) in tests
+SMTP_SERVER = os.environ.get('SMTP_SERVER', "smtp.gmail.com")
+SMTP_PORT = int(os.environ.get('SMTP_PORT', 587))
+SMTP_USE_TLS = os.environ.get('SMTP_USE_TLS', '1') != '0'
 EMAIL_ADDRESS = os.environ.get('EMAIL_ADDRESS', "pratikpreetam1714@gmail.com")
 EMAIL_PASSWORD = os.environ.get('EMAIL_PASSWORD', "your-app-password")
+OUTBOX_DIR = os.environ.get('OUTBOX_DIR', 'outbox')
+
+# Shared by all workers so /api/events sees changes made by any of them
+EVENTS_FILE = os.environ.get('EVENTS_FILE', 'events.log')
 
 # Load projects from JSON file
 PROJECTS_FILE = "projects.json"
 USERS_FILE = "users.json"
+ATTACHMENTS_FILE = "attachments.json"
+
+# Uploaded files, stored once per distinct content
+UPLOAD_DIR = os.environ.get('UPLOAD_DIR', 'uploads')
+MAX_UPLOAD_SIZE = int(os.environ.get('MAX_UPLOAD_SIZE', 500 << 20))
+
+# Rendered bills, cached by a hash of what they show; batches render in a process pool
+INVOICE_DIR = os.environ.get('INVOICE_DIR', 'invoices')
+INVOICE_WORKERS = int(os.environ.get('INVOICE_WORKERS', 2))
+INVOICE_CACHE_FILES = int(os.environ.get('INVOICE_CACHE_FILES', 5000))
+INVOICE_BATCH_LIMIT = 1000
+
+# Finished, fully paid projects older than this move to monthly cold files
+ARCHIVE_DIR = os.environ.get('ARCHIVE_DIR', 'archive')
+ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', 90))
+
+# Responses to recent Idempotency-Key requests, so a retried submission is replayed
+IDEMPOTENCY_DIR = os.environ.get('IDEMPOTENCY_DIR', 'idempotency')
+IDEMPOTENCY_TTL = int(os.environ.get('IDEMPOTENCY_TTL', 24 * 3600))
+
+# Each worker writes its metrics here and /metrics adds them up across workers;
+# set METRICS_TOKEN to require it as a bearer token on scrapes
+METRICS_DIR = os.environ.get('METRICS_DIR', 'metrics')
+METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', 5))
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+# JSON responses at least this big are gzipped for clients that accept it
+JSON_GZIP_MIN_BYTES = int(os.environ.get('JSON_GZIP_MIN_BYTES', 1024))
+JSON_GZIP_LEVEL = 6
+GZIP_ETAG_SUFFIX = '-gzip'
+
+# Fingerprinted, precompressed copies of static/, built at startup
+ASSET_DIR = os.environ.get('ASSET_DIR', 'assets')
+
+# Requests sampled by the admin profiling toggle; only the newest PROFILE_KEEP are kept
+PROFILE_DIR = os.environ.get('PROFILE_DIR', 'profiles')
+PROFILE_KEEP = int(os.environ.get('PROFILE_KEEP', 200))
+
+# Admin bulk updates: statuses offered in the dashboard and the most operations per request
+PROJECT_STATUSES = ('pending', 'in-progress', 'completed', 'delivered')
+BULK_OPERATION_LIMIT = 500
+
+# Pricing rules ship with the app; compiled into a lookup table once at startup
+PRICING_FILE = os.environ.get('PRICING_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pricing.json'))
+QUOTE_BATCH_LIMIT = 100
+pricing = PricingEngine.from_file(PRICING_FILE)
+assets = AssetManifest(app.static_folder, ASSET_DIR)
+
+# Parsed copies of the data files, re-read only when another worker changes them
+projects_store = open_store(PROJECTS_FILE)
+users_store = open_store(USERS_FILE)
+# The archive index keeps edit counts and stats whole after projects go cold
+project_archive = ProjectArchive(ARCHIVE_DIR)
+archived_owners = project_archive.index.add_index(ProjectOwners())
+archived_stats = project_archive.index.add_index(ProjectStats())
+user_directory = users_store.add_index(UserDirectory())
+project_owners = projects_store.add_index(ProjectOwners())
+project_stats = projects_store.add_index(ProjectStats(archived=archived_stats))
+project_search = projects_store.add_index(ProjectSearchIndex())
+project_listing = projects_store.add_index(ProjectListing(search=project_search))
+attachments_store = open_store(ATTACHMENTS_FILE)
+uploads = UploadStore(UPLOAD_DIR, attachments_store, max_size=MAX_UPLOAD_SIZE)
+idempotency_keys = IdempotencyStore(IDEMPOTENCY_DIR, ttl=IDEMPOTENCY_TTL)
+profiler = RequestProfiler(PROFILE_DIR, max_profiles=PROFILE_KEEP)
+invoices = InvoiceRenderer(INVOICE_DIR, os.path.join(app.root_path, 'templates'), max_workers=INVOICE_WORKERS,
+                           max_files=INVOICE_CACHE_FILES)
+
+# Notification emails are queued on disk and sent by a background thread
+outbox = EmailOutbox(OUTBOX_DIR, SMTP_SERVER, SMTP_PORT, EMAIL_ADDRESS, EMAIL_PASSWORD, use_tls=SMTP_USE_TLS)
+
+event_log = EventLog(EVENTS_FILE)
+
+# Started by the web process only: under `python app.py` the invoice pool's
+# processes import this file again as __mp_main__, and must stay inert there
+if __name__ != '__mp_main__':
+    assets.build()
+    outbox.start()
+    metrics.start(METRICS_DIR, METRICS_FLUSH_INTERVAL)
 
 def send_notification_email(project_data):
-    """Send email notification when new project is submitted"""
+    """Queue email notification when new project is submitted"""
     try:
         # Email content
         subject = f"New Project Submitted - {project_data['websiteName']}"
@@ -53,57 +157,38 @@ def send_notification_email(project_data):
         Please check the admin dashboard for more details.
         """
         
-        # Create message
-        msg = MIMEMultipart()
-        msg['From'] = EMAIL_ADDRESS
-        msg['To'] = EMAIL_ADDRESS  # Send to yourself
-        msg['Subject'] = subject
-        msg.attach(MIMEText(body, 'plain'))
-        
-        # Send email
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
-        text = msg.as_string()
-        server.sendmail(EMAIL_ADDRESS, EMAIL_ADDRESS, text)
-        server.quit()
-        
-        print("✅ Notification email sent successfully")
+        # Send to yourself; the outbox worker delivers it with retries
+        outbox.enqueue(EMAIL_ADDRESS, subject, body)
+        
+        print("📨 Notification email queued")
         return True
     except Exception as e:
-        print(f"❌ Error sending email: {e}")
+        print(f"❌ Error queueing email: {e}")
         return False
 
 def load_projects():
-    if os.path.exists(PROJECTS_FILE):
-        try:
-            with open(PROJECTS_FILE, 'r') as f:
-                return json.load(f)
-        except:
-            return []
-    return []
+    return projects_store.all()
 
 def save_projects(projects):
-    with open(PROJECTS_FILE, 'w') as f:
-        json.dump(projects, f, indent=2)
-
-def load_users():
-    if os.path.exists(USERS_FILE):
-        try:
-            with open(USERS_FILE, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Error loading users: {e}")
-            return []
-    else:
-        save_users([])
-        return []
+    projects_store.replace_all(projects)
 
 def save_users(users):
-    with open(USERS_FILE, 'w') as f:
-        json.dump(users, f, indent=2)
+    users_store.replace_all(users)
+
+def find_project(project_id):
+    """A project from the working set, or from the archive once it has gone cold"""
+    return projects_store.get(project_id) or project_archive.get(project_id)
 
-def generate_project_id(full_name):
+def may_access(owner_id):
+    """Whether the session is an admin's or that of the user owning a record;
+    legacy records with no owner are for admins only"""
+    if session.get('admin_logged_in'):
+        return True
+    user_id = session.get('user_id')
+    return user_id is not None and owner_id == user_id
+
+def edit_prefix(full_name):
+    """Initials and the last four digits of the current time; projects sharing it count as edits"""
     names = full_name.upper().split()
     if len(names) >= 2:
         first_part = names[0][:3] if len(names[0]) >= 3 else names[0].ljust(3, 'X')
@@ -115,12 +200,73 @@ def generate_project_id(full_name):
     timestamp = str(int(datetime.now().timestamp()))[-4:]
     return f"{base_id}{timestamp}"
 
-def count_previous_edits(project_id_prefix, projects):
-    count = 0
-    for project in projects:
-        if project['id'].startswith(project_id_prefix):
-            count += 1
-    return count
+def count_previous_edits(prefix):
+    return project_owners.edit_count(prefix) + archived_owners.edit_count(prefix)
+
+def publish_project_event(event_type, project):
+    """Push a change to every connected admin dashboard"""
+    event_log.publish(event_type, {
+        'id': project['id'],
+        'websiteName': project.get('websiteName'),
+        'status': project.get('status'),
+        'paymentStatus': project.get('paymentStatus'),
+        'changeSeq': project.get('changeSeq')
+    })
+
+# Static files: url_for('static', ...) points at fingerprinted copies, which are
+# served precompressed and cached for good
+@app.url_defaults
+def fingerprint_static_urls(endpoint, values):
+    if endpoint == 'static' and 'filename' in values:
+        values['filename'] = assets.url_name(values['filename']) or values['filename']
+
+def serve_static(filename):
+    asset = assets.lookup(filename)
+    if asset is None:
+        return app.send_static_file(filename)
+    path, encoding = assets.variant(asset, request.accept_encodings)
+    response = send_file(path, mimetype=asset.mimetype, conditional=True)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+app.view_functions['static'] = serve_static
+
+# JSON responses: strong ETags from store versions, so an unchanged resource is
+# a 304 before it is loaded, and gzip above JSON_GZIP_MIN_BYTES
+def not_modified(etag):
+    """A 304 if the client already has the response tagged etag, gzipped or not; else None"""
+    for tag in (etag, etag + GZIP_ETAG_SUFFIX):
+        if request.if_none_match.contains(tag):
+            return with_etag(Response(status=304), tag)
+    return None
+
+def with_etag(response, etag):
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+@app.after_request
+def compress_json(response):
+    if (response.mimetype != 'application/json' or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers):
+        return response
+    data = response.get_data()
+    if len(data) < JSON_GZIP_MIN_BYTES:
+        return response
+    response.vary.add('Accept-Encoding')
+    if not request.accept_encodings['gzip']:
+        return response
+    # mtime=0 keeps the bytes the same for the same body, as a strong ETag promises
+    response.set_data(gzip.compress(data, compresslevel=JSON_GZIP_LEVEL, mtime=0))
+    response.headers['Content-Encoding'] = 'gzip'
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        # A strong ETag names exact bytes, so the gzipped body gets its own
+        response.set_etag(etag + GZIP_ETAG_SUFFIX)
+    return response
 
 @app.route('/')
 def index():
@@ -150,12 +296,7 @@ def login():
             return redirect(url_for('admin'))
         
         # Check user login
-        users = load_users()
-        user = None
-        for u in users:
-            if u.get('username') == username and u.get('password') == password:
-                user = u
-                break
+        user = user_directory.authenticate(username, password)
         
         if user:
             session.clear()
@@ -188,28 +329,28 @@ def signup():
         if not re.match(r'^\d{10}$', phone):
             return render_template('signup.html', error='Phone number must be 10 digits')
         
-        users = load_users()
-        
-        if any(u.get('username') == username for u in users):
-            return render_template('signup.html', error='Username already taken')
-        
-        email_users = [u for u in users if u.get('email') == email]
-        if len(email_users) >= 10:
-            return render_template('signup.html', error='Maximum 10 accounts allowed per email address')
+        # Checks and insert run under the users file lock so concurrent signups
+        # can't both pass the username/email checks or share an id
+        error = None
+        with users_store.transaction() as tx:
+            if user_directory.username_taken(username):
+                error = 'Username already taken'
+            elif user_directory.email_count(email) >= 10:
+                error = 'Maximum 10 accounts allowed per email address'
+            else:
+                user_id = tx.count() + 1
+                tx.upsert({
+                    'id': user_id,
+                    'name': name,
+                    'username': username,
+                    'email': email,
+                    'password': password,
+                    'phone': phone,
+                    'created_at': datetime.now().isoformat()
+                })
         
-        user_id = len(users) + 1
-        new_user = {
-            'id': user_id,
-            'name': name,
-            'username': username,
-            'email': email,
-            'password': password,
-            'phone': phone,
-            'created_at': datetime.now().isoformat()
-        }
-        
-        users.append(new_user)
-        save_users(users)
+        if error:
+            return render_template('signup.html', error=error)
         
         session.clear()
         session['user_id'] = user_id
@@ -263,16 +404,46 @@ def success(project_id):
     if not session.get('user_id'):
         return redirect(url_for('login'))
     
-    projects = load_projects()
-    project = next((p for p in projects if p.get('id') == project_id), None)
+    project = find_project(project_id)
     
     if not project:
         return redirect(url_for('index'))
     
     return render_template('success.html', project=project)
 
+def idempotent(view):
+    """Replay the first successful response when a user repeats an Idempotency-Key,
+    instead of running the view (edit count, pricing, storage writes, email) again"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if key is None or not session.get('user_id'):
+            return view(*args, **kwargs)
+        try:
+            claim = idempotency_keys.begin(session['user_id'], key, request.get_data())
+        except IdempotencyError as e:
+            return jsonify({'error': str(e)}), e.status
+        if claim.replay is not None:
+            status, mimetype, body = claim.replay
+            response = app.response_class(body, status=status, mimetype=mimetype)
+            response.headers['Idempotent-Replayed'] = 'true'
+            return response
+        
+        response = None
+        try:
+            response = app.make_response(view(*args, **kwargs))
+        finally:
+            # Only successes are kept; after an error the retry runs for real
+            if response is not None and 200 <= response.status_code < 300:
+                claim.finish(response.status_code, response.mimetype, response.get_data(as_text=True))
+            else:
+                claim.abandon()
+        return response
+    return wrapper
+
 # API Routes
 @app.route('/api/projects', methods=['POST'])
+@idempotent
 def create_project():
     try:
         if not session.get('user_id'):
@@ -285,72 +456,70 @@ def create_project():
             if field not in data:
                 return jsonify({'error': f'Missing required field: {field}'}), 400
         
-        users = load_users()
-        current_user = next((u for u in users if u.get('id') == session['user_id']), None)
+        current_user = users_store.get(session['user_id'])
         
         if not current_user:
             return jsonify({'error': 'User not found'}), 400
         
-        project_id_prefix = generate_project_id(current_user.get('name', 'User'))
-        projects = load_projects()
-        edit_count = count_previous_edits(project_id_prefix, projects)
-        
-        pricing = {'simple': 11000, 'medium': 25000, 'complex': 60000}
-        base_cost = pricing.get(data['complexity'], 0)
-        
-        delivery_charges = 0
-        delivery_days = 5
-        
-        if data['deliveryOption'] == '1day':
-            delivery_charges = 5500
-            delivery_days = 1
-        elif data['deliveryOption'] == '2days':
-            delivery_charges = 5000
-            delivery_days = 2
-        
-        edit_charges = max(0, (edit_count - 2)) * 5000
-        total_cost = base_cost + edit_charges + delivery_charges
-        
-        # Calculate advance amount (50% of total cost)
-        advance_amount = total_cost * 0.5
-        
-        project = {
-            'id': project_id_prefix,
-            'userId': session['user_id'],
-            'userName': current_user.get('name', ''),
-            'userEmail': current_user.get('email', ''),
-            'userPhone': current_user.get('phone', ''),
-            'username': current_user.get('username', ''),
-            'websiteType': data['websiteType'],
-            'complexity': data['complexity'],
-            'websiteName': data['websiteName'],
-            'description': data['description'],
-            'deliveryOption': data['deliveryOption'],
-            'deliveryCharges': delivery_charges,
-            'totalCost': total_cost,
-            'advanceAmount': advance_amount,
-            'editCount': edit_count + 1,
-            'editCharges': edit_charges,
-            'status': 'pending',
-            'paymentStatus': 'pending',
-            'advancePaid': False,
-            'fullPaid': False,
-            'createdAt': datetime.now().isoformat(),
-            'deliveryDate': (datetime.now() + timedelta(days=delivery_days)).strftime('%Y-%m-%d'),
-            'websiteUrl': '',
-            'billGenerated': False,
-            'attachments': data.get('attachments', [])
-        }
-        
-        projects.append(project)
-        save_projects(projects)
+        # Attachments are ids of uploads this user finished through /api/uploads
+        try:
+            attachments = uploads.attachments_for(data.get('attachments', []), session['user_id'])
+        except UploadError as e:
+            return jsonify({'error': str(e)}), e.status
+        
+        # Edit count and insert share one lock so concurrent submissions from the
+        # same user each see the other's project
+        with projects_store.transaction() as tx:
+            project_id = new_id()
+            prefix = edit_prefix(current_user.get('name', 'User'))
+            edit_count = count_previous_edits(prefix)
+            
+            # Prices, edit charges and the 50% advance come from pricing.json
+            quote = pricing.quote(data['websiteType'], data['complexity'], data['deliveryOption'], edit_count)
+            delivery_charges = quote['deliveryCharges']
+            delivery_days = quote['deliveryDays']
+            edit_charges = quote['editCharges']
+            total_cost = quote['totalCost']
+            advance_amount = quote['advanceAmount']
+            
+            project = {
+                'id': project_id,
+                'userId': session['user_id'],
+                'userName': current_user.get('name', ''),
+                'userEmail': current_user.get('email', ''),
+                'userPhone': current_user.get('phone', ''),
+                'username': current_user.get('username', ''),
+                'websiteType': data['websiteType'],
+                'complexity': data['complexity'],
+                'websiteName': data['websiteName'],
+                'description': data['description'],
+                'deliveryOption': data['deliveryOption'],
+                'deliveryCharges': delivery_charges,
+                'totalCost': total_cost,
+                'advanceAmount': advance_amount,
+                'editCount': edit_count + 1,
+                'editCharges': edit_charges,
+                'editPrefix': prefix,
+                'status': 'pending',
+                'paymentStatus': 'pending',
+                'advancePaid': False,
+                'fullPaid': False,
+                'createdAt': datetime.now().isoformat(),
+                'deliveryDate': (datetime.now() + timedelta(days=delivery_days)).strftime('%Y-%m-%d'),
+                'websiteUrl': '',
+                'billGenerated': False,
+                'attachments': attachments
+            }
+            
+            tx.upsert(project)
         
         # Send notification email
         send_notification_email(project)
+        publish_project_event('project_created', project)
         
         return jsonify({
             'success': True,
-            'projectId': project_id_prefix,
+            'projectId': project_id,
             'message': 'Project submitted successfully!',
             'totalCost': total_cost,
             'advanceAmount': advance_amount,
@@ -362,28 +531,257 @@ def create_project():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def quote_config(config, edit_count):
+    """Price one configuration sent to the quote APIs; raises ValueError if it's unusable"""
+    if not isinstance(config, dict):
+        raise ValueError('Each configuration must be an object')
+    if not config.get('complexity'):
+        raise ValueError('complexity is required')
+    return pricing.quote(config.get('websiteType'), config.get('complexity'),
+                         config.get('deliveryOption', 'normal'), edit_count, strict=True)
+
+def quote_edit_count():
+    # Logged-in users are quoted with the edit charges their next project would get
+    user = users_store.get(session['user_id']) if session.get('user_id') is not None else None
+    if user is None:
+        return 0
+    return count_previous_edits(edit_prefix(user.get('name', 'User')))
+
+@app.route('/api/quote', methods=['GET'])
+def get_quote():
+    try:
+        return jsonify(quote_config(request.args.to_dict(), quote_edit_count()))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/quotes', methods=['POST'])
+def get_quotes():
+    configs = request.get_json(silent=True)
+    if not isinstance(configs, list):
+        return jsonify({'error': 'Expected a JSON list of configurations'}), 400
+    if len(configs) > QUOTE_BATCH_LIMIT:
+        return jsonify({'error': f'At most {QUOTE_BATCH_LIMIT} configurations per request'}), 400
+    
+    edit_count = quote_edit_count()
+    results = []
+    for config in configs:
+        try:
+            results.append(quote_config(config, edit_count))
+        except ValueError as e:
+            results.append({'error': str(e)})
+    return jsonify(results)
+
+def upload_error(e):
+    return jsonify({'error': str(e), **e.details}), e.status
+
+@app.route('/api/uploads', methods=['POST'])
+def start_upload():
+    if not session.get('user_id'):
+        return jsonify({'error': 'Please login first'}), 401
+    
+    data = request.get_json(silent=True) or {}
+    try:
+        return jsonify(uploads.start(session['user_id'], data.get('name'), data.get('size'), data.get('type'))), 201
+    except UploadError as e:
+        return upload_error(e)
+
+@app.route('/api/uploads/<upload_id>', methods=['GET'])
+def upload_status(upload_id):
+    if not session.get('user_id'):
+        return jsonify({'error': 'Please login first'}), 401
+    
+    try:
+        return jsonify(uploads.status(upload_id, session['user_id']))
+    except UploadError as e:
+        return upload_error(e)
+
+@app.route('/api/uploads/<upload_id>', methods=['PUT'])
+def upload_chunk(upload_id):
+    if not session.get('user_id'):
+        return jsonify({'error': 'Please login first'}), 401
+    
+    # The raw body is appended at Upload-Offset without being read into memory
+    offset = request.headers.get('Upload-Offset', type=int)
+    if offset is None:
+        return jsonify({'error': 'Upload-Offset header is required'}), 400
+    try:
+        return jsonify(uploads.write_chunk(upload_id, session['user_id'], offset,
+                                           request.stream, request.content_length))
+    except UploadError as e:
+        return upload_error(e)
+
+@app.route('/api/attachments/<attachment_id>', methods=['GET'])
+def download_attachment(attachment_id):
+    attachment, path = uploads.attachment(attachment_id)
+    if attachment is None or not may_access(attachment['ownerId']):
+        return jsonify({'error': 'Attachment not found'}), 404
+    return send_file(path, mimetype=attachment['type'] or None, as_attachment=True,
+                     download_name=attachment['name'])
+
 @app.route('/api/projects', methods=['GET'])
 def get_all_projects():
     if not session.get('admin_logged_in'):
         return jsonify({'error': 'Unauthorized'}), 401
-    projects = load_projects()
-    return jsonify(projects)
+    
+    # Read the version first: a write in between is re-sent, never skipped.
+    # It also tags the response, so a poll of an unchanged store is a 304
+    # before any project is loaded or serialized
+    cursor = projects_store.version()
+    etag = f'projects-{cursor}'
+    response = not_modified(etag)
+    if response is not None:
+        return response
+    
+    # Pollers pass ?since=<cursor> to get only projects changed after it
+    since = request.args.get('since', type=int)
+    if since is not None:
+        # Archived projects come back in 'removed'
+        next_cursor, changed, removed = projects_store.changes_since(since)
+        return with_etag(jsonify({'projects': changed, 'removed': removed, 'cursor': next_cursor}), etag)
+    
+    # Filtered / paged listing, keyset-paginated over (createdAt, id)
+    if any(arg in request.args for arg in ('status', 'paymentStatus', 'q', 'sort', 'limit', 'cursor')):
+        sort = request.args.get('sort', '-createdAt')
+        if sort not in ('createdAt', '-createdAt'):
+            return jsonify({'error': 'sort must be createdAt or -createdAt'}), 400
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+        try:
+            projects, next_cursor = project_listing.page(
+                status=request.args.get('status'),
+                payment_status=request.args.get('paymentStatus'),
+                q=request.args.get('q'),
+                descending=sort.startswith('-'),
+                limit=limit,
+                cursor=request.args.get('cursor'))
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        response = with_etag(jsonify({'projects': projects, 'nextCursor': next_cursor}), etag)
+        response.headers['X-Change-Cursor'] = str(cursor)
+        return response
+    
+    response = with_etag(jsonify(load_projects()), etag)
+    response.headers['X-Change-Cursor'] = str(cursor)
+    return response
+
+@app.route('/api/projects/archive', methods=['GET'])
+def get_archive_partitions():
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    # Only the small index is read; a partition is loaded when it's asked for
+    return jsonify({'partitions': [{'month': month, 'count': count}
+                                   for month, count in project_archive.partitions().items()]})
+
+@app.route('/api/projects/archive/<month>', methods=['GET'])
+def get_archived_projects(month):
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    return jsonify({'month': month, 'projects': project_archive.projects(month)})
+
+@app.route('/api/projects/archive', methods=['POST'])
+def archive_projects():
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    data = request.get_json(silent=True) or {}
+    older_than_days = data.get('olderThanDays', ARCHIVE_AFTER_DAYS)
+    if isinstance(older_than_days, bool) or not isinstance(older_than_days, int) or older_than_days < 0:
+        return jsonify({'error': 'olderThanDays must be a whole number of days'}), 400
+    archived = project_archive.archive(projects_store, older_than_days)
+    return jsonify({'success': True, 'archived': archived})
+
+def export_filter(date_field='createdAt'):
+    """Predicate for the ?from=&to= (YYYY-MM-DD) and ?status=a,b filters; raises ValueError"""
+    start, end = parse_date_range(request.args.get('from'), request.args.get('to'))
+    status = request.args.get('status')
+    return record_filter(start, end, set(status.split(',')) if status else None, date_field)
+
+def export_response(records, fields, name):
+    """Stream ``records`` in the requested ?format= (csv by default) as a download"""
+    fmt = request.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': 'format must be csv or ndjson'}), 400
+    filename = f"{name}-{datetime.now():%Y%m%d}.{fmt}"
+    return Response(stream_export(records, fmt, fields), mimetype=EXPORT_FORMATS[fmt],
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+@app.route('/api/projects/export', methods=['GET'])
+def export_projects():
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        keep = export_filter()
+    except ValueError:
+        return jsonify({'error': 'from and to must be dates (YYYY-MM-DD)'}), 400
+    # ?includeArchived=1 streams the cold partitions first, one at a time
+    records = projects_store.scan()
+    if request.args.get('includeArchived') == '1':
+        records = chain(project_archive.scan(), records)
+    return export_response(filter(keep, records), PROJECT_EXPORT_FIELDS, 'projects')
+
+@app.route('/api/users/export', methods=['GET'])
+def export_users():
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        keep = export_filter('created_at')
+    except ValueError:
+        return jsonify({'error': 'from and to must be dates (YYYY-MM-DD)'}), 400
+    return export_response(filter(keep, users_store.scan()), USER_EXPORT_FIELDS, 'users')
+
+@app.route('/api/projects/stats', methods=['GET'])
+def get_project_stats():
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    days = request.args.get('days', 30, type=int)
+    return jsonify(project_stats.summary(days=days))
+
+@app.route('/api/projects/search', methods=['GET'])
+def search_projects():
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    q = request.args.get('q', '')
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 200)
+    results = []
+    for project_id, score in project_search.search(q, limit=limit):
+        project = projects_store.get(project_id)
+        if project is not None:
+            project['score'] = score
+            results.append(project)
+    return jsonify(results)
 
 @app.route('/api/projects/user', methods=['GET'])
 def get_user_projects():
     if not session.get('user_id'):
         return jsonify({'error': 'Please login first'}), 401
     
-    projects = load_projects()
-    user_projects = [p for p in projects if p.get('userId') == session['user_id']]
-    return jsonify(user_projects)
+    # The owner index knows when this user's projects last changed, so an
+    # unchanged dashboard gets a 304 without loading any of them
+    version, project_ids = project_owners.projects(session['user_id'])
+    archived_version, archived_ids = archived_owners.projects(session['user_id'])
+    etag = f"{session['user_id']}-{version}-{archived_version}"
+    response = not_modified(etag)
+    if response is None:
+        # Archived projects are the oldest; their partitions are only read here
+        projects = [p for p in map(project_archive.get, archived_ids) if p is not None]
+        projects += [p for p in map(projects_store.get, project_ids) if p is not None]
+        response = with_etag(jsonify(projects), etag)
+    return response
 
 @app.route('/api/projects/<project_id>', methods=['GET'])
 def get_project(project_id):
-    projects = load_projects()
-    project = next((p for p in projects if p.get('id') == project_id), None)
+    # Any write to either store moves its version, so together they tag the
+    # project without reading it (the URL already tells projects apart)
+    etag = f'project-{projects_store.version()}-{project_archive.index.version()}'
+    response = not_modified(etag)
+    if response is not None:
+        return response
+    project = find_project(project_id)
     if project:
-        return jsonify(project)
+        return with_etag(jsonify(project), etag)
     else:
         return jsonify({'error': 'Project not found'}), 404
 
@@ -394,22 +792,43 @@ def update_project(project_id):
         
     try:
         data = request.json
-        projects = load_projects()
-        project = next((p for p in projects if p.get('id') == project_id), None)
-        
-        if not project:
-            return jsonify({'error': 'Project not found'}), 404
-        
-        for key, value in data.items():
-            if key in project:
-                project[key] = value
-        
-        save_projects(projects)
+        with projects_store.transaction() as tx:
+            project = tx.get(project_id)
+            
+            if not project:
+                return jsonify({'error': 'Project not found'}), 404
+            
+            for key, value in data.items():
+                if key in project:
+                    project[key] = value
+            
+            tx.upsert(project)
+        publish_project_event('project_updated', project)
         return jsonify({'success': True, 'message': 'Project updated successfully'})
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def mark_billed(project, website_url):
+    project['billGenerated'] = True
+    project['websiteUrl'] = website_url
+    project['billDate'] = datetime.now().isoformat()
+
+def prerender_bills(projects):
+    """Queue PDFs of just-billed projects; the bills are recorded already, so a failure here is only logged"""
+    try:
+        invoices.submit(projects, 'pdf')
+    except Exception as e:
+        print(f"⚠️ Could not queue bill rendering: {e}")
+
+def mark_paid(project, payment_type):
+    if payment_type == 'advance':
+        project['advancePaid'] = True
+        project['paymentStatus'] = 'advance_paid'
+    elif payment_type == 'full':
+        project['fullPaid'] = True
+        project['paymentStatus'] = 'completed'
+
 @app.route('/api/projects/<project_id>/bill', methods=['POST'])
 def generate_bill(project_id):
     if not session.get('admin_logged_in'):
@@ -417,22 +836,90 @@ def generate_bill(project_id):
         
     try:
         data = request.json
-        projects = load_projects()
-        project = next((p for p in projects if p.get('id') == project_id), None)
-        
-        if not project:
-            return jsonify({'error': 'Project not found'}), 404
-        
-        project['billGenerated'] = True
-        project['websiteUrl'] = data.get('websiteUrl', '')
-        project['billDate'] = datetime.now().isoformat()
-        
-        save_projects(projects)
-        return jsonify({'success': True, 'message': 'Bill generated successfully'})
+        with projects_store.transaction() as tx:
+            project = tx.get(project_id)
+            
+            if not project:
+                return jsonify({'error': 'Project not found'}), 404
+            
+            mark_billed(project, data.get('websiteUrl', ''))
+            
+            tx.upsert(project)
+        publish_project_event('bill_generated', project)
+        # Render the PDF in the background so the first download is already cached
+        prerender_bills([project])
+        return jsonify({'success': True, 'message': 'Bill generated successfully',
+                        'invoiceUrl': url_for('download_invoice', project_id=project_id, format='pdf')})
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/projects/<project_id>/invoice', methods=['GET'])
+def download_invoice(project_id):
+    project = find_project(project_id)
+    if not project or not may_access(project.get('userId')):
+        return jsonify({'error': 'Project not found'}), 404
+    if not project.get('billGenerated'):
+        return jsonify({'error': 'Bill has not been generated yet'}), 409
+    
+    fmt = request.args.get('format', 'html')
+    if fmt not in INVOICE_FORMATS:
+        return jsonify({'error': 'format must be html or pdf'}), 400
+    
+    # Cached under a hash of the billed fields, so this renders at most once per version
+    path = invoices.render(project, fmt)
+    response = send_file(path, mimetype=INVOICE_FORMATS[fmt], as_attachment=fmt == 'pdf',
+                         download_name=f'bill-{project_id}.{fmt}', etag=os.path.basename(path))
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+@app.route('/api/invoices/batch', methods=['POST'])
+def batch_invoices():
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    data = request.get_json(silent=True) or {}
+    fmt = data.get('format', 'pdf')
+    if fmt not in INVOICE_FORMATS:
+        return jsonify({'error': 'format must be html or pdf'}), 400
+    
+    # Either explicit project ids or every bill generated in a month (YYYY-MM)
+    project_ids, month = data.get('projectIds'), data.get('month')
+    if project_ids is not None:
+        if not isinstance(project_ids, list):
+            return jsonify({'error': 'projectIds must be a list'}), 400
+        projects = [find_project(pid) if isinstance(pid, str) else None for pid in project_ids]
+    elif isinstance(month, str) and re.fullmatch(r'\d{4}-\d{2}', month):
+        # Bills of archived projects count too; they can only be in partitions up to that month
+        archived = (p for partition in project_archive.partitions() if partition <= month or partition == 'undated'
+                    for p in project_archive.projects(partition) if p.get('billGenerated'))
+        projects = sorted((p for p in chain(projects_store.find('billGenerated', True), archived)
+                           if (p.get('billDate') or '').startswith(month)), key=lambda p: p['id'])
+        project_ids = [p['id'] for p in projects]
+    else:
+        return jsonify({'error': 'Send projectIds or a month (YYYY-MM)'}), 400
+    if len(projects) > INVOICE_BATCH_LIMIT:
+        return jsonify({'error': f'At most {INVOICE_BATCH_LIMIT} invoices per batch'}), 400
+    
+    results, billable = [], []
+    for pid, project in zip(project_ids, projects):
+        if project is None:
+            results.append({'projectId': pid, 'error': 'Project not found'})
+        elif not project.get('billGenerated'):
+            results.append({'projectId': pid, 'error': 'Bill has not been generated yet'})
+        else:
+            billable.append(project)
+            results.append({'projectId': pid, 'ready': invoices.is_cached(project, fmt),
+                            'url': url_for('download_invoice', project_id=pid, format=fmt)})
+    
+    # Rendering happens in the pool; this request only queues the uncached bills
+    try:
+        queued = invoices.submit(billable, fmt)
+    except Exception as e:
+        print(f"⚠️ Could not queue bill rendering: {e}")
+        return jsonify({'error': 'Could not queue the invoices, try again'}), 503
+    return jsonify({'success': True, 'queued': len(queued), 'invoices': results}), 202
+
 @app.route('/api/projects/<project_id>/payment', methods=['POST'])
 def update_payment(project_id):
     if not session.get('admin_logged_in'):
@@ -442,25 +929,184 @@ def update_payment(project_id):
         data = request.json
         payment_type = data.get('type')  # 'advance' or 'full'
         
-        projects = load_projects()
-        project = next((p for p in projects if p.get('id') == project_id), None)
-        
-        if not project:
-            return jsonify({'error': 'Project not found'}), 404
-        
-        if payment_type == 'advance':
-            project['advancePaid'] = True
-            project['paymentStatus'] = 'advance_paid'
-        elif payment_type == 'full':
-            project['fullPaid'] = True
-            project['paymentStatus'] = 'completed'
-        
-        save_projects(projects)
+        with projects_store.transaction() as tx:
+            project = tx.get(project_id)
+            
+            if not project:
+                return jsonify({'error': 'Project not found'}), 404
+            
+            mark_paid(project, payment_type)
+            
+            tx.upsert(project)
+        publish_project_event('payment_updated', project)
         return jsonify({'success': True, 'message': f'{payment_type} payment marked as paid'})
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def apply_bulk_operation(project, operation):
+    """Apply one /api/projects/bulk operation; returns the event to publish, or raises ValueError"""
+    op = operation.get('op')
+    if op == 'status':
+        if operation.get('value') not in PROJECT_STATUSES:
+            raise ValueError(f"status must be one of: {', '.join(PROJECT_STATUSES)}")
+        project['status'] = operation['value']
+        return 'project_updated'
+    if op == 'payment':
+        if operation.get('type') not in ('advance', 'full'):
+            raise ValueError("payment type must be 'advance' or 'full'")
+        mark_paid(project, operation['type'])
+        return 'payment_updated'
+    if op == 'websiteUrl':
+        if not isinstance(operation.get('value'), str):
+            raise ValueError('websiteUrl must be a string')
+        project['websiteUrl'] = operation['value']
+        return 'project_updated'
+    if op == 'bill':
+        website_url = operation.get('websiteUrl', project.get('websiteUrl', ''))
+        if not isinstance(website_url, str):
+            raise ValueError('websiteUrl must be a string')
+        mark_billed(project, website_url)
+        return 'bill_generated'
+    raise ValueError(f'Unknown operation: {op}')
+
+@app.route('/api/projects/bulk', methods=['POST'])
+def bulk_update_projects():
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    data = request.get_json(silent=True) or {}
+    operations = data.get('operations')
+    if not isinstance(operations, list) or not operations:
+        return jsonify({'error': 'Send a list of operations'}), 400
+    if len(operations) > BULK_OPERATION_LIMIT:
+        return jsonify({'error': f'At most {BULK_OPERATION_LIMIT} operations per request'}), 400
+    
+    # One transaction, so the whole batch costs a single write; an invalid
+    # operation is reported in its result and skipped, the rest still apply
+    results, changed, billed = [], {}, {}
+    with projects_store.transaction() as tx:
+        for index, operation in enumerate(operations):
+            project_id = operation.get('projectId') if isinstance(operation, dict) else None
+            project = tx.get(project_id) if isinstance(project_id, str) else None
+            if project is None:
+                results.append({'index': index, 'projectId': project_id, 'success': False, 'error': 'Project not found'})
+                continue
+            try:
+                event_type = apply_bulk_operation(project, operation)
+            except ValueError as e:
+                results.append({'index': index, 'projectId': project_id, 'success': False, 'error': str(e)})
+                continue
+            tx.upsert(project)
+            changed[project_id] = (event_type, project)
+            if event_type == 'bill_generated':
+                billed[project_id] = project
+            results.append({'index': index, 'projectId': project_id, 'success': True})
+    
+    for event_type, project in changed.values():
+        publish_project_event(event_type, project)
+    prerender_bills(billed.values())
+    
+    applied = sum(1 for r in results if r['success'])
+    return jsonify({'success': True, 'applied': applied, 'failed': len(results) - applied, 'results': results})
+
+@app.route('/api/events')
+def project_events():
+    """Server-Sent Events stream of project changes for the admin dashboard"""
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    stream = event_log.stream(request.headers.get('Last-Event-ID'))
+    return Response(stream, mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+# Request, template and store metrics for Prometheus
+REQUEST_SECONDS = metrics.histogram('http_request_duration_seconds', 'Request latency by route', ('method', 'route'))
+REQUESTS_TOTAL = metrics.counter('http_requests_total', 'Requests by route and response status', ('method', 'route', 'status'))
+REQUESTS_IN_FLIGHT = metrics.gauge('http_requests_in_flight', 'Requests being handled right now', ('method', 'route'))
+TEMPLATE_SECONDS = metrics.histogram('template_render_seconds', 'Time spent rendering templates', ('template',))
+
+def metrics_route():
+    # The matched URL rule, so /api/projects/<id> is one series rather than one per project
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    REQUESTS_IN_FLIGHT.inc(request.method, metrics_route())
+
+@app.after_request
+def remember_response_status(response):
+    g.response_status = response.status_code
+    return response
+
+@app.teardown_request
+def observe_request(error=None):
+    # Streamed bodies are sent after this runs, so they aren't in the latency
+    started = g.pop('request_started', None)
+    if started is None:
+        return
+    route = metrics_route()
+    REQUESTS_IN_FLIGHT.dec(request.method, route)
+    REQUEST_SECONDS.observe(time.perf_counter() - started, request.method, route)
+    REQUESTS_TOTAL.inc(request.method, route, str(g.get('response_status', 500)))
+
+@before_render_template.connect_via(app)
+def start_template_timer(sender, template, context, **extra):
+    g.template_started = time.perf_counter()
+
+@template_rendered.connect_via(app)
+def observe_template(sender, template, context, **extra):
+    started = g.pop('template_started', None)
+    if started is not None:
+        TEMPLATE_SECONDS.observe(time.perf_counter() - started, template.name)
+
+@app.route('/metrics')
+def prometheus_metrics():
+    if METRICS_TOKEN and request.headers.get('Authorization') != f'Bearer {METRICS_TOKEN}':
+        return jsonify({'error': 'Unauthorized'}), 401
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+# Admin profiling toggle: sampled requests run under cProfile
+@app.before_request
+def start_profile():
+    profile = profiler.begin()
+    if profile is not None:
+        g.profile = profile
+
+@app.teardown_request
+def finish_profile(error=None):
+    profile = g.pop('profile', None)
+    if profile is not None:
+        profiler.finish(profile, request.method, metrics_route(), request.path, g.get('response_status', 500))
+
+@app.route('/api/profiling', methods=['GET'])
+def profiling_summary():
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    return jsonify(profiler.summary(limit))
+
+@app.route('/api/profiling', methods=['PUT'])
+def configure_profiling():
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    data = request.get_json(silent=True) or {}
+    try:
+        settings = profiler.configure(data.get('enabled'), data.get('sampleRate'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'success': True, 'settings': settings})
+
+@app.route('/api/profiling/<profile_id>.prof', methods=['GET'])
+def download_profile(profile_id):
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    path = profiler.profile_path(profile_id)
+    if path is None:
+        return jsonify({'error': 'Profile not found'}), 404
+    return send_file(path, mimetype='application/octet-stream', as_attachment=True,
+                     download_name=f'{profile_id}.prof')
+
 # Health check route
 @app.route('/health')
 def health_check():
@@ -0,0 +1,121 @@
+"""Hot/cold split of the projects store.
+
+Finished projects (completed or delivered, and fully paid) never change
+again, but every load, scan and save of the projects store keeps paying for
+them. ``ProjectArchive.archive()`` moves the ones finished more than a given
+number of days ago into cold JSON files partitioned by the month they were
+created, ``<dir>/projects-YYYY-MM.json``, and records each one in
+``<dir>/index.json``. Index entries only carry the id, partition and the few
+fields the owner and stats indexes need, so the index stays small; ``get()``
+uses it to read a single partition, and partitions are only loaded when
+something asks for them.
+
+Run it from cron with ``python archive.py --older-than-days 90``, or from the
+admin API.
+"""
+import argparse
+import os
+from collections import Counter
+from datetime import datetime, timedelta
+
+from storage import JsonStore, file_lock, open_store
+
+FINISHED_STATUSES = ('completed', 'delivered')
+
+# Copied into the index entry of each archived project
+INDEX_FIELDS = ('id', 'userId', 'createdAt', 'status', 'totalCost', 'advanceAmount',
+                'advancePaid', 'fullPaid', 'editPrefix')
+
+
+def is_finished(project):
+    return project.get('status') in FINISHED_STATUSES and project.get('fullPaid') is True
+
+
+def partition_of(project):
+    """``YYYY-MM`` the project was created in; undated legacy records share one partition."""
+    created = project.get('createdAt') or ''
+    return created[:7] if len(created) >= 7 else 'undated'
+
+
+class ProjectArchive:
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.index = JsonStore(os.path.join(directory, 'index.json'))
+        self.lock_path = os.path.join(directory, 'archive.lock')
+        self._partitions = {}  # partition -> JsonStore, opened on first use
+
+    def _partition(self, partition):
+        store = self._partitions.get(partition)
+        if store is None:
+            store = JsonStore(os.path.join(self.directory, f'projects-{partition}.json'))
+            self._partitions[partition] = store
+        return store
+
+    def get(self, project_id):
+        """An archived project by id, or None; reads only its partition."""
+        entry = self.index.get(project_id)
+        if entry is None:
+            return None
+        return self._partition(entry['partition']).get(project_id)
+
+    def partitions(self):
+        """``{partition: number of archived projects}``, newest month first."""
+        counts = Counter(entry['partition'] for entry in self.index.all())
+        return dict(sorted(counts.items(), reverse=True))
+
+    def projects(self, partition):
+        """The projects archived in ``partition``, newest first."""
+        if partition not in self.partitions():
+            return []
+        return sorted(self._partition(partition).all(), key=lambda p: p.get('createdAt') or '', reverse=True)
+
+    def scan(self):
+        """Every archived project, one partition at a time, oldest month first."""
+        for partition in sorted(self.partitions()):
+            yield from self._partition(partition).all()
+
+    def archive(self, projects_store, older_than_days, now=None):
+        """Move projects finished more than ``older_than_days`` ago out of
+        ``projects_store``; returns how many were moved.
+
+        Runs inside a transaction on the projects store, so nothing can change
+        a project between its cold copy being written and its hot copy being
+        deleted. Cold copies are written first: a crash in between leaves a
+        project in both places (the hot copy wins, and the next run finishes
+        the move), never in neither.
+        """
+        cutoff = ((now or datetime.now()) - timedelta(days=older_than_days)).isoformat()
+        with file_lock(self.lock_path), projects_store.transaction() as tx:
+            finished = [p for p in tx.all() if p.get('id') and is_finished(p)
+                        and (p.get('billDate') or p.get('createdAt') or '') < cutoff]
+            if not finished:
+                return 0
+
+            by_partition = {}
+            for project in finished:
+                by_partition.setdefault(partition_of(project), []).append(project)
+            for partition, projects in by_partition.items():
+                with self._partition(partition).transaction() as cold:
+                    for project in projects:
+                        cold.upsert(dict(project))
+            with self.index.transaction() as index:
+                for partition, projects in by_partition.items():
+                    for project in projects:
+                        entry = {field: project.get(field) for field in INDEX_FIELDS}
+                        entry['partition'] = partition
+                        index.upsert(entry)
+
+            for project in finished:
+                tx.delete(project['id'])
+            return len(finished)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Move finished projects into cold monthly partitions')
+    parser.add_argument('--projects', default='projects.json')
+    parser.add_argument('--archive-dir', default=os.environ.get('ARCHIVE_DIR', 'archive'))
+    parser.add_argument('--older-than-days', type=int, default=int(os.environ.get('ARCHIVE_AFTER_DAYS', 90)))
+    args = parser.parse_args()
+    moved = ProjectArchive(args.archive_dir).archive(open_store(args.projects), args.older_than_days)
+    print(f"📦 Archived {moved} finished projects into {args.archive_dir}")
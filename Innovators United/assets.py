@@ -0,0 +1,139 @@
+"""Fingerprinted, precompressed static files.
+
+``AssetManifest.build()`` hashes every file under ``static/`` and copies it
+to ``<build dir>/<name>.<hash>.<ext>``, next to ``.gz`` and (when the
+optional ``brotli`` package is installed) ``.br`` variants of the text
+files. Templates keep calling ``url_for('static', filename=...)``; the app
+swaps in the fingerprinted name, so a page always points at the exact bytes
+it was built against and those URLs can be cached forever. Changing a file
+changes its hash, and with it the URL.
+
+Files that are already built are left alone, so building at startup only
+costs hashing the sources; run ``python assets.py`` to build ahead of time.
+Builds of earlier versions are kept too, so pages rendered before a deploy
+still load; ``python assets.py --clean`` starts over.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+COMPRESSIBLE = ('.css', '.js', '.json', '.svg', '.txt', '.html', '.map')
+MIN_COMPRESS_SIZE = 1024
+HASH_LENGTH = 16
+FINGERPRINTED_RE = re.compile(r'[\w./-]+\.[0-9a-f]{%d}(\.\w+)?' % HASH_LENGTH)
+
+# Served for Content-Encoding values, best first
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+class Asset:
+    def __init__(self, name, path, variants):
+        self.name = name
+        self.path = path
+        self.variants = variants  # encoding -> path of the precompressed copy
+        self.mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+
+def _fingerprint(name, digest):
+    root, ext = os.path.splitext(name)
+    return f'{root}.{digest[:HASH_LENGTH]}{ext}'
+
+
+def _write_atomic(path, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class AssetManifest:
+    def __init__(self, static_dir, build_dir):
+        self.static_dir = os.path.abspath(static_dir)
+        self.build_dir = os.path.abspath(build_dir)  # send_file resolves relative paths against the app
+        self.urls = {}     # name under static/ -> fingerprinted name
+        self.assets = {}   # fingerprinted name -> Asset
+
+    def build(self):
+        """Hash, copy and compress every static file."""
+        urls, assets = {}, {}
+        os.makedirs(self.build_dir, exist_ok=True)  # the manifest is written even with no static files
+        for directory, _, files in os.walk(self.static_dir):
+            for filename in files:
+                source = os.path.join(directory, filename)
+                name = os.path.relpath(source, self.static_dir).replace(os.sep, '/')
+                with open(source, 'rb') as f:
+                    data = f.read()
+                fingerprinted = _fingerprint(name, hashlib.sha256(data).hexdigest())
+                urls[name] = fingerprinted
+                assets[fingerprinted] = self._build_file(fingerprinted, data)
+        _write_atomic(os.path.join(self.build_dir, 'manifest.json'), json.dumps(urls, indent=2).encode('utf-8'))
+        self.urls, self.assets = urls, assets
+        return self
+
+    def _build_file(self, fingerprinted, data):
+        path = os.path.join(self.build_dir, *fingerprinted.split('/'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if not os.path.exists(path):
+            _write_atomic(path, data)
+        variants = {}
+        if fingerprinted.endswith(COMPRESSIBLE) and len(data) >= MIN_COMPRESS_SIZE:
+            for encoding, suffix in ENCODINGS:
+                if encoding == 'br' and brotli is None:
+                    continue
+                if not os.path.exists(path + suffix):
+                    compressed = (brotli.compress(data) if encoding == 'br'
+                                  else gzip.compress(data, compresslevel=9, mtime=0))
+                    if len(compressed) >= len(data):
+                        continue
+                    _write_atomic(path + suffix, compressed)
+                variants[encoding] = path + suffix
+        return Asset(fingerprinted, path, variants)
+
+    def url_name(self, name):
+        """Fingerprinted name for ``name`` under static/, or None if there's no such file."""
+        return self.urls.get(name)
+
+    def lookup(self, fingerprinted):
+        """The built file for a fingerprinted name, including ones from earlier builds."""
+        asset = self.assets.get(fingerprinted)
+        if asset is not None or not FINGERPRINTED_RE.fullmatch(fingerprinted):
+            return asset
+        path = os.path.normpath(os.path.join(self.build_dir, fingerprinted))
+        if not path.startswith(self.build_dir + os.sep) or not os.path.isfile(path):
+            return None
+        variants = {encoding: path + suffix for encoding, suffix in ENCODINGS if os.path.exists(path + suffix)}
+        return Asset(fingerprinted, path, variants)
+
+    def variant(self, asset, accept_encodings):
+        """``(path, content encoding or None)`` of the smallest copy the client accepts.
+
+        ``accept_encodings`` maps an encoding to its quality, as Werkzeug's
+        ``request.accept_encodings`` does.
+        """
+        for encoding, _ in ENCODINGS:
+            if encoding in asset.variants and accept_encodings[encoding]:
+                return asset.variants[encoding], encoding
+        return asset.path, None
+
+
+if __name__ == '__main__':
+    here = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description='Fingerprint and precompress the static files')
+    parser.add_argument('--static-dir', default=os.path.join(here, 'static'))
+    parser.add_argument('--build-dir', default=os.environ.get('ASSET_DIR', 'assets'))
+    parser.add_argument('--clean', action='store_true', help='rebuild every file from scratch')
+    args = parser.parse_args()
+    if args.clean:
+        shutil.rmtree(args.build_dir, ignore_errors=True)
+    manifest = AssetManifest(args.static_dir, args.build_dir).build()
+    print(f"📦 Built {len(manifest.assets)} static files into {args.build_dir}")
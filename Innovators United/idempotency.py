@@ -0,0 +1,154 @@
+"""Replaying responses to retried requests that carry an ``Idempotency-Key``.
+
+The first request with a key claims it by creating ``<dir>/<hash>.json``
+exclusively, so a duplicate that reaches another worker at the same moment
+sees the claim and waits for it. When the request succeeds its response is
+saved in that file, and a retry with the same key gets it back without the
+handler running again; when it fails the claim is dropped so a retry runs
+normally. Entries expire ``ttl`` seconds after they were written, and the
+oldest finished ones are evicted once there are more than ``max_entries``;
+a claim still in flight is only dropped after ``claim_timeout``.
+"""
+import hashlib
+import json
+import os
+import time
+
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyError(ValueError):
+    """A key that can't be used for this request; ``status`` is the HTTP status."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class IdempotencyClaim:
+    """A key claimed by the current request, or the response to replay for it."""
+
+    def __init__(self, path, fingerprint, replay=None):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.replay = replay  # (status, mimetype, body) of the original response
+
+    def finish(self, status, mimetype, body):
+        """Store the response so retries with this key get it back."""
+        entry = {'fingerprint': self.fingerprint, 'status': status, 'mimetype': mimetype, 'body': body}
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, self.path)
+
+    def abandon(self):
+        """Drop the claim so a retry runs the request again."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class IdempotencyStore:
+    def __init__(self, directory, ttl=24 * 3600, max_entries=10000, wait=10.0,
+                 claim_timeout=300, purge_interval=60):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.wait = wait                    # how long a duplicate waits for the first request
+        self.claim_timeout = claim_timeout  # a claim older than this belongs to a dead worker
+        self.purge_interval = purge_interval
+        self._last_purge = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, scope, key):
+        digest = hashlib.sha256(f'{scope}\0{key}'.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest + '.json')
+
+    def _read(self, path):
+        """``(age in seconds, entry)``; the entry is None while a claim is half written."""
+        try:
+            with open(path) as f:
+                age = time.time() - os.fstat(f.fileno()).st_mtime
+                try:
+                    return age, json.load(f)
+                except ValueError:
+                    return age, None
+        except FileNotFoundError:
+            return None, None
+
+    def begin(self, scope, key, body):
+        """Claim ``key`` within ``scope`` (the user) for a request with ``body``.
+
+        Returns a claim whose ``replay`` is set if the key already has a
+        response. Raises IdempotencyError if the key was used for a
+        different request, or if the first request is still running after
+        ``wait`` seconds.
+        """
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise IdempotencyError(f'Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters')
+        self._maybe_purge()
+        path = self._path(scope, key)
+        fingerprint = hashlib.sha256(body).hexdigest()
+        deadline = time.monotonic() + self.wait
+        while True:
+            try:
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+            except FileExistsError:
+                pass
+            else:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump({'fingerprint': fingerprint}, f)
+                return IdempotencyClaim(path, fingerprint)
+
+            age, entry = self._read(path)
+            if age is None:
+                continue  # abandoned in the meantime; claim it
+            done = entry is not None and 'status' in entry
+            if age > (self.ttl if done else self.claim_timeout):
+                self._remove(path)
+                continue
+            if entry is not None and entry['fingerprint'] != fingerprint:
+                raise IdempotencyError('Idempotency-Key was already used for a different request', 422)
+            if done:
+                return IdempotencyClaim(path, fingerprint, (entry['status'], entry['mimetype'], entry['body']))
+            if time.monotonic() >= deadline:
+                raise IdempotencyError('A request with this Idempotency-Key is still in progress', 409)
+            time.sleep(0.05)
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _maybe_purge(self):
+        now = time.monotonic()
+        if self._last_purge is not None and now - self._last_purge < self.purge_interval:
+            return
+        self._last_purge = now
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except FileNotFoundError:
+                pass
+        entries.sort()
+        cutoff = time.time() - self.ttl
+        excess = len(entries) - self.max_entries
+        for mtime, path in entries:
+            if mtime < cutoff or (excess > 0 and self._evictable(path)):
+                self._remove(path)
+                excess -= 1
+
+    def _evictable(self, path):
+        """Whether an unexpired entry may go to make room: finished ones may,
+        but evicting a claim in flight would let a retry run the request again."""
+        age, entry = self._read(path)
+        if age is None:
+            return False
+        if age > self.claim_timeout:
+            return True
+        # A temp file is a response about to be renamed into place
+        return not path.endswith('.tmp') and entry is not None and 'status' in entry
@@ -0,0 +1,282 @@
+"""Invoice documents for billed projects.
+
+A bill is rendered from the project record, either to HTML through
+``templates/invoice.html`` or to a PDF written directly, and saved as
+``<dir>/<hash>.<format>``, where the hash covers every field that appears on
+the bill plus the template. Editing any of them gives a new file name, so a
+cached bill is never stale and downloading it again is just a file send.
+Batches are fanned out to a process pool so month-end billing doesn't keep
+request workers busy rendering documents. The pool starts its processes from
+a forkserver, not by forking a threaded gunicorn worker that may hold locks.
+Only the ``max_files`` most recently used bills are kept.
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import textwrap
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from jinja2 import Environment, FileSystemLoader
+
+ISSUER = 'INNOVATORS UNITED WEB PRO'
+PAYMENT_CONTACT = '9448749572'
+INVOICE_FORMATS = {'html': 'text/html', 'pdf': 'application/pdf'}
+
+# Everything the bill shows; a change to any of these renders a new document
+INVOICE_FIELDS = (
+    'id', 'userName', 'username', 'userEmail', 'userPhone', 'websiteName', 'websiteType',
+    'complexity', 'description', 'deliveryOption', 'deliveryDate', 'createdAt', 'billDate',
+    'websiteUrl', 'totalCost', 'deliveryCharges', 'editCharges', 'editCount', 'advanceAmount',
+    'advancePaid', 'fullPaid',
+)
+
+_environments = {}  # template directory -> jinja Environment, per process
+
+
+def bill_totals(project):
+    """The amounts printed on a project's bill."""
+    total = project.get('totalCost') or 0
+    delivery = project.get('deliveryCharges') or 0
+    edits = project.get('editCharges') or 0
+    advance = project.get('advanceAmount') or 0
+    return {
+        'baseCost': total - delivery - edits,
+        'deliveryCharges': delivery,
+        'editCharges': edits,
+        'totalCost': total,
+        'advanceAmount': advance,
+        'finalAmount': total - advance,
+        'amountDue': 0 if project.get('fullPaid') else total - advance if project.get('advancePaid') else total,
+    }
+
+
+def money(amount, symbol='₹'):
+    return f'{symbol}{amount:,.2f}'
+
+
+def render_html(project, template_dir):
+    environment = _environments.get(template_dir)
+    if environment is None:
+        environment = _environments[template_dir] = Environment(
+            loader=FileSystemLoader(template_dir), autoescape=True)
+        environment.filters['money'] = money
+    return environment.get_template('invoice.html').render(
+        project=project, totals=bill_totals(project), issuer=ISSUER,
+        payment_contact=PAYMENT_CONTACT).encode('utf-8')
+
+
+# ---------------- PDF ----------------
+PAGE_WIDTH, PAGE_HEIGHT, MARGIN = 595, 842, 50  # A4 in points
+
+
+def _pdf_text(text):
+    # The standard fonts only cover WinAnsi; anything else prints as '?'
+    text = text.replace('₹', 'Rs. ')
+    text = text.encode('cp1252', 'replace').decode('latin-1')
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def _pdf_lines(project):
+    """``(bold, size, text)`` lines of the PDF bill, top to bottom."""
+    totals = bill_totals(project)
+    pdf_money = lambda amount: money(amount, 'Rs. ')
+    lines = [
+        (True, 18, ISSUER),
+        (False, 11, 'Website Development Bill'),
+        (False, 11, ''),
+        (True, 12, 'Client'),
+        (False, 10, f"Name: {project.get('userName', '')}"),
+        (False, 10, f"Username: {project.get('username', '')}"),
+        (False, 10, f"Email: {project.get('userEmail', '')}"),
+        (False, 10, f"Phone: {project.get('userPhone', '')}"),
+        (False, 10, ''),
+        (True, 12, 'Project'),
+        (False, 10, f"Project ID: {project.get('id', '')}"),
+        (False, 10, f"Website: {project.get('websiteName', '')} ({project.get('websiteType', '')})"),
+        (False, 10, f"Bill date: {(project.get('billDate') or '')[:10]}"),
+        (False, 10, f"Delivery: {project.get('deliveryDate', '')}"),
+    ]
+    if project.get('websiteUrl'):
+        lines.append((False, 10, f"Website URL: {project['websiteUrl']}"))
+    lines += [(False, 10, ''), (True, 12, 'Requirements')]
+    for paragraph in str(project.get('description') or '').splitlines() or ['']:
+        lines += [(False, 10, line) for line in textwrap.wrap(paragraph, 95) or ['']]
+    lines += [(False, 10, ''), (True, 12, 'Charges'),
+              (False, 10, f"Base cost ({project.get('complexity', '')}): {pdf_money(totals['baseCost'])}")]
+    if totals['deliveryCharges']:
+        lines.append((False, 10, f"Express delivery: {pdf_money(totals['deliveryCharges'])}"))
+    if totals['editCharges']:
+        lines.append((False, 10, f"Additional edits: {pdf_money(totals['editCharges'])}"))
+    lines += [
+        (True, 11, f"Total: {pdf_money(totals['totalCost'])}"),
+        (False, 10, f"Advance: {pdf_money(totals['advanceAmount'])}"
+                    f"{' (paid)' if project.get('advancePaid') else ''}"),
+        (False, 10, f"Balance on delivery: {pdf_money(totals['finalAmount'])}"
+                    f"{' (paid)' if project.get('fullPaid') else ''}"),
+        (True, 11, f"Amount due: {pdf_money(totals['amountDue'])}"),
+        (False, 10, ''),
+        (False, 10, f'Please contact {PAYMENT_CONTACT} to complete your payment.'),
+    ]
+    return lines
+
+
+def render_pdf(project):
+    """A plain-text PDF of the bill, using only the built-in Helvetica fonts."""
+    pages, ops, y = [], [], PAGE_HEIGHT - MARGIN
+    for bold, size, text in _pdf_lines(project):
+        if y - size < MARGIN:
+            pages.append(ops)
+            ops, y = [], PAGE_HEIGHT - MARGIN
+        y -= size
+        if text:
+            ops.append(f"/{'F2' if bold else 'F1'} {size} Tf 1 0 0 1 {MARGIN} {y} Tm ({_pdf_text(text)}) Tj")
+        y -= size // 2
+    pages.append(ops)
+
+    # Objects: catalog, page tree, two fonts, then a page and its contents per page
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+            b' '.join(b'%d 0 R' % (5 + 2 * i) for i in range(len(pages))), len(pages)),
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>',
+    ]
+    for i, page_ops in enumerate(pages):
+        stream = '\n'.join(['BT', *page_ops, 'ET']).encode('latin-1')
+        objects.append(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] '
+                       b'/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>'
+                       % (PAGE_WIDTH, PAGE_HEIGHT, 6 + 2 * i))
+        objects.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream))
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    out += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%EOF\n' % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+# ---------------- cache ----------------
+def _render_to(path, project, fmt, template_dir):
+    """Render one bill into ``path`` unless it's there already. Runs in pool workers too."""
+    if not os.path.exists(path):
+        data = render_pdf(project) if fmt == 'pdf' else render_html(project, template_dir)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    return path
+
+
+class InvoiceRenderer:
+    def __init__(self, directory, template_dir, max_workers=None, max_files=5000, min_age=3600,
+                 trim_interval=60):
+        self.directory = os.path.abspath(directory)
+        self.template_dir = os.path.abspath(template_dir)
+        self.max_workers = max_workers
+        self.max_files = max_files
+        self.min_age = min_age  # younger files are kept, so a download never loses its file midway
+        self.trim_interval = trim_interval
+        self._pool = None
+        self._pool_pid = None
+        self._pool_lock = threading.Lock()
+        self._next_trim = 0.0
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.template_dir, 'invoice.html'), 'rb') as f:
+            self._template_hash = hashlib.sha256(f.read()).hexdigest()
+
+    def content_hash(self, project):
+        """Hash of what the bill shows, so an unchanged bill maps to the same file."""
+        billed = {field: project.get(field) for field in INVOICE_FIELDS}
+        digest = hashlib.sha256(self._template_hash.encode())
+        digest.update(json.dumps(billed, sort_keys=True, default=str).encode('utf-8'))
+        return digest.hexdigest()
+
+    def path(self, project, fmt):
+        return os.path.join(self.directory, f'{self.content_hash(project)}.{fmt}')
+
+    def is_cached(self, project, fmt):
+        return os.path.exists(self.path(project, fmt))
+
+    def render(self, project, fmt):
+        """Path of the bill in ``fmt``, rendering it here if it isn't cached."""
+        if fmt not in INVOICE_FORMATS:
+            raise ValueError(f'Unknown invoice format: {fmt}')
+        path = self.path(project, fmt)
+        if os.path.exists(path):
+            try:
+                os.utime(path)  # recently used: trimmed last
+            except FileNotFoundError:
+                pass
+        self._trim()
+        return _render_to(path, project, fmt, self.template_dir)
+
+    def _trim(self):
+        """Drop the least recently used bills beyond ``max_files``; runs at most every ``trim_interval``."""
+        now = time.monotonic()
+        if now < self._next_trim:
+            return
+        self._next_trim = now + self.trim_interval
+        cutoff = time.time() - self.min_age
+        files = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                files.append((os.path.getmtime(path), path))
+            except FileNotFoundError:
+                pass
+        files.sort()
+        for mtime, path in files[:max(len(files) - self.max_files, 0)]:
+            if mtime >= cutoff:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _executor(self):
+        # A pool inherited over fork belongs to the parent; each worker starts its own
+        with self._pool_lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                if 'forkserver' in multiprocessing.get_all_start_methods():
+                    context = multiprocessing.get_context('forkserver')
+                    # The server only needs the renderer, not the app that __main__ may
+                    # be. It imports from the working directory, where an 'invoices'
+                    # folder (INVOICE_DIR) would shadow this module unless it's here too
+                    here = os.path.dirname(os.path.abspath(__file__))
+                    context.set_forkserver_preload(['invoices'] if here == os.getcwd() else [])
+                else:
+                    context = multiprocessing.get_context('spawn')
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    @staticmethod
+    def _log_failure(future):
+        if not future.cancelled() and future.exception() is not None:
+            print(f"⚠️ Invoice rendering failed: {future.exception()}")
+
+    def submit(self, projects, fmt):
+        """Queue the bills that aren't cached yet on the process pool.
+
+        Returns at once with the futures of the queued renders; finished
+        files land in the cache, where any worker's download picks them up.
+        """
+        if fmt not in INVOICE_FORMATS:
+            raise ValueError(f'Unknown invoice format: {fmt}')
+        self._trim()
+        futures = []
+        for project in projects:
+            path = self.path(project, fmt)
+            if not os.path.exists(path):
+                future = self._executor().submit(_render_to, path, project, fmt, self.template_dir)
+                future.add_done_callback(self._log_failure)
+                futures.append(future)
+        return futures
@@ -0,0 +1,260 @@
+"""Prometheus metrics that are cheap enough to leave on in production.
+
+Each thread records into its own shard, so counting a request or timing a
+save is a couple of dict updates with no lock taken. Every worker folds its
+shards into ``<dir>/<pid>.json`` every ``flush_interval`` seconds from a
+background thread, and ``/metrics`` (served by whichever worker the scrape
+lands on) adds up all the workers' files, so the numbers cover the whole
+gunicorn server rather than one worker. When gunicorn reaps a worker its
+counters and histograms are folded into ``<dir>/exited.json`` so totals
+never go backwards; its gauges are dropped.
+
+Metrics are declared once at import time on the module-level ``registry``::
+
+    SAVE_SECONDS = registry.histogram('store_save_seconds', 'Writing a store', ('store',))
+    with SAVE_SECONDS.time('projects'):
+        ...
+"""
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds; suits anything from a cached read to a slow SMTP handshake
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+EXITED_FILE = 'exited.json'
+
+
+class Metric:
+    """A counter, gauge or histogram; label values are passed positionally."""
+
+    def __init__(self, registry, kind, name, help, labelnames=(), buckets=None):
+        self.registry = registry
+        self.kind = kind
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets) if buckets else None
+
+    def inc(self, *labels, amount=1):
+        shard = self.registry._shard()
+        key = (self.name, labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def observe(self, value, *labels):
+        shard = self.registry._shard()
+        key = (self.name, labels)
+        counts = shard.get(key)
+        if counts is None:
+            # One slot per bucket, one for +Inf, then the running sum
+            counts = shard[key] = [0] * (len(self.buckets) + 2)
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    @contextmanager
+    def time(self, *labels):
+        """Observe how long the block takes, in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+
+def _series(totals):
+    return [(name, labels, value) for (name, labels), value in totals.items()]
+
+
+def _merge(totals, series):
+    """Add ``[name, labels, value]`` series into ``totals``."""
+    for name, labels, value in series:
+        key = (name, tuple(labels))
+        current = totals.get(key)
+        if current is None:
+            totals[key] = list(value) if isinstance(value, list) else value
+        elif isinstance(value, list):
+            totals[key] = [a + b for a, b in zip(current, value)]
+        else:
+            totals[key] = current + value
+
+
+def _read_snapshot(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _write_snapshot(path, series, gauges=()):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'series': series, 'gauges': list(gauges)}, f)
+    os.replace(tmp_path, path)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = {}
+        self.directory = None
+        self.flush_interval = 5.0
+        self._local = threading.local()
+        self._shards = []   # (thread, its shard)
+        self._retired = {}  # what threads that have since exited recorded
+        self._shards_lock = threading.Lock()  # not taken on the recording path after a thread's first sample
+        self._thread = None
+        self._thread_pid = None
+
+    # ---------------- declaring ----------------
+    def _add(self, kind, name, help, labelnames, buckets=None):
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = Metric(self, kind, name, help, labelnames, buckets)
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self._add('counter', name, help, labelnames)
+
+    def gauge(self, name, help, labelnames=()):
+        return self._add('gauge', name, help, labelnames)
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._add('histogram', name, help, labelnames, buckets)
+
+    # ---------------- recording ----------------
+    def _shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._shards.append((threading.current_thread(), shard))
+            return shard
+
+    def snapshot(self):
+        """This worker's series as ``[name, labels, value]`` lists."""
+        with self._shards_lock:
+            # Servers that start a thread per request would otherwise pile up shards
+            live = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                else:
+                    _merge(self._retired, _series(shard))
+            self._shards = live
+            totals = {}
+            _merge(totals, _series(self._retired))
+        for _, shard in live:
+            # dict.copy() runs without releasing the GIL, so a thread
+            # recording at the same moment can't break the iteration
+            _merge(totals, _series(shard.copy()))
+        return [[name, list(labels), value] for name, labels, value in _series(totals)]
+
+    # ---------------- sharing between workers ----------------
+    def start(self, directory, flush_interval=5.0):
+        """Write this worker's snapshot to ``directory`` every ``flush_interval`` seconds.
+
+        Safe to call again after a fork: the child starts its own thread.
+        """
+        self.directory = directory
+        self.flush_interval = flush_interval
+        os.makedirs(directory, exist_ok=True)
+        if self._thread is not None and self._thread.is_alive() and self._thread_pid == os.getpid():
+            return
+        self._thread = threading.Thread(target=self._run, name='metrics-flush', daemon=True)
+        self._thread_pid = os.getpid()
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ Metrics flush failed: {e}")
+
+    def flush(self):
+        if self.directory is not None:
+            gauges = [name for name, metric in self.metrics.items() if metric.kind == 'gauge']
+            _write_snapshot(os.path.join(self.directory, f'{os.getpid()}.json'), self.snapshot(), gauges)
+
+    def collect(self):
+        """Series summed over every worker that has written a snapshot."""
+        if self.directory is None:
+            series = self.snapshot()
+        else:
+            self.flush()  # this worker's numbers as of now, not the last flush
+            series = []
+            for name in os.listdir(self.directory):
+                if name.endswith('.json'):
+                    series += _read_snapshot(os.path.join(self.directory, name)).get('series', [])
+        totals = {}
+        _merge(totals, series)
+        return totals
+
+    # ---------------- exposition ----------------
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        by_metric = {}
+        for (name, labels), value in self.collect().items():
+            by_metric.setdefault(name, []).append((labels, value))
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f'# HELP {name} {metric.help}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            for labels, value in sorted(by_metric.get(name, ())):
+                if metric.kind != 'histogram':
+                    lines.append(f'{name}{_labels(metric.labelnames, labels)} {_number(value)}')
+                    continue
+                cumulative = 0
+                for bound, count in zip(metric.buckets + ('+Inf',), value):
+                    cumulative += count
+                    le = 'le="%s"' % (bound if bound == '+Inf' else _number(float(bound)))
+                    lines.append(f'{name}_bucket{_labels(metric.labelnames, labels, le)} {cumulative}')
+                lines.append(f'{name}_sum{_labels(metric.labelnames, labels)} {_number(value[-1])}')
+                lines.append(f'{name}_count{_labels(metric.labelnames, labels)} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def mark_process_dead(directory, pid):
+    """Fold an exited worker's counters and histograms into ``exited.json``.
+
+    Called from gunicorn's ``child_exit`` hook in the master process, which
+    is the only writer of ``exited.json``. Gauges describe live state (such
+    as requests in flight), so the dead worker's are discarded.
+    """
+    path = os.path.join(directory, f'{pid}.json')
+    snapshot = _read_snapshot(path)
+    if not snapshot:
+        return
+    gauges = set(snapshot.get('gauges', ()))
+    exited_path = os.path.join(directory, EXITED_FILE)
+    totals = {}
+    _merge(totals, _read_snapshot(exited_path).get('series', []))
+    _merge(totals, [s for s in snapshot.get('series', []) if s[0] not in gauges])
+    _write_snapshot(exited_path, [[name, list(labels), value] for name, labels, value in _series(totals)])
+    os.remove(path)
@@ -0,0 +1,188 @@
+"""Persistent outbox for notification emails.
+
+Routes drop a message into ``OUTBOX_DIR`` and return straight away. A
+background thread in each worker drains the outbox over a single
+authenticated SMTP connection per batch and retries failed messages with
+exponential backoff. Workers claim a message by renaming its file, so two
+workers never send the same one.
+"""
+import json
+import os
+import smtplib
+import threading
+import time
+import uuid
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+
+from metrics import registry
+
+SMTP_SECONDS = registry.histogram('smtp_seconds', 'Time spent connecting to and sending over SMTP', ('operation',))
+EMAILS_TOTAL = registry.counter('outbox_emails_total', 'Outbox send attempts by outcome', ('result',))
+
+
+class EmailOutbox:
+    def __init__(self, directory, host, port, sender, password, use_tls=True,
+                 batch_size=50, max_attempts=8, base_backoff=30, max_backoff=3600,
+                 poll_interval=5.0, claim_timeout=600):
+        self.directory = directory
+        self.failed_directory = os.path.join(directory, 'failed')
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.password = password
+        self.use_tls = use_tls
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.poll_interval = poll_interval
+        self.claim_timeout = claim_timeout
+        self._wake = threading.Event()
+        self._thread = None
+        os.makedirs(self.failed_directory, exist_ok=True)
+
+    # ---------------- queueing ----------------
+    def _write(self, path, message):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(message, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def enqueue(self, to, subject, body):
+        """Store a message on disk for the background sender."""
+        message = {
+            'id': uuid.uuid4().hex,
+            'to': to,
+            'subject': subject,
+            'body': body,
+            'attempts': 0,
+            'nextAttempt': time.time(),
+            'lastError': None,
+        }
+        name = f"{time.time_ns()}-{message['id']}.json"
+        self._write(os.path.join(self.directory, name), message)
+        self._wake.set()
+        return message['id']
+
+    def pending_count(self):
+        return sum(1 for name in os.listdir(self.directory) if name.endswith('.json'))
+
+    # ---------------- sending ----------------
+    def start(self):
+        """Start the background sender thread for this worker (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name='email-outbox', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            try:
+                while self.drain_once() == self.batch_size:
+                    pass
+            except Exception as e:
+                print(f"⚠️ Email outbox error: {e}")
+
+    def _release_stale_claims(self):
+        """Put back messages claimed by a worker that died mid-send."""
+        now = time.time()
+        for name in os.listdir(self.directory):
+            if not name.endswith('.sending'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if now - os.path.getmtime(path) > self.claim_timeout:
+                    os.replace(path, os.path.join(self.directory, name.split('.json')[0] + '.json'))
+            except FileNotFoundError:
+                pass
+
+    def _claim_due(self):
+        self._release_stale_claims()
+        now = time.time()
+        claimed = []
+        for name in sorted(os.listdir(self.directory)):
+            if len(claimed) >= self.batch_size:
+                break
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path) as f:
+                    message = json.load(f)
+                if message.get('nextAttempt', 0) > now:
+                    continue
+                claim_path = f"{path}.{os.getpid()}.sending"
+                os.rename(path, claim_path)
+            except (FileNotFoundError, ValueError):
+                continue  # another worker claimed it first, or it's mid-write
+            os.utime(claim_path)
+            claimed.append((path, claim_path, message))
+        return claimed
+
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=30)
+        if self.use_tls:
+            server.starttls()
+        if self.password and server.has_extn('auth'):
+            server.login(self.sender, self.password)
+        return server
+
+    def _build(self, message):
+        msg = MIMEMultipart()
+        msg['From'] = self.sender
+        msg['To'] = message['to']
+        msg['Subject'] = message['subject']
+        msg.attach(MIMEText(message['body'], 'plain'))
+        return msg
+
+    def _retry_later(self, path, claim_path, message, error):
+        message['attempts'] += 1
+        message['lastError'] = str(error)
+        if message['attempts'] >= self.max_attempts:
+            self._write(os.path.join(self.failed_directory, os.path.basename(path)), message)
+            EMAILS_TOTAL.inc('failed')
+            print(f"❌ Giving up on email {message['id']} after {message['attempts']} attempts: {error}")
+        else:
+            delay = min(self.base_backoff * 2 ** (message['attempts'] - 1), self.max_backoff)
+            message['nextAttempt'] = time.time() + delay
+            self._write(path, message)
+            EMAILS_TOTAL.inc('retry')
+        os.remove(claim_path)
+
+    def drain_once(self):
+        """Send every due message over one SMTP connection; returns how many
+        messages were claimed."""
+        claimed = self._claim_due()
+        if not claimed:
+            return 0
+        server = None
+        for index, (path, claim_path, message) in enumerate(claimed):
+            try:
+                if server is None:
+                    with SMTP_SECONDS.time('connect'):
+                        server = self._connect()
+                with SMTP_SECONDS.time('send'):
+                    server.send_message(self._build(message))
+            except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, OSError) as e:
+                # Connection-level failure: the rest of the batch would fail too
+                for remaining in claimed[index:]:
+                    self._retry_later(*remaining, e)
+                server = None
+                break
+            except smtplib.SMTPException as e:
+                self._retry_later(path, claim_path, message, e)
+                continue
+            os.remove(claim_path)
+            EMAILS_TOTAL.inc('sent')
+            print("✅ Email sent successfully.")
+        if server is not None:
+            try:
+                server.quit()
+            except smtplib.SMTPException:
+                pass
+        return len(claimed)
@@ -0,0 +1,177 @@
+"""On-demand profiling of live requests.
+
+An admin switches profiling on with a sample rate; the setting lives in
+``<dir>/settings.json`` so every gunicorn worker follows it, and workers
+re-read it at most every ``reload_interval`` seconds. While it is on, each
+sampled request runs under cProfile and a summary (route, duration and the
+functions it spent most time in) is written to ``<dir>/profiles/``, along
+with the raw ``.prof`` for ``python -m pstats`` or snakeviz. Only the newest
+``max_profiles`` are kept. While it is off, a request costs a single clock
+comparison.
+"""
+import cProfile
+import json
+import os
+import pstats
+import random
+import threading
+import time
+from datetime import datetime
+
+
+class RequestProfiler:
+    def __init__(self, directory, max_profiles=200, top_functions=15, reload_interval=1.0):
+        directory = os.path.abspath(directory)  # send_file resolves relative paths against the app
+        self.profile_directory = os.path.join(directory, 'profiles')
+        self.settings_path = os.path.join(directory, 'settings.json')
+        self.max_profiles = max_profiles
+        self.top_functions = top_functions
+        self.reload_interval = reload_interval
+        self._settings = {'enabled': False, 'sampleRate': 0.0}
+        self._next_reload = 0.0
+        # cProfile can only run in one thread at a time on newer Pythons,
+        # and one profiled request per worker is plenty anyway
+        self._busy = threading.Lock()
+        os.makedirs(self.profile_directory, exist_ok=True)
+
+    # ---------------- settings ----------------
+    def settings(self):
+        now = time.monotonic()
+        if now >= self._next_reload:
+            self._next_reload = now + self.reload_interval
+            try:
+                with open(self.settings_path) as f:
+                    self._settings = json.load(f)
+            except (FileNotFoundError, ValueError):
+                pass
+        return self._settings
+
+    def configure(self, enabled, sample_rate=None):
+        """Switch profiling on or off for every worker; raises ValueError for bad input."""
+        if not isinstance(enabled, bool):
+            raise ValueError('enabled must be true or false')
+        if sample_rate is None:
+            sample_rate = self.settings().get('sampleRate') or 0.01
+        if isinstance(sample_rate, bool) or not isinstance(sample_rate, (int, float)) or not 0 < sample_rate <= 1:
+            raise ValueError('sampleRate must be a fraction between 0 and 1')
+        settings = {
+            'enabled': enabled,
+            'sampleRate': sample_rate,
+            'updatedAt': datetime.now().isoformat(),
+        }
+        tmp_path = f"{self.settings_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(settings, f)
+        os.replace(tmp_path, self.settings_path)
+        self._settings = settings
+        self._next_reload = time.monotonic() + self.reload_interval
+        return settings
+
+    # ---------------- profiling requests ----------------
+    def begin(self):
+        """A running profiler if this request is sampled, else None."""
+        settings = self.settings()
+        if not settings.get('enabled') or random.random() >= settings.get('sampleRate', 0):
+            return None
+        if not self._busy.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:  # another profiler is already active in this process
+            self._busy.release()
+            return None
+        profile.started_at = datetime.now().isoformat()
+        profile.started = time.perf_counter()
+        return profile
+
+    def finish(self, profile, method, route, path, status):
+        """Stop ``profile`` and save what it recorded."""
+        profile.disable()
+        duration = time.perf_counter() - profile.started
+        self._busy.release()
+        try:
+            self._save(profile, {
+                'method': method,
+                'route': route,
+                'path': path,
+                'status': status,
+                'duration': round(duration, 6),
+                'startedAt': profile.started_at,
+            })
+        except Exception as e:
+            print(f"⚠️ Could not save request profile: {e}")
+
+    def _top(self, profile):
+        stats = pstats.Stats(profile).stats
+        hottest = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:self.top_functions]
+        return [{
+            'function': name,
+            'file': filename,
+            'line': line,
+            'calls': calls,
+            'ownTime': round(own, 6),
+            'totalTime': round(total, 6),
+        } for (filename, line, name), (_, calls, own, total, _) in hottest]
+
+    def _save(self, profile, entry):
+        name = f'{time.time_ns()}-{os.getpid()}'
+        entry['id'] = name
+        entry['functions'] = self._top(profile)
+        profile.dump_stats(os.path.join(self.profile_directory, name + '.prof'))
+        path = os.path.join(self.profile_directory, name + '.json')
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+        self._trim()
+
+    def _trim(self):
+        """Drop the oldest profiles beyond ``max_profiles``."""
+        names = sorted(n[:-5] for n in os.listdir(self.profile_directory) if n.endswith('.json'))
+        for name in names[:-self.max_profiles]:
+            for suffix in ('.json', '.prof'):
+                try:
+                    os.remove(os.path.join(self.profile_directory, name + suffix))
+                except FileNotFoundError:
+                    pass
+
+    # ---------------- reading ----------------
+    def profiles(self):
+        entries = []
+        for name in os.listdir(self.profile_directory):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.profile_directory, name)) as f:
+                    entries.append(json.load(f))
+            except (FileNotFoundError, ValueError):
+                continue  # trimmed by another worker meanwhile
+        return entries
+
+    def summary(self, limit=20):
+        """The slowest kept requests with their hottest functions, and the
+        functions that took the most time across all of them."""
+        entries = self.profiles()
+        totals = {}
+        for entry in entries:
+            for fn in entry['functions']:
+                key = (fn['file'], fn['line'], fn['function'])
+                total = totals.setdefault(key, {'function': fn['function'], 'file': fn['file'], 'line': fn['line'],
+                                                'ownTime': 0.0, 'requests': 0})
+                total['ownTime'] += fn['ownTime']
+                total['requests'] += 1
+        hottest = sorted(totals.values(), key=lambda fn: fn['ownTime'], reverse=True)[:limit]
+        for fn in hottest:
+            fn['ownTime'] = round(fn['ownTime'], 6)
+        return {
+            'settings': self.settings(),
+            'profiled': len(entries),
+            'slowest': sorted(entries, key=lambda e: e['duration'], reverse=True)[:limit],
+            'hottestFunctions': hottest,
+        }
+
+    def profile_path(self, profile_id):
+        """Path of the raw ``.prof`` for ``profile_id``, or None."""
+        path = os.path.join(self.profile_directory, os.path.basename(profile_id) + '.prof')
+        return path if os.path.exists(path) else None
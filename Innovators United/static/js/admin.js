@@ -0,0 +1,778 @@
+let currentProjectId = null;
+let allProjects = [];
+let newProjects = [];
+let changeCursor = null;
+let nextPageCursor = null;
+let newestCreatedAt = '';
+let filterTimer = null;
+const PAGE_SIZE = 50;
+
+// Load projects on page load
+document.addEventListener('DOMContentLoaded', function() {
+    loadProjects();
+    initializeAdminSearch();
+    requestNotificationPermission();
+    startProjectPolling();
+    subscribeToProjectEvents();
+});
+
+function initializeAdminSearch() {
+    const searchInput = document.getElementById('adminSearch');
+    searchInput.addEventListener('input', filterProjects);
+}
+
+function projectQuery(cursor) {
+    // Search and filters run on the server, one page at a time
+    const params = new URLSearchParams({limit: PAGE_SIZE, sort: '-createdAt'});
+    const searchTerm = document.getElementById('adminSearch').value.trim();
+    const statusFilter = document.getElementById('statusFilter').value;
+    const paymentFilter = document.getElementById('paymentFilter').value;
+    if (searchTerm) params.set('q', searchTerm);
+    if (statusFilter) params.set('status', statusFilter);
+    if (paymentFilter) params.set('paymentStatus', paymentFilter);
+    if (cursor) params.set('cursor', cursor);
+    return '/api/projects?' + params.toString();
+}
+
+function rememberNewest(projects) {
+    projects.forEach(p => {
+        if (p.createdAt && p.createdAt > newestCreatedAt) newestCreatedAt = p.createdAt;
+    });
+}
+
+function updateLoadMore() {
+    document.getElementById('loadMoreProjects').style.display = nextPageCursor ? '' : 'none';
+}
+
+function loadProjects() {
+    fetch(projectQuery())
+        .then(response => {
+            changeCursor = parseInt(response.headers.get('X-Change-Cursor') || '0', 10);
+            return response.json();
+        })
+        .then(data => {
+            allProjects = data.projects;
+            nextPageCursor = data.nextCursor;
+            rememberNewest(allProjects);
+            displayProjects(allProjects);
+            updateLoadMore();
+            updateStats();
+            updateNotificationCount();
+        })
+        .catch(error => {
+            console.error('Error loading projects:', error);
+            document.getElementById('projectsTable').innerHTML = `
+                <tr>
+                    <td colspan="11" class="error-row">
+                        <i class="fas fa-exclamation-triangle"></i>
+                        Error loading projects. Please try again.
+                    </td>
+                </tr>
+            `;
+        });
+}
+
+function loadMoreProjects() {
+    if (!nextPageCursor) return;
+    fetch(projectQuery(nextPageCursor))
+        .then(response => response.json())
+        .then(data => {
+            allProjects = allProjects.concat(data.projects);
+            nextPageCursor = data.nextCursor;
+            displayProjects(allProjects);
+            updateLoadMore();
+        })
+        .catch(error => console.error('Error loading more projects:', error));
+}
+
+function showNewProjectsNotification(newProjects) {
+    if (newProjects.length > 0) {
+        // Play notification sound
+        playNotificationSound();
+
+        // Show browser notification
+        showBrowserNotification(`New Project: ${newProjects[0].websiteName}`);
+
+        // Show toast notification
+        showNotificationToast(newProjects[0]);
+
+        // Add to new projects list
+        newProjects.forEach(project => {
+            if (!newProjects.find(p => p.id === project.id)) {
+                newProjects.push(project);
+            }
+        });
+    }
+}
+
+function showNotificationToast(project) {
+    const toast = document.getElementById('notificationToast');
+    const projectName = document.getElementById('toastProjectName');
+
+    projectName.textContent = project.websiteName;
+    toast.classList.add('show');
+
+    // Auto hide after 5 seconds
+    setTimeout(() => {
+        hideNotificationToast();
+    }, 5000);
+}
+
+function hideNotificationToast() {
+    const toast = document.getElementById('notificationToast');
+    toast.classList.remove('show');
+}
+
+function playNotificationSound() {
+    const sound = document.getElementById('notificationSound');
+    sound.play().catch(e => console.log('Audio play failed:', e));
+}
+
+function showBrowserNotification(message) {
+    if ('Notification' in window && Notification.permission === 'granted') {
+        new Notification('Innovators United - Admin', {
+            body: message,
+            icon: '/static/favicon.ico',
+            tag: 'new-project'
+        });
+    }
+}
+
+function requestNotificationPermission() {
+    if ('Notification' in window && Notification.permission === 'default') {
+        Notification.requestPermission();
+    }
+}
+
+function startProjectPolling() {
+    // Check for new projects every 30 seconds
+    setInterval(pollProjectChanges, 30000);
+}
+
+function subscribeToProjectEvents() {
+    // Server push: fetch the delta as soon as any worker reports a change.
+    // The 30 second poll stays as a fallback if the stream drops.
+    if (!('EventSource' in window)) return;
+    const events = new EventSource('/api/events');
+    ['project_created', 'project_updated', 'payment_updated', 'bill_generated'].forEach(type => {
+        events.addEventListener(type, pollProjectChanges);
+    });
+    // Catch up on anything missed while reconnecting
+    events.addEventListener('open', pollProjectChanges);
+}
+
+function pollProjectChanges() {
+    // Only fetch projects created or modified since the last cursor
+    if (changeCursor === null) {
+        loadProjects();
+        return;
+    }
+    fetch('/api/projects?since=' + changeCursor)
+        .then(response => response.json())
+        .then(data => {
+            changeCursor = data.cursor;
+            if (data.projects.length === 0 && data.removed.length === 0) return;
+
+            if (data.removed.length > 0) {
+                // Deleted, or moved to the archive
+                const removed = new Set(data.removed);
+                allProjects = allProjects.filter(p => !removed.has(p.id));
+                newProjects = newProjects.filter(p => !removed.has(p.id));
+            }
+
+            const added = data.projects.filter(p => p.createdAt && p.createdAt > newestCreatedAt);
+            rememberNewest(data.projects);
+
+            if (added.length > 0) {
+                // New rows belong at the top of the current view
+                showNewProjectsNotification(added);
+                loadProjects();
+                return;
+            }
+            data.projects.forEach(project => {
+                const index = allProjects.findIndex(p => p.id === project.id);
+                if (index !== -1) allProjects[index] = project;
+            });
+            displayProjects(allProjects);
+            updateStats();
+            updateNotificationCount();
+        })
+        .catch(error => console.error('Error polling projects:', error));
+}
+
+function updateNotificationCount() {
+    const count = newProjects.length;
+    const countElement = document.getElementById('notificationCount');
+    const bell = document.getElementById('notificationBell');
+
+    countElement.textContent = count;
+
+    if (count > 0) {
+        bell.classList.add('has-notifications');
+    } else {
+        bell.classList.remove('has-notifications');
+    }
+}
+
+function displayProjects(projects) {
+    const table = document.getElementById('projectsTable');
+
+    if (projects.length === 0) {
+        table.innerHTML = `
+            <tr>
+                <td colspan="11" class="empty-row">
+                    <i class="fas fa-folder-open"></i>
+                    No projects found
+                </td>
+            </tr>
+        `;
+        return;
+    }
+
+    table.innerHTML = projects.map(project => `
+        <tr>
+            <td><strong>${project.id}</strong></td>
+            <td>${project.userName}</td>
+            <td>${project.username}</td>
+            <td>${project.userPhone}</td>
+            <td>${project.websiteName}</td>
+            <td><span class="type-badge">${project.websiteType}</span></td>
+            <td class="amount">₹${project.totalCost.toLocaleString('en-IN')}</td>
+            <td>${project.deliveryDate}</td>
+            <td><span class="status-badge status-${project.status}">${project.status}</span></td>
+            <td>
+                <span class="payment-badge payment-${project.paymentStatus}">${project.paymentStatus}</span>
+                ${project.advancePaid ? '<i class="fas fa-check-circle text-success" title="Advance Paid"></i>' : ''}
+                ${project.fullPaid ? '<i class="fas fa-check-double text-success" title="Full Payment Done"></i>' : ''}
+            </td>
+            <td class="actions">
+                <button class="btn btn-sm btn-primary" onclick="viewProjectDetails('${project.id}')" title="View Details">
+                    <i class="fas fa-eye"></i>
+                </button>
+                <button class="btn btn-sm btn-warning" onclick="editProject('${project.id}')" title="Manage Project">
+                    <i class="fas fa-edit"></i>
+                </button>
+                ${project.billGenerated ? `
+                <button class="btn btn-sm btn-success" onclick="viewBill('${project.id}')" title="View Bill">
+                    <i class="fas fa-file-invoice"></i>
+                </button>
+                ` : ''}
+            </td>
+        </tr>
+    `).join('');
+
+    document.getElementById('tableCount').textContent = `Showing ${projects.length} projects`;
+}
+
+function filterProjects() {
+    // Debounce typing so each keystroke doesn't start a request
+    clearTimeout(filterTimer);
+    filterTimer = setTimeout(loadProjects, 250);
+}
+
+function clearAdminSearch() {
+    document.getElementById('adminSearch').value = '';
+    document.getElementById('statusFilter').value = '';
+    document.getElementById('paymentFilter').value = '';
+    filterProjects();
+}
+
+function updateStats() {
+    // Totals are maintained on the server; no need to walk the project list
+    fetch('/api/projects/stats')
+        .then(response => response.json())
+        .then(stats => {
+            document.getElementById('totalProjects').textContent = stats.total;
+            document.getElementById('pendingProjects').textContent = stats.pending;
+            document.getElementById('inProgressProjects').textContent = stats.inProgress;
+            document.getElementById('completedProjects').textContent = stats.completed;
+            document.getElementById('totalRevenue').textContent = `₹${stats.revenue.toLocaleString('en-IN')}`;
+            document.getElementById('totalClients').textContent = stats.clients;
+        })
+        .catch(error => console.error('Error loading stats:', error));
+}
+
+function refreshProjects() {
+    loadProjects();
+    showNotification('Projects refreshed successfully!');
+}
+
+function exportProjects() {
+    // Simple export functionality - in real app, this would generate CSV/Excel
+    const dataStr = JSON.stringify(allProjects, null, 2);
+    const dataBlob = new Blob([dataStr], {type: 'application/json'});
+    const url = URL.createObjectURL(dataBlob);
+    const link = document.createElement('a');
+    link.href = url;
+    link.download = `projects-export-${new Date().toISOString().split('T')[0]}.json`;
+    document.body.appendChild(link);
+    link.click();
+    document.body.removeChild(link);
+    URL.revokeObjectURL(url);
+
+    showNotification('Projects exported successfully!');
+}
+
+function viewProjectDetails(projectId) {
+    fetch('/api/projects/' + projectId)
+        .then(response => response.json())
+        .then(project => {
+            const content = document.getElementById('projectDetailsContent');
+            content.innerHTML = `
+                <div class="project-detail-view">
+                    <div class="detail-header">
+                        <h3 style="color: var(--primary); margin-bottom: 1rem;">Project Information</h3>
+                    </div>
+
+                    <div class="detail-grid">
+                        <div class="detail-section">
+                            <h4>Client Information</h4>
+                            <div class="detail-item">
+                                <label>Name:</label>
+                                <span>${project.userName}</span>
+                            </div>
+                            <div class="detail-item">
+                                <label>Username:</label>
+                                <span>${project.username}</span>
+                            </div>
+                            <div class="detail-item">
+                                <label>Email:</label>
+                                <span>${project.userEmail}</span>
+                            </div>
+                            <div class="detail-item">
+                                <label>Phone:</label>
+                                <span>${project.userPhone}</span>
+                            </div>
+                            <div class="detail-item">
+                                <label>Project ID:</label>
+                                <span class="project-id">${project.id}</span>
+                            </div>
+                        </div>
+                        <div class="detail-section">
+                            <h4>Project Details</h4>
+                            <div class="detail-item">
+                                <label>Website Name:</label>
+                                <span>${project.websiteName}</span>
+                            </div>
+                            <div class="detail-item">
+                                <label>Type:</label>
+                                <span>${project.websiteType}</span>
+                            </div>
+                            <div class="detail-item">
+                                <label>Complexity:</label>
+                                <span>${project.complexity}</span>
+                            </div>
+                            <div class="detail-item">
+                                <label>Total Cost:</label>
+                                <span class="price">₹${project.totalCost}</span>
+                            </div>
+                            <div class="detail-item">
+                                <label>Advance Amount:</label>
+                                <span class="price">₹${project.advanceAmount || project.totalCost * 0.5}</span>
+                            </div>
+                            <div class="detail-item">
+                                <label>Delivery Date:</label>
+                                <span>${project.deliveryDate}</span>
+                            </div>
+                            <div class="detail-item">
+                                <label>Status:</label>
+                                <span class="status-badge status-${project.status}">${project.status}</span>
+                            </div>
+                        </div>
+                    </div>
+
+                    <!-- Payment Status -->
+                    <div class="payment-info-section">
+                        <h4>Payment Information</h4>
+                        <div class="payment-status-grid">
+                            <div class="payment-status-item ${project.advancePaid ? 'paid' : 'pending'}">
+                                <i class="fas ${project.advancePaid ? 'fa-check-circle' : 'fa-clock'}"></i>
+                                <div>
+                                    <strong>Advance Payment</strong>
+                                    <span>₹${project.advanceAmount || project.totalCost * 0.5}</span>
+                                    <small>${project.advancePaid ? 'Paid' : 'Pending'}</small>
+                                </div>
+                            </div>
+                            <div class="payment-status-item ${project.fullPaid ? 'paid' : 'pending'}">
+                                <i class="fas ${project.fullPaid ? 'fa-check-circle' : 'fa-clock'}"></i>
+                                <div>
+                                    <strong>Full Payment</strong>
+                                    <span>₹${project.totalCost - (project.advanceAmount || project.totalCost * 0.5)}</span>
+                                    <small>${project.fullPaid ? 'Paid' : 'Pending'}</small>
+                                </div>
+                            </div>
+                        </div>
+                    </div>
+
+                    <div class="description-section">
+                        <h4>Website Requirements Description:</h4>
+                        <div class="description-content">
+                            <p>${project.description}</p>
+                        </div>
+                    </div>
+
+                    ${project.attachments && project.attachments.length > 0 ? `
+                    <div class="attachments-section">
+                        <h4>Attachments (${project.attachments.length})</h4>
+                        <div class="attachments-list">
+                            ${project.attachments.map(att => `
+                                <div class="attachment-item">
+                                    <i class="fas ${getFileIcon(att.type)}"></i>
+                                    <div class="attachment-info">
+                                        <div class="attachment-name">${att.id ? `<a href="/api/attachments/${att.id}">${att.name}</a>` : att.name}</div>
+                                        <div class="attachment-size">${att.size}</div>
+                                    </div>
+                                </div>
+                            `).join('')}
+                        </div>
+                    </div>
+                    ` : ''}
+
+                    <div class="cost-section">
+                        <h4>Cost Breakdown</h4>
+                        <div class="cost-breakdown">
+                            <div class="cost-item">
+                                <span>Base Cost:</span>
+                                <span>₹${project.totalCost - project.editCharges - project.deliveryCharges}</span>
+                            </div>
+                            ${project.deliveryCharges > 0 ? `
+                            <div class="cost-item">
+                                <span>Express Delivery:</span>
+                                <span>₹${project.deliveryCharges}</span>
+                            </div>
+                            ` : ''}
+                            ${project.editCharges > 0 ? `
+                            <div class="cost-item">
+                                <span>Additional Edits:</span>
+                                <span>₹${project.editCharges}</span>
+                            </div>
+                            ` : ''}
+                            <div class="cost-total">
+                                <span>Total Amount:</span>
+                                <span>₹${project.totalCost}</span>
+                            </div>
+                        </div>
+                    </div>
+                </div>
+            `;
+
+            document.getElementById('projectModal').style.display = 'flex';
+        });
+}
+
+function closeProjectModal() {
+    document.getElementById('projectModal').style.display = 'none';
+}
+
+function editProject(projectId) {
+    currentProjectId = projectId;
+
+    fetch('/api/projects/' + projectId)
+        .then(response => response.json())
+        .then(project => {
+            document.getElementById('editStatus').value = project.status;
+            document.getElementById('editPayment').value = project.paymentStatus;
+            document.getElementById('editUrl').value = project.websiteUrl || '';
+
+            // Update payment buttons and status
+            updatePaymentUI(project);
+
+            document.getElementById('editModal').style.display = 'flex';
+        });
+}
+
+function updatePaymentUI(project) {
+    const advanceBtn = document.getElementById('advancePaymentBtn');
+    const fullBtn = document.getElementById('fullPaymentBtn');
+    const statusInfo = document.getElementById('paymentStatusInfo');
+
+    // Update button states
+    if (project.advancePaid) {
+        advanceBtn.innerHTML = '<i class="fas fa-check-circle"></i> Advance Paid';
+        advanceBtn.disabled = true;
+        advanceBtn.classList.remove('btn-warning');
+        advanceBtn.classList.add('btn-success');
+    } else {
+        advanceBtn.innerHTML = '<i class="fas fa-money-bill-wave"></i> Mark Advance Paid';
+        advanceBtn.disabled = false;
+        advanceBtn.classList.remove('btn-success');
+        advanceBtn.classList.add('btn-warning');
+    }
+
+    if (project.fullPaid) {
+        fullBtn.innerHTML = '<i class="fas fa-check-double"></i> Full Payment Done';
+        fullBtn.disabled = true;
+        fullBtn.classList.remove('btn-success');
+        fullBtn.classList.add('btn-primary');
+    } else {
+        fullBtn.innerHTML = '<i class="fas fa-check-circle"></i> Mark Full Payment';
+        fullBtn.disabled = false;
+        fullBtn.classList.remove('btn-primary');
+        fullBtn.classList.add('btn-success');
+    }
+
+    // Update status info
+    statusInfo.innerHTML = `
+        <p><strong>Advance:</strong> <span class="${project.advancePaid ? 'text-success' : 'text-warning'}">${project.advancePaid ? 'Paid' : 'Pending'}</span></p>
+        <p><strong>Full Payment:</strong> <span class="${project.fullPaid ? 'text-success' : 'text-warning'}">${project.fullPaid ? 'Paid' : 'Pending'}</span></p>
+        <p><strong>Total Amount:</strong> ₹${project.totalCost}</p>
+        <p><strong>Advance Amount:</strong> ₹${project.advanceAmount || project.totalCost * 0.5}</p>
+    `;
+}
+
+function closeEditModal() {
+    document.getElementById('editModal').style.display = 'none';
+}
+
+function markAdvancePaid(projectId) {
+    if (confirm('Mark advance payment as paid?')) {
+        fetch('/api/projects/' + projectId + '/payment', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({
+                type: 'advance'
+            })
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                showNotification('Advance payment marked as paid!');
+                loadProjects();
+                // Refresh the current project data
+                if (currentProjectId === projectId) {
+                    editProject(projectId);
+                }
+            } else {
+                alert('Error: ' + data.error);
+            }
+        });
+    }
+}
+
+function markFullPaid(projectId) {
+    if (confirm('Mark full payment as paid?')) {
+        fetch('/api/projects/' + projectId + '/payment', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({
+                type: 'full'
+            })
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                showNotification('Full payment marked as paid!');
+                loadProjects();
+                // Refresh the current project data
+                if (currentProjectId === projectId) {
+                    editProject(projectId);
+                }
+            } else {
+                alert('Error: ' + data.error);
+            }
+        });
+    }
+}
+
+function generateBill() {
+    const websiteUrl = document.getElementById('editUrl').value;
+
+    if (!websiteUrl) {
+        alert('Please enter website URL before generating bill');
+        return;
+    }
+
+    fetch('/api/projects/' + currentProjectId + '/bill', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({
+            websiteUrl: websiteUrl
+        })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            showNotification('Bill generated successfully!');
+            loadProjects();
+            closeEditModal();
+        } else {
+            alert('Error generating bill: ' + data.error);
+        }
+    })
+    .catch(error => {
+        alert('Error generating bill. Please try again.');
+    });
+}
+
+function viewBill(projectId) {
+    fetch('/api/projects/' + projectId)
+        .then(response => response.json())
+        .then(project => {
+            const billContent = document.getElementById('projectDetailsContent');
+            billContent.innerHTML = `
+                <div class="bill-container">
+                    <div class="bill-header">
+                        <h2>INNOVATORS UNITED WEB PRO</h2>
+                        <p>Website Development Bill</p>
+                    </div>
+
+                    <div class="bill-details">
+                        <div>
+                            <h4>Client Information</h4>
+                            <p><strong>Name:</strong> ${project.userName}</p>
+                            <p><strong>Username:</strong> ${project.username}</p>
+                            <p><strong>Email:</strong> ${project.userEmail}</p>
+                            <p><strong>Phone:</strong> ${project.userPhone}</p>
+                            <p><strong>Project ID:</strong> ${project.id}</p>
+                        </div>
+                        <div>
+                            <h4>Project Details</h4>
+                            <p><strong>Date:</strong> ${new Date(project.createdAt).toLocaleDateString()}</p>
+                            <p><strong>Website:</strong> ${project.websiteName}</p>
+                            <p><strong>Type:</strong> ${project.websiteType}</p>
+                            <p><strong>Delivery:</strong> ${project.deliveryDate}</p>
+                        </div>
+                    </div>
+
+                    <div style="margin: 1rem 0;">
+                        <h4>Website Requirements:</h4>
+                        <div style="background: #f8f9fa; padding: 1rem; border-radius: 5px;">
+                            ${project.description}
+                        </div>
+                    </div>
+
+                    <div class="bill-items">
+                        <div class="bill-item">
+                            <span>Base Cost (${project.complexity}):</span>
+                            <span>₹${project.totalCost - project.editCharges - project.deliveryCharges}</span>
+                        </div>
+                        ${project.deliveryCharges > 0 ? `
+                        <div class="bill-item">
+                            <span>Express Delivery Charges:</span>
+                            <span>₹${project.deliveryCharges}</span>
+                        </div>
+                        ` : ''}
+                        ${project.editCharges > 0 ? `
+                        <div class="bill-item">
+                            <span>Additional Edits (${project.editCount - 2} x ₹5,000):</span>
+                            <span>₹${project.editCharges}</span>
+                        </div>
+                        ` : ''}
+                        <div class="bill-item bill-total">
+                            <span>Total Amount:</span>
+                            <span>₹${project.totalCost}</span>
+                        </div>
+                    </div>
+
+                    <div class="payment-instructions">
+                        <h4><i class="fas fa-phone"></i> Payment Instructions</h4>
+                        <p>Please contact <strong>9448749572</strong> to complete your payment.</p>
+                        <p>Project will be delivered by: <strong>${project.deliveryDate}</strong></p>
+                        ${project.websiteUrl ? `<p>Website URL: <a href="${project.websiteUrl}" target="_blank">${project.websiteUrl}</a></p>` : ''}
+                    </div>
+
+                    <div class="form-actions">
+                        <a class="btn btn-primary" href="/api/projects/${project.id}/invoice?format=pdf">
+                            <i class="fas fa-file-pdf"></i>
+                            Download PDF
+                        </a>
+                        <a class="btn btn-outline" href="/api/projects/${project.id}/invoice?format=html" target="_blank">
+                            <i class="fas fa-print"></i>
+                            Printable Bill
+                        </a>
+                    </div>
+                </div>
+            `;
+
+            document.getElementById('projectModal').style.display = 'flex';
+        })
+        .catch(error => {
+            alert('Error loading bill details.');
+        });
+}
+
+document.getElementById('editForm').addEventListener('submit', function(e) {
+    e.preventDefault();
+
+    const status = document.getElementById('editStatus').value;
+    const paymentStatus = document.getElementById('editPayment').value;
+    const url = document.getElementById('editUrl').value;
+
+    fetch('/api/projects/' + currentProjectId, {
+        method: 'PUT',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({
+            status: status,
+            paymentStatus: paymentStatus,
+            websiteUrl: url
+        })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            showNotification('Project updated successfully!');
+            closeEditModal();
+            loadProjects();
+        } else {
+            alert('Error updating project: ' + data.error);
+        }
+    })
+    .catch(error => {
+        alert('Error updating project. Please try again.');
+    });
+});
+
+function getFileIcon(type) {
+    if (type.startsWith('image/')) return 'fa-file-image';
+    if (type === 'application/pdf') return 'fa-file-pdf';
+    if (type.includes('word') || type.includes('document')) return 'fa-file-word';
+    if (type === 'application/zip') return 'fa-file-archive';
+    return 'fa-file';
+}
+
+function showNotification(message) {
+    // Create notification element
+    const notification = document.createElement('div');
+    notification.className = 'notification success';
+    notification.innerHTML = `
+        <i class="fas fa-check-circle"></i>
+        <span>${message}</span>
+        <button onclick="this.parentElement.remove()" class="notification-close">&times;</button>
+    `;
+    document.body.appendChild(notification);
+
+    setTimeout(() => {
+        if (notification.parentElement) {
+            notification.remove();
+        }
+    }, 5000);
+}
+
+// Close modals when clicking outside
+window.onclick = function(event) {
+    const projectModal = document.getElementById('projectModal');
+    const editModal = document.getElementById('editModal');
+
+    if (event.target === projectModal) {
+        closeProjectModal();
+    }
+    if (event.target === editModal) {
+        closeEditModal();
+    }
+}
+
+// Notification bell click handler
+document.getElementById('notificationBell').addEventListener('click', function() {
+    // Clear notifications
+    newProjects = [];
+    updateNotificationCount();
+    hideNotificationToast();
+});
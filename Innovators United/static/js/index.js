@@ -0,0 +1,371 @@
+// Session details the template renders into #pageData
+const pageData = JSON.parse(document.getElementById('pageData').textContent);
+
+let uploadedFiles = [];
+// Sent with every attempt at submitting this form, so a double click or
+// retry is answered with the first submission instead of a duplicate
+const submissionKey = Date.now().toString(36) + '-' + Math.random().toString(36).slice(2);
+
+// Check if user is logged in and adjust menu
+function checkAuthStatus() {
+    const authButtons = document.getElementById('authButtons');
+    const userInfo = document.getElementById('userInfo');
+    const userNameDisplay = document.getElementById('userNameDisplay');
+
+    const isLoggedIn = Boolean(pageData.username);
+    const username = pageData.username;
+
+    if (isLoggedIn && username) {
+        authButtons.style.display = 'none';
+        userInfo.style.display = 'flex';
+        userNameDisplay.textContent = username;
+    } else {
+        authButtons.style.display = 'flex';
+        userInfo.style.display = 'none';
+    }
+}
+
+// Section navigation
+function showSection(sectionId) {
+    // Hide all sections
+    document.querySelectorAll('.page-section').forEach(section => {
+        section.classList.remove('active');
+    });
+
+    // Remove active class from all nav links
+    document.querySelectorAll('.nav-link').forEach(link => {
+        link.classList.remove('active');
+    });
+
+    // Show selected section
+    document.getElementById(sectionId).classList.add('active');
+
+    // Add active class to clicked nav link
+    event.currentTarget.classList.add('active');
+
+    // Close mobile menu if open
+    document.getElementById('navToggle').classList.remove('active');
+    document.getElementById('navMenu').classList.remove('active');
+
+    // Scroll to top
+    window.scrollTo(0, 0);
+}
+
+// Mobile menu toggle
+document.getElementById('navToggle').addEventListener('click', function() {
+    this.classList.toggle('active');
+    document.getElementById('navMenu').classList.toggle('active');
+});
+
+// File upload functionality
+const dropZone = document.getElementById('dropZone');
+const fileInput = document.createElement('input');
+fileInput.type = 'file';
+fileInput.multiple = true;
+fileInput.style.display = 'none';
+
+dropZone.addEventListener('click', () => fileInput.click());
+dropZone.addEventListener('dragover', (e) => {
+    e.preventDefault();
+    dropZone.classList.add('highlight');
+});
+dropZone.addEventListener('dragleave', () => {
+    dropZone.classList.remove('highlight');
+});
+dropZone.addEventListener('drop', (e) => {
+    e.preventDefault();
+    dropZone.classList.remove('highlight');
+    handleFiles(e.dataTransfer.files);
+});
+fileInput.addEventListener('change', (e) => handleFiles(e.target.files));
+
+function handleFiles(files) {
+    for (let file of files) {
+        if (file.size > 500 * 1024 * 1024) {
+            alert('File too large: ' + file.name + '. Maximum size is 500MB.');
+            continue;
+        }
+
+        uploadedFiles.push(file);
+        addFilePreview(file);
+    }
+}
+
+function addFilePreview(file) {
+    const preview = document.getElementById('filePreview');
+    const fileItem = document.createElement('div');
+    fileItem.className = 'file-item';
+    fileItem.innerHTML = `
+        <div class="file-info">
+            <i class="fas fa-file"></i>
+            <div class="file-details">
+                <div class="file-name">${file.name}</div>
+                <div class="file-size">${(file.size / 1024 / 1024).toFixed(2)} MB</div>
+            </div>
+        </div>
+        <button type="button" class="file-remove" onclick="removeFile('${file.name}')">
+            <i class="fas fa-times"></i>
+        </button>
+    `;
+    preview.appendChild(fileItem);
+}
+
+function removeFile(fileName) {
+    uploadedFiles = uploadedFiles.filter(file => file.name !== fileName);
+    document.getElementById('filePreview').innerHTML = '';
+    uploadedFiles.forEach(file => addFilePreview(file));
+}
+
+// Resumable uploads: each file goes up in chunks at the offset the server
+// says it has, so a dropped connection only costs the chunk in flight
+const UPLOAD_CHUNK_SIZE = 5 * 1024 * 1024;
+const UPLOAD_RETRIES = 5;
+
+async function uploadFile(file, onProgress) {
+    let response = await fetch('/api/uploads', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ name: file.name, size: file.size, type: file.type })
+    });
+    let status = await response.json();
+    if (!response.ok) {
+        throw new Error(status.error || 'Could not start the upload');
+    }
+
+    let failures = 0;
+    while (!status.complete) {
+        const end = Math.min(status.offset + Math.min(UPLOAD_CHUNK_SIZE, status.maxChunk), file.size);
+        try {
+            response = await fetch('/api/uploads/' + status.uploadId, {
+                method: 'PUT',
+                headers: { 'Upload-Offset': String(status.offset) },
+                body: file.slice(status.offset, end)
+            });
+        } catch (error) {
+            // Connection dropped: wait, ask how much arrived and carry on from there
+            if (++failures > UPLOAD_RETRIES) {
+                throw error;
+            }
+            await new Promise(resolve => setTimeout(resolve, 1000 * failures));
+            try {
+                const resume = await fetch('/api/uploads/' + status.uploadId);
+                if (resume.ok) {
+                    status = await resume.json();
+                }
+            } catch (ignored) {}
+            continue;
+        }
+
+        const data = await response.json();
+        if (response.status === 409) {
+            status.offset = data.offset;
+        } else if (!response.ok) {
+            throw new Error(data.error || 'Upload failed');
+        } else {
+            status = data;
+            failures = 0;
+        }
+        if (onProgress) {
+            onProgress(file, file.size ? status.offset / file.size : 1);
+        }
+    }
+    return status.attachment.id;
+}
+
+// Upload every selected file; resolves to the attachment ids to submit
+async function uploadAttachments(onProgress) {
+    const attachments = [];
+    for (const file of uploadedFiles) {
+        attachments.push(await uploadFile(file, onProgress));
+    }
+    return attachments;
+}
+
+// Project form submission - UPDATED TO REDIRECT TO SUCCESS PAGE
+document.getElementById('projectForm').addEventListener('submit', async function(e) {
+    e.preventDefault();
+
+    const isLoggedIn = Boolean(pageData.username);
+
+    if (!isLoggedIn) {
+        alert('Please login to submit a project');
+        window.location.href = '/login';
+        return;
+    }
+
+    const deliveryOption = document.querySelector('input[name="deliveryOption"]:checked').value;
+
+    let attachments;
+    try {
+        attachments = await uploadAttachments();
+    } catch (error) {
+        alert('Upload failed: ' + error.message);
+        return;
+    }
+
+    const formData = {
+        websiteType: document.getElementById('websiteType').value,
+        complexity: document.getElementById('complexity').value,
+        websiteName: document.getElementById('websiteName').value,
+        description: document.getElementById('description').value,
+        deliveryOption: deliveryOption,
+        attachments: attachments
+    };
+
+    fetch('/api/projects', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'Idempotency-Key': submissionKey,
+        },
+        body: JSON.stringify(formData)
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            // Redirect to success page with project ID
+            window.location.href = '/success/' + data.projectId;
+        } else {
+            alert('Error: ' + data.error);
+        }
+    })
+    .catch(error => {
+        alert('Error submitting project. Please try again.');
+    });
+});
+
+// Load user projects
+function loadUserProjects() {
+    const isLoggedIn = Boolean(pageData.username);
+
+    if (!isLoggedIn) {
+        return;
+    }
+
+    fetch('/api/projects/user')
+        .then(response => response.json())
+        .then(projects => {
+            const container = document.getElementById('projectsContainer');
+
+            if (projects.length === 0) {
+                container.innerHTML = `
+                    <div class="no-projects">
+                        <i class="fas fa-folder-open"></i>
+                        <h3>No Projects Yet</h3>
+                        <p>You haven't submitted any projects. Start by creating your first project!</p>
+                        <a href="#" class="btn btn-primary" onclick="showSection('project-form')">
+                            <i class="fas fa-plus"></i>
+                            Start Your First Project
+                        </a>
+                    </div>
+                `;
+                return;
+            }
+
+            container.innerHTML = `
+                <div class="projects-grid">
+                    ${projects.map(project => `
+                        <div class="project-card">
+                            <div class="project-header">
+                                <h3>${project.websiteName}</h3>
+                                <span class="status-badge status-${project.status}">${project.status}</span>
+                            </div>
+                            <div class="project-details">
+                                <div class="detail-item">
+                                    <label>Project ID:</label>
+                                    <span>${project.id}</span>
+                                </div>
+                                <div class="detail-item">
+                                    <label>Type:</label>
+                                    <span>${project.websiteType}</span>
+                                </div>
+                                <div class="detail-item">
+                                    <label>Complexity:</label>
+                                    <span>${project.complexity}</span>
+                                </div>
+                                <div class="detail-item">
+                                    <label>Total Cost:</label>
+                                    <span class="price">₹${project.totalCost}</span>
+                                </div>
+                                <div class="detail-item">
+                                    <label>Delivery Date:</label>
+                                    <span>${project.deliveryDate}</span>
+                                </div>
+                            </div>
+                            <div class="project-description">
+                                <label>Description:</label>
+                                <div class="description-content">
+                                    ${project.description}
+                                </div>
+                            </div>
+                            ${project.attachments && project.attachments.length > 0 ? `
+                            <div class="project-attachments">
+                                <label>Attachments:</label>
+                                <div class="attachments-list">
+                                    ${project.attachments.map(att => `
+                                        <div class="attachment-item">
+                                            <i class="fas fa-file"></i>
+                                            ${att.id ? `<a href="/api/attachments/${att.id}">${att.name}</a>` : `<span>${att.name}</span>`}
+                                            <small>${att.size}</small>
+                                        </div>
+                                    `).join('')}
+                                </div>
+                            </div>
+                            ` : ''}
+                            <div class="project-actions">
+                                <a href="/success/${project.id}" class="btn btn-primary">
+                                    <i class="fas fa-eye"></i>
+                                    View Details
+                                </a>
+                            </div>
+                        </div>
+                    `).join('')}
+                </div>
+            `;
+        })
+        .catch(error => {
+            console.error('Error loading projects:', error);
+        });
+}
+
+// Live price estimate from the server's pricing rules
+let quoteTimer = null;
+function updateQuote() {
+    clearTimeout(quoteTimer);
+    quoteTimer = setTimeout(() => {
+        const delivery = document.querySelector('input[name="deliveryOption"]:checked');
+        const params = new URLSearchParams({
+            websiteType: document.getElementById('websiteType').value,
+            complexity: document.getElementById('complexity').value,
+            deliveryOption: delivery ? delivery.value : 'normal'
+        });
+        const estimate = document.getElementById('priceEstimate');
+        fetch('/api/quote?' + params)
+            .then(response => response.ok ? response.json() : null)
+            .then(quote => {
+                if (!quote) {
+                    estimate.style.display = 'none';
+                    return;
+                }
+                document.getElementById('priceEstimateText').textContent =
+                    `₹${quote.totalCost.toLocaleString('en-IN')} (₹${quote.advanceAmount.toLocaleString('en-IN')} advance, ${quote.deliveryDays}-day delivery)`;
+                estimate.style.display = '';
+            })
+            .catch(() => {
+                estimate.style.display = 'none';
+            });
+    }, 150);
+}
+
+// Initialize page
+document.addEventListener('DOMContentLoaded', function() {
+    checkAuthStatus();
+    loadUserProjects();
+    document.getElementById('websiteType').addEventListener('change', updateQuote);
+    document.getElementById('complexity').addEventListener('change', updateQuote);
+    document.querySelectorAll('input[name="deliveryOption"]').forEach(radio => {
+        radio.addEventListener('change', updateQuote);
+    });
+});
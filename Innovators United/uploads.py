@@ -0,0 +1,270 @@
+"""Resumable, chunked attachment uploads.
+
+A client starts an upload with the file's name, size and type, then PUTs
+the bytes in chunks, each saying which offset it starts at. Chunks are
+streamed from the request straight into ``<dir>/partial/<upload id>.part``,
+so a worker holds at most ``buffer_size`` bytes of a file however large it
+is, and the part file's size is where to resume after a dropped connection.
+When the last byte arrives the file is hashed and moved to
+``<dir>/blobs/<sha256>``; content that was uploaded before is kept only
+once. Projects reference the attachment records, which live in their own
+store.
+
+Uploads left alone for ``stale_after`` seconds are purged, session, part
+and lock file together, and so are blobs no attachment record points at
+(left behind if a worker died between storing a blob and recording it).
+"""
+import hashlib
+import json
+import os
+import re
+import time
+import uuid
+from datetime import datetime
+
+from ids import new_id
+from storage import file_lock
+
+UPLOAD_ID_RE = re.compile(r'[0-9a-f]{32}')
+
+
+class UploadError(ValueError):
+    """A request the upload API has to refuse; ``status`` is the HTTP status."""
+
+    def __init__(self, message, status=400, **details):
+        super().__init__(message)
+        self.status = status
+        self.details = details
+
+
+class UploadStore:
+    def __init__(self, directory, attachments_store, max_size=500 << 20, max_chunk=16 << 20,
+                 buffer_size=1 << 20, stale_after=24 * 3600):
+        directory = os.path.abspath(directory)  # send_file resolves relative paths against the app
+        self.partial_directory = os.path.join(directory, 'partial')
+        self.blob_directory = os.path.join(directory, 'blobs')
+        self.attachments = attachments_store
+        self.max_size = max_size
+        self.max_chunk = max_chunk
+        self.buffer_size = buffer_size
+        self.stale_after = stale_after
+        self.purge_interval = min(stale_after, 3600)
+        self._next_purge = 0.0
+        self._blob_lock_path = os.path.join(directory, 'blobs.lock')
+        os.makedirs(self.partial_directory, exist_ok=True)
+        os.makedirs(self.blob_directory, exist_ok=True)
+
+    # ---------------- paths ----------------
+    def _session_path(self, upload_id):
+        return os.path.join(self.partial_directory, upload_id + '.json')
+
+    def _part_path(self, upload_id):
+        return os.path.join(self.partial_directory, upload_id + '.part')
+
+    def _lock_path(self, upload_id):
+        return self._part_path(upload_id) + '.lock'
+
+    def blob_path(self, sha256):
+        return os.path.join(self.blob_directory, sha256[:2], sha256)
+
+    def _save_session(self, upload_id, session):
+        path = self._session_path(upload_id)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(session, f)
+        os.replace(tmp_path, path)
+
+    def _owned_session(self, upload_id, owner_id):
+        session = None
+        if UPLOAD_ID_RE.fullmatch(upload_id or ''):
+            try:
+                with open(self._session_path(upload_id)) as f:
+                    session = json.load(f)
+            except (FileNotFoundError, ValueError):
+                pass
+        if session is None or session['ownerId'] != owner_id:
+            raise UploadError('Upload not found', 404)
+        return session
+
+    def _status(self, upload_id, session):
+        status = {'uploadId': upload_id, 'size': session['size'], 'maxChunk': self.max_chunk}
+        if session.get('attachment'):
+            status.update(offset=session['size'], complete=True, attachment=session['attachment'])
+        else:
+            try:
+                offset = os.path.getsize(self._part_path(upload_id))
+            except FileNotFoundError:
+                # Purged between reading the session and now
+                raise UploadError('Upload has expired; start it again', 404)
+            status.update(offset=offset, complete=False)
+        return status
+
+    # ---------------- uploading ----------------
+    def start(self, owner_id, name, size, content_type=None):
+        """Open an upload session for one file; returns its status."""
+        if not isinstance(name, str) or not os.path.basename(name.replace('\\', '/')):
+            raise UploadError('A file name is required')
+        if isinstance(size, bool) or not isinstance(size, int) or size < 0:
+            raise UploadError('size must be a byte count')
+        if size > self.max_size:
+            raise UploadError(f'Files can be at most {self.max_size >> 20} MB', 413)
+        self._purge_stale()
+
+        upload_id = uuid.uuid4().hex
+        session = {
+            'ownerId': owner_id,
+            'name': os.path.basename(name.replace('\\', '/')),
+            'size': size,
+            'type': content_type if isinstance(content_type, str) else '',
+            'startedAt': datetime.now().isoformat(),
+            'attachment': None,
+        }
+        open(self._part_path(upload_id), 'wb').close()
+        if size == 0:
+            session['attachment'] = self._finish(upload_id, session)
+        self._save_session(upload_id, session)
+        return self._status(upload_id, session)
+
+    def status(self, upload_id, owner_id):
+        return self._status(upload_id, self._owned_session(upload_id, owner_id))
+
+    def write_chunk(self, upload_id, owner_id, offset, stream, length):
+        """Append ``length`` bytes read from ``stream`` at ``offset``.
+
+        The offset has to match what the server already has (409 with the
+        right one otherwise), so a client that lost a response can always
+        ask for the status and carry on from there.
+        """
+        session = self._owned_session(upload_id, owner_id)
+        if length is None:
+            raise UploadError('Content-Length is required', 411)
+        if length > self.max_chunk:
+            raise UploadError(f'Chunks can be at most {self.max_chunk >> 20} MB', 413)
+
+        part_path = self._part_path(upload_id)
+        with file_lock(self._lock_path(upload_id)):
+            session = self._owned_session(upload_id, owner_id)
+            status = self._status(upload_id, session)
+            if status['complete']:
+                return status
+            if offset != status['offset']:
+                raise UploadError('Offset does not match the bytes received so far', 409,
+                                  offset=status['offset'])
+            if offset + length > session['size']:
+                raise UploadError('Chunk runs past the end of the file')
+
+            with open(part_path, 'ab') as f:
+                remaining = length
+                while remaining:
+                    data = stream.read(min(self.buffer_size, remaining))
+                    if not data:
+                        break  # client went away; what arrived is kept for the resume
+                    f.write(data)
+                    remaining -= len(data)
+            os.utime(self._session_path(upload_id))  # still active: keep it from being purged
+
+            if os.path.getsize(part_path) == session['size']:
+                session['attachment'] = self._finish(upload_id, session)
+                self._save_session(upload_id, session)
+            return self._status(upload_id, session)
+
+    def _finish(self, upload_id, session):
+        """Move a complete part file to its content address and record it."""
+        part_path = self._part_path(upload_id)
+        digest = hashlib.sha256()
+        with open(part_path, 'rb') as f:
+            for block in iter(lambda: f.read(self.buffer_size), b''):
+                digest.update(block)
+        sha256 = digest.hexdigest()
+
+        attachment = {
+            'id': new_id(),
+            'sha256': sha256,
+            'name': session['name'],
+            'size': session['size'],
+            'type': session['type'],
+            'ownerId': session['ownerId'],
+            'createdAt': datetime.now().isoformat(),
+        }
+        blob_path = self.blob_path(sha256)
+        # The purge can't drop the blob between storing it and recording it
+        with file_lock(self._blob_lock_path):
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            if os.path.exists(blob_path):
+                os.remove(part_path)  # same content is already stored
+            else:
+                os.replace(part_path, blob_path)
+            self.attachments.upsert(attachment)
+        return attachment
+
+    def _purge_stale(self):
+        """Drop uploads nobody has touched for ``stale_after`` seconds, and
+        blobs no attachment refers to; runs at most every ``purge_interval``."""
+        now = time.monotonic()
+        if now < self._next_purge:
+            return
+        self._next_purge = now + self.purge_interval
+        cutoff = time.time() - self.stale_after
+
+        files = {}
+        for name in os.listdir(self.partial_directory):
+            files.setdefault(name.split('.', 1)[0], []).append(os.path.join(self.partial_directory, name))
+        for upload_id, paths in files.items():
+            if self._last_touched(paths) >= cutoff:
+                continue
+            with file_lock(self._lock_path(upload_id)):
+                # A chunk may have arrived while we waited for the lock
+                paths = [os.path.join(self.partial_directory, name) for name in os.listdir(self.partial_directory)
+                         if name.split('.', 1)[0] == upload_id]
+                if self._last_touched(paths) >= cutoff:
+                    continue
+                # The lock file goes too; whoever takes it next finds no session and gets a 404
+                for path in paths:
+                    self._remove(path)
+
+        with file_lock(self._blob_lock_path):
+            referenced = {attachment.get('sha256') for attachment in self.attachments.scan()}
+            for directory, _, names in os.walk(self.blob_directory):
+                for name in names:
+                    path = os.path.join(directory, name)
+                    if name not in referenced and self._last_touched([path]) < cutoff:
+                        self._remove(path)
+
+    @staticmethod
+    def _last_touched(paths):
+        mtimes = [0.0]
+        for path in paths:
+            if path.endswith('.lock'):
+                continue  # taking the lock creates it, which says nothing about the upload
+            try:
+                mtimes.append(os.path.getmtime(path))
+            except FileNotFoundError:
+                pass
+        return max(mtimes)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    # ---------------- attachments ----------------
+    def attachments_for(self, attachment_ids, owner_id):
+        """Summaries to store on a project for uploads ``owner_id`` finished."""
+        if not isinstance(attachment_ids, list):
+            raise UploadError('attachments must be a list of attachment ids')
+        summaries = []
+        for attachment_id in attachment_ids:
+            attachment = self.attachments.get(attachment_id) if isinstance(attachment_id, str) else None
+            if attachment is None or attachment.get('ownerId') != owner_id:
+                raise UploadError(f'Unknown attachment: {attachment_id}')
+            summaries.append({k: attachment[k] for k in ('id', 'name', 'size', 'type', 'sha256')})
+        return summaries
+
+    def attachment(self, attachment_id):
+        """``(record, blob path)`` for a finished upload, or ``(None, None)``."""
+        attachment = self.attachments.get(attachment_id)
+        if attachment is None:
+            return None, None
+        return attachment, self.blob_path(attachment['sha256'])
@@ -1,9 +1,25 @@
-﻿from flask import Flask, render_template, request, jsonify, session, redirect, url_for
-import os, json, re, uuid
+﻿from flask import (Flask, render_template, request, jsonify, session, redirect, url_for, Response, send_file, g,
+                   before_render_template, template_rendered)
+import gzip, os, time
 from datetime import datetime, timedelta
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from functools import wraps
+from assets import AssetManifest
+from events import EventLog
+from exports import (EXPORT_FORMATS, PROJECT_EXPORT_FIELDS, USER_EXPORT_FIELDS, parse_date_range,
+                     record_filter, stream_export)
+from idempotency import IdempotencyError, IdempotencyStore
+from ids import new_id
+from listing import ProjectListing
+from metrics import registry as metrics
+from notifications import EmailOutbox
+from owners import ProjectOwners
+from pricing import PricingEngine
+from profiling import RequestProfiler
+from search import ProjectSearchIndex
+from stats import ProjectStats
+from storage import open_store
+from uploads import UploadError, UploadStore
+from users import UserDirectory
 
 app = Flask(__name__)
 
@@ -13,8 +29,68 @@ app.secret_key = os.environ.get("SECRET_KEY", "innovators_united_secret_key")
 EMAIL_ADDRESS = os.environ.get("EMAIL_ADDRESS", "your_email@gmail.com")
 EMAIL_PASSWORD = os.environ.get("EMAIL_PASSWORD", "your_app_password")
 
+# Point these at a local debugging SMTP server (and SMTP_USE_TLS=0) in tests
+SMTP_SERVER = os.environ.get("SMTP_SERVER", "smtp.gmail.com")
+SMTP_PORT = int(os.environ.get("SMTP_PORT", 587))
+SMTP_USE_TLS = os.environ.get("SMTP_USE_TLS", "1") != "0"
+OUTBOX_DIR = os.environ.get("OUTBOX_DIR", "outbox")
+
+# Shared by all workers so /api/events sees changes made by any of them
+EVENTS_FILE = os.environ.get("EVENTS_FILE", "events.log")
+
 PROJECTS_FILE = "projects.json"
 USERS_FILE = "users.json"
+ATTACHMENTS_FILE = "attachments.json"
+
+# Uploaded files, stored once per distinct content
+UPLOAD_DIR = os.environ.get("UPLOAD_DIR", "uploads")
+MAX_UPLOAD_SIZE = int(os.environ.get("MAX_UPLOAD_SIZE", 500 << 20))
+
+# Responses to recent Idempotency-Key requests, so a retried submission is replayed
+IDEMPOTENCY_DIR = os.environ.get("IDEMPOTENCY_DIR", "idempotency")
+IDEMPOTENCY_TTL = int(os.environ.get("IDEMPOTENCY_TTL", 24 * 3600))
+
+# Each worker writes its metrics here and /metrics adds them up across workers;
+# set METRICS_TOKEN to require it as a bearer token on scrapes
+METRICS_DIR = os.environ.get("METRICS_DIR", "metrics")
+METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", 5))
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+# JSON responses at least this big are gzipped for clients that accept it
+JSON_GZIP_MIN_BYTES = int(os.environ.get("JSON_GZIP_MIN_BYTES", 1024))
+JSON_GZIP_LEVEL = 6
+GZIP_ETAG_SUFFIX = "-gzip"
+
+# Fingerprinted, precompressed copies of static/, built at startup
+ASSET_DIR = os.environ.get("ASSET_DIR", "assets")
+
+# Requests sampled by the admin profiling toggle; only the newest PROFILE_KEEP are kept
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+PROFILE_KEEP = int(os.environ.get("PROFILE_KEEP", 200))
+
+# Pricing rules ship with the app; compiled into a lookup table once at startup
+PRICING_FILE = os.environ.get("PRICING_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "pricing.json"))
+QUOTE_BATCH_LIMIT = 100
+pricing = PricingEngine.from_file(PRICING_FILE)
+assets = AssetManifest(app.static_folder, ASSET_DIR).build()
+
+projects_store = open_store(PROJECTS_FILE)
+users_store = open_store(USERS_FILE)
+STORES = {PROJECTS_FILE: projects_store, USERS_FILE: users_store}
+user_directory = users_store.add_index(UserDirectory())
+project_owners = projects_store.add_index(ProjectOwners())
+project_stats = projects_store.add_index(ProjectStats())
+project_search = projects_store.add_index(ProjectSearchIndex())
+project_listing = projects_store.add_index(ProjectListing(search=project_search))
+attachments_store = open_store(ATTACHMENTS_FILE)
+uploads = UploadStore(UPLOAD_DIR, attachments_store, max_size=MAX_UPLOAD_SIZE)
+idempotency_keys = IdempotencyStore(IDEMPOTENCY_DIR, ttl=IDEMPOTENCY_TTL)
+profiler = RequestProfiler(PROFILE_DIR, max_profiles=PROFILE_KEEP)
+
+outbox = EmailOutbox(OUTBOX_DIR, SMTP_SERVER, SMTP_PORT, EMAIL_ADDRESS, EMAIL_PASSWORD, use_tls=SMTP_USE_TLS)
+outbox.start()
+event_log = EventLog(EVENTS_FILE)
+metrics.start(METRICS_DIR, METRICS_FLUSH_INTERVAL)
 
 ADMIN_USERNAME = "admin"
 ADMIN_PASSWORD = "ABPPS12345"
@@ -22,7 +98,7 @@ ADMIN_PASSWORD = "ABPPS12345"
 
 # ---------------- EMAIL FUNCTION ----------------
 def send_notification_email(project_data):
-    """Send email notification when a new project is submitted"""
+    """Queue an email notification when a new project is submitted"""
     try:
         subject = f"New Project Submitted - {project_data['websiteName']}"
         body = f"""
@@ -43,39 +119,81 @@ def send_notification_email(project_data):
         {project_data['description']}
         """
 
-        msg = MIMEMultipart()
-        msg["From"] = EMAIL_ADDRESS
-        msg["To"] = EMAIL_ADDRESS
-        msg["Subject"] = subject
-        msg.attach(MIMEText(body, "plain"))
-
-        server = smtplib.SMTP("smtp.gmail.com", 587)
-        server.starttls()
-        server.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
-        server.send_message(msg)
-        server.quit()
-        print("✅ Email sent successfully.")
+        # Delivered by the outbox worker so the request doesn't wait on SMTP
+        outbox.enqueue(EMAIL_ADDRESS, subject, body)
     except Exception as e:
-        print(f"⚠️ Email sending failed: {e}")
+        print(f"⚠️ Email queueing failed: {e}")
 
 
 # ---------------- JSON HELPERS ----------------
 def load_data(file_path):
-    """Load JSON data safely"""
-    if not os.path.exists(file_path):
-        with open(file_path, "w") as f:
-            json.dump([], f)
-    try:
-        with open(file_path, "r") as f:
-            return json.load(f)
-    except Exception:
-        return []
-
-
-def save_data(file_path, data):
-    """Save JSON data safely"""
-    with open(file_path, "w") as f:
-        json.dump(data, f, indent=2)
+    """Load JSON data safely (served from the in-memory store cache)"""
+    store = STORES[file_path]
+    store.ensure_exists()
+    return store.all()
+
+
+# ---------------- STATIC FILES ----------------
+@app.url_defaults
+def fingerprint_static_urls(endpoint, values):
+    """Point url_for('static', ...) at the fingerprinted copy of the file"""
+    if endpoint == "static" and "filename" in values:
+        values["filename"] = assets.url_name(values["filename"]) or values["filename"]
+
+
+def serve_static(filename):
+    """Fingerprinted files precompressed and cached for good; other paths as Flask serves them"""
+    asset = assets.lookup(filename)
+    if asset is None:
+        return app.send_static_file(filename)
+    path, encoding = assets.variant(asset, request.accept_encodings)
+    response = send_file(path, mimetype=asset.mimetype, conditional=True)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.headers["Vary"] = "Accept-Encoding"
+    response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
+
+
+app.view_functions["static"] = serve_static
+
+
+# ---------------- JSON RESPONSES ----------------
+def not_modified(etag):
+    """A 304 if the client already has the response tagged ``etag``, gzipped or not; else None"""
+    for tag in (etag, etag + GZIP_ETAG_SUFFIX):
+        if request.if_none_match.contains(tag):
+            return with_etag(Response(status=304), tag)
+    return None
+
+
+def with_etag(response, etag):
+    """Tag a response with a strong ETag the browser must revalidate before reusing"""
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+@app.after_request
+def compress_json(response):
+    """Gzip JSON bodies of JSON_GZIP_MIN_BYTES or more for clients that accept it"""
+    if (response.mimetype != "application/json" or response.direct_passthrough or response.is_streamed
+            or "Content-Encoding" in response.headers):
+        return response
+    data = response.get_data()
+    if len(data) < JSON_GZIP_MIN_BYTES:
+        return response
+    response.vary.add("Accept-Encoding")
+    if not request.accept_encodings["gzip"]:
+        return response
+    # mtime=0 keeps the bytes the same for the same body, as a strong ETag promises
+    response.set_data(gzip.compress(data, compresslevel=JSON_GZIP_LEVEL, mtime=0))
+    response.headers["Content-Encoding"] = "gzip"
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        # A strong ETag names exact bytes, so the gzipped body gets its own
+        response.set_etag(etag + GZIP_ETAG_SUFFIX)
+    return response
 
 
 # ---------------- ROUTES ----------------
@@ -83,10 +201,8 @@ def save_data(file_path, data):
 def index():
     """Homepage route"""
     # Make sure data files exist
-    if not os.path.exists(PROJECTS_FILE):
-        save_data(PROJECTS_FILE, [])
-    if not os.path.exists(USERS_FILE):
-        save_data(USERS_FILE, [])
+    projects_store.ensure_exists()
+    users_store.ensure_exists()
 
     # Load session info
     username = session.get("username", None)
@@ -113,10 +229,10 @@ def login():
             return redirect(url_for("admin_dashboard"))
 
         # User login
-        users = load_data(USERS_FILE)
-        user = next((u for u in users if u["username"] == username and u["password"] == password), None)
+        user = user_directory.authenticate(username, password)
 
         if user:
+            session["user_id"] = user["id"]
             session["username"] = user["username"]
             session["user_name"] = user["name"]
             session["user_email"] = user["email"]
@@ -141,21 +257,22 @@ def signup():
         if not email.endswith("@gmail.com"):
             return render_template("signup.html", error="Only Gmail addresses allowed")
 
-        users = load_data(USERS_FILE)
-        if any(u["username"] == username for u in users):
+        # Check-and-insert under the users file lock so concurrent signups can't
+        # both claim the same username or id
+        with users_store.transaction() as tx:
+            username_taken = user_directory.username_taken(username)
+            if not username_taken:
+                tx.upsert({
+                    "id": tx.count() + 1,
+                    "name": name,
+                    "username": username,
+                    "email": email,
+                    "password": password,
+                    "created_at": datetime.now().isoformat()
+                })
+
+        if username_taken:
             return render_template("signup.html", error="Username already exists")
-
-        new_user = {
-            "id": len(users) + 1,
-            "name": name,
-            "username": username,
-            "email": email,
-            "password": password,
-            "created_at": datetime.now().isoformat()
-        }
-
-        users.append(new_user)
-        save_data(USERS_FILE, users)
         return render_template("signup.html", success="Account created successfully! You can now log in.")
 
     return render_template("signup.html")
@@ -171,12 +288,174 @@ def logout():
 def admin_dashboard():
     if not session.get("admin_logged_in"):
         return redirect(url_for("login"))
-    projects = load_data(PROJECTS_FILE)
-    return render_template("admin.html", projects=projects)
+    # The page fetches its rows from /api/projects one page at a time
+    return render_template("admin.html")
+
+
+@app.route("/api/projects", methods=["GET"])
+def get_all_projects():
+    """All projects for the admin dashboard, or only recent changes with ?since=<cursor>"""
+    if not session.get("admin_logged_in"):
+        return jsonify({"error": "Unauthorized"}), 401
+
+    # Read the version first: a write in between is re-sent, never skipped.
+    # It also tags the response, so a poll of an unchanged store is a 304
+    # before any project is loaded or serialized
+    cursor = projects_store.version()
+    etag = f"projects-{cursor}"
+    response = not_modified(etag)
+    if response is not None:
+        return response
+
+    since = request.args.get("since", type=int)
+    if since is not None:
+        next_cursor, changed, removed = projects_store.changes_since(since)
+        return with_etag(jsonify({"projects": changed, "removed": removed, "cursor": next_cursor}), etag)
+
+    # Filtered / paged listing, keyset-paginated over (createdAt, id)
+    if any(arg in request.args for arg in ("status", "paymentStatus", "q", "sort", "limit", "cursor")):
+        sort = request.args.get("sort", "-createdAt")
+        if sort not in ("createdAt", "-createdAt"):
+            return jsonify({"error": "sort must be createdAt or -createdAt"}), 400
+        limit = min(max(request.args.get("limit", 50, type=int), 1), 200)
+        try:
+            projects, next_cursor = project_listing.page(
+                status=request.args.get("status"),
+                payment_status=request.args.get("paymentStatus"),
+                q=request.args.get("q"),
+                descending=sort.startswith("-"),
+                limit=limit,
+                cursor=request.args.get("cursor"))
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+        response = with_etag(jsonify({"projects": projects, "nextCursor": next_cursor}), etag)
+        response.headers["X-Change-Cursor"] = str(cursor)
+        return response
+
+    response = with_etag(jsonify(load_data(PROJECTS_FILE)), etag)
+    response.headers["X-Change-Cursor"] = str(cursor)
+    return response
+
+
+@app.route("/api/projects/stats", methods=["GET"])
+def get_project_stats():
+    """Dashboard totals and revenue rollups, maintained incrementally"""
+    if not session.get("admin_logged_in"):
+        return jsonify({"error": "Unauthorized"}), 401
+    days = request.args.get("days", 30, type=int)
+    return jsonify(project_stats.summary(days=days))
+
+
+# ---------------- EXPORTS ----------------
+def export_filter(date_field="createdAt"):
+    """Predicate for the ?from=&to= (YYYY-MM-DD) and ?status=a,b filters; raises ValueError"""
+    start, end = parse_date_range(request.args.get("from"), request.args.get("to"))
+    status = request.args.get("status")
+    return record_filter(start, end, set(status.split(",")) if status else None, date_field)
+
+
+def export_response(records, fields, name):
+    """Stream ``records`` in the requested ?format= (csv by default) as a download"""
+    fmt = request.args.get("format", "csv")
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": "format must be csv or ndjson"}), 400
+    filename = f"{name}-{datetime.now():%Y%m%d}.{fmt}"
+    return Response(stream_export(records, fmt, fields), mimetype=EXPORT_FORMATS[fmt],
+                    headers={"Content-Disposition": f"attachment; filename={filename}"})
+
+
+@app.route("/api/projects/export", methods=["GET"])
+def export_projects():
+    """Stream projects as CSV or NDJSON straight from the store"""
+    if not session.get("admin_logged_in"):
+        return jsonify({"error": "Unauthorized"}), 401
+    try:
+        keep = export_filter()
+    except ValueError:
+        return jsonify({"error": "from and to must be dates (YYYY-MM-DD)"}), 400
+    return export_response(filter(keep, projects_store.scan()), PROJECT_EXPORT_FIELDS, "projects")
+
+
+@app.route("/api/users/export", methods=["GET"])
+def export_users():
+    """Stream user accounts as CSV or NDJSON; passwords are never included"""
+    if not session.get("admin_logged_in"):
+        return jsonify({"error": "Unauthorized"}), 401
+    try:
+        keep = export_filter("created_at")
+    except ValueError:
+        return jsonify({"error": "from and to must be dates (YYYY-MM-DD)"}), 400
+    return export_response(filter(keep, users_store.scan()), USER_EXPORT_FIELDS, "users")
+
+
+@app.route("/api/projects/search", methods=["GET"])
+def search_projects():
+    """Ranked full-text project search; matches word prefixes"""
+    if not session.get("admin_logged_in"):
+        return jsonify({"error": "Unauthorized"}), 401
+    q = request.args.get("q", "")
+    limit = min(max(request.args.get("limit", 20, type=int), 1), 200)
+    results = []
+    for project_id, score in project_search.search(q, limit=limit):
+        project = projects_store.get(project_id)
+        if project is not None:
+            project["score"] = score
+            results.append(project)
+    return jsonify(results)
+
+
+def session_user_id():
+    """Id of the logged-in user, looked up for sessions from before it was stored"""
+    if "user_id" not in session and session.get("username"):
+        user = next(iter(user_directory.find_by_username(session["username"])), None)
+        if user is not None:
+            session["user_id"] = user["id"]
+    return session.get("user_id")
+
+
+def may_access(owner_id):
+    """Whether the session is an admin's or that of the user owning a record;
+    records with no owner are for admins only"""
+    if session.get("admin_logged_in"):
+        return True
+    user_id = session_user_id()
+    return user_id is not None and owner_id == user_id
+
+
+def idempotent(view):
+    """Replay the first successful response when a user repeats an Idempotency-Key,
+    instead of running the view (pricing, storage writes, email) again"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get("Idempotency-Key")
+        if key is None or not session.get("username"):
+            return view(*args, **kwargs)
+        try:
+            claim = idempotency_keys.begin(session["username"], key, request.get_data())
+        except IdempotencyError as e:
+            return jsonify({"error": str(e)}), e.status
+        if claim.replay is not None:
+            status, mimetype, body = claim.replay
+            response = app.response_class(body, status=status, mimetype=mimetype)
+            response.headers["Idempotent-Replayed"] = "true"
+            return response
+
+        response = None
+        try:
+            response = app.make_response(view(*args, **kwargs))
+        finally:
+            # Only successes are kept; after an error the retry runs for real
+            if response is not None and 200 <= response.status_code < 300:
+                claim.finish(response.status_code, response.mimetype, response.get_data(as_text=True))
+            else:
+                claim.abandon()
+        return response
+    return wrapper
 
 
 # ---------------- UPDATED PROJECT CREATION WITH NEW FIELDS ----------------
 @app.route("/api/projects", methods=["POST"])
+@idempotent
 def create_project():
     if not session.get("username"):
         return jsonify({"error": "Please log in first"}), 401
@@ -190,39 +469,31 @@ def create_project():
         return jsonify({"error": "Missing required fields"}), 400
 
     user_name = session.get("user_name", "User")
+
+    # Attachments are ids of uploads this user finished through /api/uploads
+    try:
+        attachments = uploads.attachments_for(data.get("attachments", []), session_user_id())
+    except UploadError as e:
+        return jsonify({"error": str(e)}), e.status
     
-    # ADDED: Use UUID for project ID from second version
-    project_id = str(uuid.uuid4())[:8]
-
-    # UPDATED: Pricing calculation with 40%/60% payment split
-    prices = {"simple": 11000, "medium": 25000, "complex": 60000}
-    base_cost = prices.get(data["complexity"], 0)
-
-    # Auto-set medium price for WWW and E-commerce
-    if data["websiteType"] in ["www", "ecommerce"]:
-        base_cost = 25000  # Medium complexity price
-
-    delivery_days = 5
-    extra_charge = 0
-    if data["deliveryOption"] == "1day":
-        extra_charge = 5500
-        delivery_days = 1
-    elif data["deliveryOption"] == "2days":
-        extra_charge = 5000
-        delivery_days = 2
-
-    total_cost = base_cost + extra_charge
-    
-    # UPDATED: 40% advance payment instead of 50%
-    advance = total_cost * 0.4  # 40% advance
+    # Time-ordered and unique across workers
+    project_id = new_id()
+
+    # Prices, the www/e-commerce flat rate and the 40% advance come from pricing.json
+    quote = pricing.quote(data["websiteType"], data["complexity"], data["deliveryOption"])
+    total_cost = quote["totalCost"]
+    advance = quote["advanceAmount"]
+    delivery_days = quote["deliveryDays"]
 
     # ADDED: Enhanced project data with new fields from second version
     project = {
         "id": project_id,
+        "userId": session_user_id(),
         "userName": data["userName"],  # From form data
         "userEmail": data["email"],    # From form data
         "phone": data["phone"],        # ADDED: Phone number
         "category": data["category"],  # ADDED: Project category
+        "attachments": attachments,
         "websiteType": data["websiteType"],
         "complexity": data["complexity"],
         "websiteName": data["websiteName"],
@@ -237,11 +508,15 @@ def create_project():
         "deliveryDate": (datetime.now() + timedelta(days=delivery_days)).strftime("%Y-%m-%d")
     }
 
-    projects = load_data(PROJECTS_FILE)
-    projects.append(project)
-    save_data(PROJECTS_FILE, projects)
+    projects_store.upsert(project)
 
     send_notification_email(project)
+    event_log.publish("project_created", {
+        "id": project_id,
+        "websiteName": project["websiteName"],
+        "status": project["status"],
+        "changeSeq": project.get("changeSeq")
+    })
     return jsonify({
         "success": True, 
         "projectId": project_id, 
@@ -251,12 +526,103 @@ def create_project():
     })
 
 
+# ---------------- PRICE QUOTES ----------------
+def quote_config(config):
+    """Price one configuration sent to the quote APIs; raises ValueError if it's unusable"""
+    if not isinstance(config, dict):
+        raise ValueError("Each configuration must be an object")
+    if not config.get("complexity") and not config.get("websiteType"):
+        raise ValueError("complexity or websiteType is required")
+    return pricing.quote(config.get("websiteType"), config.get("complexity"),
+                         config.get("deliveryOption", "normal"), strict=True)
+
+
+@app.route("/api/quote", methods=["GET"])
+def get_quote():
+    """Price for ?websiteType=&complexity=&deliveryOption= without creating anything"""
+    try:
+        return jsonify(quote_config(request.args.to_dict()))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@app.route("/api/quotes", methods=["POST"])
+def get_quotes():
+    """Prices for a JSON list of configurations, in the same order"""
+    configs = request.get_json(silent=True)
+    if not isinstance(configs, list):
+        return jsonify({"error": "Expected a JSON list of configurations"}), 400
+    if len(configs) > QUOTE_BATCH_LIMIT:
+        return jsonify({"error": f"At most {QUOTE_BATCH_LIMIT} configurations per request"}), 400
+    results = []
+    for config in configs:
+        try:
+            results.append(quote_config(config))
+        except ValueError as e:
+            results.append({"error": str(e)})
+    return jsonify(results)
+
+
+# ---------------- ATTACHMENT UPLOADS ----------------
+def upload_error(e):
+    return jsonify({"error": str(e), **e.details}), e.status
+
+
+@app.route("/api/uploads", methods=["POST"])
+def start_upload():
+    """Open a resumable upload for {name, size, type}; the bytes follow in PUT chunks"""
+    user_id = session_user_id()
+    if user_id is None:
+        return jsonify({"error": "Please log in first"}), 401
+    data = request.get_json(silent=True) or {}
+    try:
+        return jsonify(uploads.start(user_id, data.get("name"), data.get("size"), data.get("type"))), 201
+    except UploadError as e:
+        return upload_error(e)
+
+
+@app.route("/api/uploads/<upload_id>", methods=["GET"])
+def upload_status(upload_id):
+    """How many bytes arrived, so an interrupted upload can resume"""
+    user_id = session_user_id()
+    if user_id is None:
+        return jsonify({"error": "Please log in first"}), 401
+    try:
+        return jsonify(uploads.status(upload_id, user_id))
+    except UploadError as e:
+        return upload_error(e)
+
+
+@app.route("/api/uploads/<upload_id>", methods=["PUT"])
+def upload_chunk(upload_id):
+    """Append the raw request body at the Upload-Offset header's position"""
+    user_id = session_user_id()
+    if user_id is None:
+        return jsonify({"error": "Please log in first"}), 401
+    offset = request.headers.get("Upload-Offset", type=int)
+    if offset is None:
+        return jsonify({"error": "Upload-Offset header is required"}), 400
+    try:
+        return jsonify(uploads.write_chunk(upload_id, user_id, offset, request.stream, request.content_length))
+    except UploadError as e:
+        return upload_error(e)
+
+
+@app.route("/api/attachments/<attachment_id>")
+def download_attachment(attachment_id):
+    """Uploaded file, for its owner and admins"""
+    attachment, path = uploads.attachment(attachment_id)
+    if attachment is None or not may_access(attachment["ownerId"]):
+        return jsonify({"error": "Attachment not found"}), 404
+    return send_file(path, mimetype=attachment["type"] or None, as_attachment=True,
+                     download_name=attachment["name"])
+
+
 # ---------------- ADDED FROM SECOND VERSION: SUCCESS PAGE ----------------
 @app.route("/success/<project_id>")
 def success_page(project_id):
     """Success page after project submission"""
-    projects = load_data(PROJECTS_FILE)
-    project = next((p for p in projects if p["id"] == project_id), None)
+    project = projects_store.get(project_id)
     if not project:
         return "Project not found", 404
 
@@ -270,16 +636,31 @@ def get_user_projects():
     if not session.get("username"):
         return jsonify({"error": "Please log in first"}), 401
 
-    username = session.get("username")
-    projects = load_data(PROJECTS_FILE)
-    
-    # Filter projects by user (using username or userEmail)
-    user_projects = [
-        p for p in projects 
-        if p.get('userName') == session.get('user_name') or p.get('userEmail') == session.get('user_email')
-    ]
-    
-    return jsonify(user_projects)
+    user_id = session_user_id()
+    if user_id is None:
+        return jsonify({"error": "Please log in first"}), 401
+
+    # Projects are matched on the owner's user id, and ones saved before that
+    # was recorded on the client name or email, as they were before; the owner
+    # index also knows when they last changed, so an unchanged dashboard gets
+    # a 304 without loading any of them
+    version, project_ids = project_owners.projects(user_id, session.get("user_name"), session.get("user_email"))
+    etag = f"{user_id}-{version}"
+    response = not_modified(etag)
+    if response is None:
+        response = with_etag(jsonify([p for p in map(projects_store.get, project_ids) if p is not None]), etag)
+    return response
+
+
+# ---------------- ADMIN EVENT STREAM ----------------
+@app.route("/api/events")
+def project_events():
+    """Server-Sent Events stream of project changes for the admin dashboard"""
+    if not session.get("admin_logged_in"):
+        return jsonify({"error": "Unauthorized"}), 401
+    stream = event_log.stream(request.headers.get("Last-Event-ID"))
+    return Response(stream, mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 
 # ---------------- DEBUG ROUTE ----------------
@@ -299,6 +680,111 @@ def debug_templates():
         }
 
 
+# ---------------- METRICS ----------------
+REQUEST_SECONDS = metrics.histogram("http_request_duration_seconds", "Request latency by route", ("method", "route"))
+REQUESTS_TOTAL = metrics.counter("http_requests_total", "Requests by route and response status", ("method", "route", "status"))
+REQUESTS_IN_FLIGHT = metrics.gauge("http_requests_in_flight", "Requests being handled right now", ("method", "route"))
+TEMPLATE_SECONDS = metrics.histogram("template_render_seconds", "Time spent rendering templates", ("template",))
+
+
+def metrics_route():
+    """The matched URL rule, so /api/projects/<id> is one series rather than one per project"""
+    return request.url_rule.rule if request.url_rule else "unmatched"
+
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    REQUESTS_IN_FLIGHT.inc(request.method, metrics_route())
+
+
+@app.after_request
+def remember_response_status(response):
+    g.response_status = response.status_code
+    return response
+
+
+@app.teardown_request
+def observe_request(error=None):
+    """Record latency and status; streamed bodies are sent after this runs"""
+    started = g.pop("request_started", None)
+    if started is None:
+        return
+    route = metrics_route()
+    REQUESTS_IN_FLIGHT.dec(request.method, route)
+    REQUEST_SECONDS.observe(time.perf_counter() - started, request.method, route)
+    REQUESTS_TOTAL.inc(request.method, route, str(g.get("response_status", 500)))
+
+
+@before_render_template.connect_via(app)
+def start_template_timer(sender, template, context, **extra):
+    g.template_started = time.perf_counter()
+
+
+@template_rendered.connect_via(app)
+def observe_template(sender, template, context, **extra):
+    started = g.pop("template_started", None)
+    if started is not None:
+        TEMPLATE_SECONDS.observe(time.perf_counter() - started, template.name)
+
+
+@app.route("/metrics")
+def prometheus_metrics():
+    """Prometheus scrape endpoint, summed over every gunicorn worker"""
+    if METRICS_TOKEN and request.headers.get("Authorization") != f"Bearer {METRICS_TOKEN}":
+        return jsonify({"error": "Unauthorized"}), 401
+    return Response(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+# ---------------- PROFILING ----------------
+@app.before_request
+def start_profile():
+    profile = profiler.begin()
+    if profile is not None:
+        g.profile = profile
+
+
+@app.teardown_request
+def finish_profile(error=None):
+    profile = g.pop("profile", None)
+    if profile is not None:
+        profiler.finish(profile, request.method, metrics_route(), request.path, g.get("response_status", 500))
+
+
+@app.route("/api/profiling", methods=["GET"])
+def profiling_summary():
+    """Profiler setting, slowest profiled requests and the hottest functions (admin only)"""
+    if not session.get("admin_logged_in"):
+        return jsonify({"error": "Unauthorized"}), 401
+    limit = min(max(request.args.get("limit", 20, type=int), 1), 100)
+    return jsonify(profiler.summary(limit))
+
+
+@app.route("/api/profiling", methods=["PUT"])
+def configure_profiling():
+    """Turn request sampling on or off for every worker (admin only)"""
+    if not session.get("admin_logged_in"):
+        return jsonify({"error": "Unauthorized"}), 401
+    data = request.get_json(silent=True) or {}
+    try:
+        settings = profiler.configure(data.get("enabled"), data.get("sampleRate"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"success": True, "settings": settings})
+
+
+@app.route("/api/profiling/<profile_id>.prof", methods=["GET"])
+def download_profile(profile_id):
+    """Raw cProfile output of one profiled request, for pstats or snakeviz (admin only)"""
+    if not session.get("admin_logged_in"):
+        return jsonify({"error": "Unauthorized"}), 401
+    path = profiler.profile_path(profile_id)
+    if path is None:
+        return jsonify({"error": "Profile not found"}), 404
+    return send_file(path, mimetype="application/octet-stream", as_attachment=True,
+                     download_name=f"{profile_id}.prof")
+
+
 # ---------------- HEALTH CHECK ----------------
 @app.route("/health")
 def health():
@@ -308,10 +794,8 @@ def health():
 # ---------------- MAIN ----------------
 if __name__ == "__main__":
     # Ensure required JSON files exist
-    if not os.path.exists(PROJECTS_FILE):
-        save_data(PROJECTS_FILE, [])
-    if not os.path.exists(USERS_FILE):
-        save_data(USERS_FILE, [])
+    projects_store.ensure_exists()
+    users_store.ensure_exists()
 
     port = int(os.environ.get("PORT", 5000))
     print(f"✅ Server running on http://0.0.0.0:{port}")
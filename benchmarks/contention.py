@@ -0,0 +1,95 @@
+"""Contention benchmark for the locked store transactions.
+
+Starts N writer processes that all increment one shared counter record and
+insert their own records through ``store.transaction()``, then checks that
+no update was lost. Run from the repository root:
+
+    python benchmarks/contention.py --writers 16 --ops 200 --backend json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from multiprocessing import Process, Queue
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import storage  # noqa: E402
+
+
+def open_store(path, backend):
+    if backend == 'sqlite':
+        return storage.SqliteStore(os.path.splitext(path)[0] + '.db', 'projects')
+    return storage.open_store(path, backend=backend)
+
+
+def writer(path, backend, worker_id, ops, results):
+    store = open_store(path, backend)
+    hold_times = []
+    for i in range(ops):
+        started = time.perf_counter()
+        with store.transaction() as tx:
+            locked = time.perf_counter()
+            counter = tx.get('counter')
+            counter['value'] += 1
+            tx.upsert(counter)
+            tx.upsert({'id': f'w{worker_id}-{i}', 'worker': worker_id})
+        finished = time.perf_counter()
+        hold_times.append((finished - locked, finished - started))
+    results.put(hold_times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--writers', type=int, default=16)
+    parser.add_argument('--ops', type=int, default=200, help='transactions per writer')
+    parser.add_argument('--backend', default='json', choices=['json', 'journal', 'sqlite'])
+    parser.add_argument('--seed-records', type=int, default=1000,
+                        help='records already in the file before the run')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='iu-contention-')
+    path = os.path.join(workdir, 'projects.json')
+    seed = [{'id': 'counter', 'value': 0}]
+    seed += [{'id': f'seed-{i}', 'description': 'x' * 200} for i in range(args.seed_records)]
+    open_store(path, args.backend).replace_all(seed)
+
+    results = Queue()
+    procs = [Process(target=writer, args=(path, args.backend, w, args.ops, results))
+             for w in range(args.writers)]
+    started = time.perf_counter()
+    for p in procs:
+        p.start()
+    timings = [t for _ in procs for t in results.get()]
+    for p in procs:
+        p.join()
+    elapsed = time.perf_counter() - started
+
+    store = open_store(path, args.backend)
+    expected = args.writers * args.ops
+    counter = store.get('counter')['value']
+    inserted = sum(1 for r in store.all() if 'worker' in r)
+    holds = sorted(t[0] for t in timings)
+    waits = sorted(t[1] for t in timings)
+
+    report = {
+        'backend': args.backend,
+        'writers': args.writers,
+        'transactions': expected,
+        'seconds': round(elapsed, 3),
+        'tx_per_second': round(expected / elapsed, 1),
+        'lock_hold_ms_p50': round(holds[len(holds) // 2] * 1000, 3),
+        'lock_hold_ms_max': round(holds[-1] * 1000, 3),
+        'tx_latency_ms_p95': round(waits[int(len(waits) * 0.95)] * 1000, 3),
+        'counter': counter,
+        'inserted': inserted,
+        'lost_updates': (expected - counter) + (expected - inserted),
+    }
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if report['lost_updates'] else 0)
+
+
+if __name__ == '__main__':
+    main()
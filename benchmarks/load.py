@@ -0,0 +1,351 @@
+"""Load benchmark for a whole app, driven through its WSGI interface.
+
+Generates synthetic users.json and projects.json in a temporary directory,
+imports the app there with its SMTP settings pointed at a local fake server,
+and has concurrent clients (threads, like gunicorn's gthread workers) run a
+weighted mix of signups, logins, project submissions, admin listings, user
+dashboards and payment updates through Flask's test client. Prints
+throughput, p50/p95/p99 latency per operation and peak RSS as JSON; keep the
+output of two commits and compare. Run from the repository root:
+
+    python benchmarks/load.py --app iu --users 10000 --projects 10000 --clients 16
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import socketserver
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIRS = {'root': REPO, 'iu': os.path.join(REPO, 'Innovators United')}
+
+PASSWORD = 'bench-pass'
+ADMIN_LOGIN = {'root': '/login', 'iu': '/admin/login'}
+ADMIN_CREDENTIALS = {'username': 'admin', 'password': 'ABPPS12345'}
+
+# Relative frequency of each operation in the mix
+WEIGHTS = {
+    'signup': 1,
+    'login': 2,
+    'submit_project': 2,
+    'admin_list': 1,
+    'user_projects': 4,
+    'payment_update': 1,
+}
+# The root app has no payment endpoint
+UNSUPPORTED = {'root': {'payment_update'}, 'iu': set()}
+
+WEBSITE_TYPES = ['normal', 'www', 'ecommerce']
+COMPLEXITIES = ['simple', 'medium', 'complex']
+STATUSES = ['pending', 'in-progress', 'completed', 'delivered']
+
+
+# ---------------- fake SMTP ----------------
+class FakeSMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib: accepts every message and counts it."""
+
+    def reply(self, line):
+        self.wfile.write(line.encode('ascii') + b'\r\n')
+
+    def handle(self):
+        self.reply('220 localhost fake SMTP')
+        in_data = False
+        for line in self.rfile:
+            if in_data:
+                if line.rstrip(b'\r\n') == b'.':
+                    in_data = False
+                    with self.server.lock:
+                        self.server.received += 1
+                    self.reply('250 OK')
+                continue
+            command = line[:4].upper()
+            if command in (b'EHLO', b'HELO'):
+                self.reply('250 localhost')
+            elif command == b'DATA':
+                in_data = True
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+            elif command == b'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+class FakeSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), FakeSMTPHandler)
+        self.lock = threading.Lock()
+        self.received = 0
+
+
+# ---------------- synthetic data ----------------
+def make_users(count, rng):
+    start = datetime.now() - timedelta(days=730)
+    return [{
+        'id': i,
+        'name': f'Bench User {i}',
+        'username': f'bench{i}',
+        'email': f'bench{i}@gmail.com',
+        'password': PASSWORD,
+        'phone': f'9{rng.randrange(10 ** 9):09d}',
+        'created_at': (start + timedelta(minutes=i)).isoformat(),
+    } for i in range(1, count + 1)]
+
+
+def make_projects(count, users, rng):
+    start = datetime.now() - timedelta(days=730)
+    projects = []
+    for i in range(count):
+        user = rng.choice(users)
+        created = start + timedelta(seconds=rng.randrange(730 * 86400))
+        total = rng.choice([10000, 15000, 25000, 30000, 50000])
+        status = rng.choice(STATUSES)
+        paid = status in ('completed', 'delivered') and rng.random() < 0.7
+        projects.append({
+            'id': f'BENCH{i:07d}',
+            'userId': user['id'],
+            'userName': user['name'],
+            'userEmail': user['email'],
+            'userPhone': user['phone'],
+            'username': user['username'],
+            'phone': user['phone'],
+            'category': 'business',
+            'websiteType': rng.choice(WEBSITE_TYPES),
+            'complexity': rng.choice(COMPLEXITIES),
+            'websiteName': f'Site {i}',
+            'description': ' '.join(rng.choice(['shop', 'bakery', 'portfolio', 'clinic', 'blog', 'studio'])
+                                    for _ in range(20)),
+            'deliveryOption': 'normal',
+            'deliveryCharges': 0,
+            'totalCost': total,
+            'advanceAmount': total // 2,
+            'finalAmount': total - total // 2,
+            'editCount': 1,
+            'editCharges': 0,
+            'status': status,
+            'paymentStatus': 'completed' if paid else 'pending',
+            'advancePaid': paid or rng.random() < 0.5,
+            'fullPaid': paid,
+            'createdAt': created.isoformat(),
+            'deliveryDate': (created + timedelta(days=7)).strftime('%Y-%m-%d'),
+            'websiteUrl': '',
+            'billGenerated': paid,
+            'attachments': [],
+        })
+    return projects
+
+
+# ---------------- clients ----------------
+class LoadClient:
+    """One simulated browser session for a user, plus one for an admin."""
+
+    def __init__(self, app, variant, number, users, project_ids, rng):
+        self.variant = variant
+        self.number = number
+        self.users = users
+        self.project_ids = project_ids
+        self.rng = rng
+        self.user = rng.choice(users)
+        self.signups = 0
+        self.browser = app.test_client()
+        self.admin = app.test_client()
+        self.browser.post('/login', data={'username': self.user['username'], 'password': PASSWORD})
+        self.admin.post(ADMIN_LOGIN[variant], data=ADMIN_CREDENTIALS)
+
+    def signup(self):
+        self.signups += 1
+        username = f'new{self.number}x{self.signups}'
+        # A separate client, so this session stays logged in as self.user
+        r = self.browser.application.test_client().post('/signup', data={
+            'name': 'New User', 'username': username, 'email': f'{username}@gmail.com',
+            'password': PASSWORD, 'phone': '9876543210'})
+        return r.status_code == 200 and b'created successfully' in r.data
+
+    def login(self):
+        user = self.rng.choice(self.users)
+        r = self.browser.post('/login', data={'username': user['username'], 'password': PASSWORD})
+        self.user = user
+        return r.status_code == 302
+
+    def submit_project(self):
+        r = self.browser.post('/api/projects', json={
+            'websiteType': self.rng.choice(WEBSITE_TYPES),
+            'complexity': self.rng.choice(COMPLEXITIES),
+            'websiteName': 'Load Test Site',
+            'description': 'Generated by the load benchmark',
+            'deliveryOption': 'normal',
+            'userName': self.user['name'],
+            'email': self.user['email'],
+            'phone': self.user['phone'],
+            'category': 'business',
+        })
+        return r.status_code == 200
+
+    def admin_list(self):
+        return self.admin.get('/api/projects').status_code == 200
+
+    def user_projects(self):
+        return self.browser.get('/api/projects/user').status_code == 200
+
+    def payment_update(self):
+        r = self.admin.post(f'/api/projects/{self.rng.choice(self.project_ids)}/payment',
+                            json={'type': self.rng.choice(['advance', 'full'])})
+        return r.status_code == 200
+
+
+def run_client(client, operations, samples):
+    for name in operations:
+        started = time.perf_counter()
+        try:
+            ok = getattr(client, name)()
+        except Exception:
+            ok = False
+        samples.append((name, time.perf_counter() - started, ok))
+
+
+# ---------------- reporting ----------------
+def percentile(samples, fraction):
+    return samples[min(int(len(samples) * fraction), len(samples) - 1)]
+
+
+def latency_report(timings):
+    timings = sorted(timings)
+    return {
+        'ms_p50': round(percentile(timings, 0.50) * 1000, 3),
+        'ms_p95': round(percentile(timings, 0.95) * 1000, 3),
+        'ms_p99': round(percentile(timings, 0.99) * 1000, 3),
+        'ms_max': round(timings[-1] * 1000, 3),
+    }
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1 << 20 if sys.platform == 'darwin' else 1 << 10), 1)
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--app', default='iu', choices=sorted(APP_DIRS))
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--projects', type=int, default=1000)
+    parser.add_argument('--clients', type=int, default=8, help='concurrent client threads')
+    parser.add_argument('--requests', type=int, default=2000, help='operations across all clients')
+    parser.add_argument('--backend', default='json', choices=['json', 'journal', 'sqlite'])
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    args = parser.parse_args()
+
+    # The app logs with print(); keep stdout for the report
+    report_stream, sys.stdout = sys.stdout, sys.stderr
+
+    rng = random.Random(args.seed)
+    workdir = tempfile.mkdtemp(prefix='iu-load-')
+    os.chdir(workdir)
+    users = make_users(args.users, rng)
+    projects = make_projects(args.projects, users, rng)
+    with open('users.json', 'w') as f:
+        json.dump(users, f)
+    with open('projects.json', 'w') as f:
+        json.dump(projects, f)
+
+    smtp = FakeSMTPServer()
+    threading.Thread(target=smtp.serve_forever, daemon=True).start()
+    os.environ.update({
+        'STORAGE_BACKEND': args.backend,
+        'SMTP_SERVER': '127.0.0.1',
+        'SMTP_PORT': str(smtp.server_address[1]),
+        'SMTP_USE_TLS': '0',
+        'EMAIL_PASSWORD': '',
+    })
+    sys.path.insert(0, APP_DIRS[args.app])
+    if args.backend == 'sqlite':
+        import storage
+        storage.migrate_json_to_sqlite('projects.json', 'users.json', storage.SQLITE_PATH)
+
+    started = time.perf_counter()
+    import app as app_module
+    app = app_module.app
+    startup_seconds = time.perf_counter() - started
+
+    names = [name for name in WEIGHTS if name not in UNSUPPORTED[args.app]]
+    weights = [WEIGHTS[name] for name in names]
+    project_ids = [p['id'] for p in projects]
+    clients = [LoadClient(app, args.app, n, users, project_ids, random.Random(args.seed + n))
+               for n in range(args.clients)]
+    setup_rss = peak_rss_mb()
+
+    samples = []
+    threads = []
+    for n, client in enumerate(clients):
+        count = args.requests // args.clients + (n < args.requests % args.clients)
+        operations = client.rng.choices(names, weights, k=count)
+        threads.append(threading.Thread(target=run_client, args=(client, operations, samples)))
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    # Let the outbox hand the queued notifications to the fake SMTP server
+    deadline = time.monotonic() + 30
+    while app_module.outbox.pending_count() and time.monotonic() < deadline:
+        time.sleep(0.1)
+
+    report = {
+        'commit': git_commit(),
+        'app': args.app,
+        'backend': args.backend,
+        'users': args.users,
+        'projects': args.projects,
+        'clients': args.clients,
+        'requests': len(samples),
+        'errors': sum(1 for _, _, ok in samples if not ok),
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(len(samples) / elapsed, 1),
+        **latency_report([seconds for _, seconds, _ in samples]),
+        'startup_seconds': round(startup_seconds, 3),
+        'rss_mb_after_setup': setup_rss,
+        'peak_rss_mb': peak_rss_mb(),
+        'emails_sent': smtp.received,
+        'operations': {},
+    }
+    for name in names:
+        timings = [seconds for op, seconds, _ in samples if op == name]
+        if timings:
+            report['operations'][name] = {
+                'count': len(timings),
+                'errors': sum(1 for op, _, ok in samples if op == name and not ok),
+                **latency_report(timings),
+            }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        report_stream.write(output + '\n')
+    sys.exit(1 if report['errors'] else 0)
+
+
+if __name__ == '__main__':
+    main()
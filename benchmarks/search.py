@@ -0,0 +1,119 @@
+"""Query latency benchmark for the project search index.
+
+Fills a temporary store with synthetic projects, registers
+``ProjectSearchIndex`` on it and times a mix of whole-word, prefix and
+multi-term queries against the substring scan the admin page used before,
+and the listing's ``?q=`` filter (every project matching a two-term query).
+Run from the repository root:
+
+    python benchmarks/search.py --projects 50000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import storage  # noqa: E402
+from search import ProjectSearchIndex  # noqa: E402
+
+SYLLABLES = ['ka', 'ro', 'mi', 'ta', 'ne', 'sho', 'pra', 'vin', 'lu', 'dex', 'bri', 'om',
+             'an', 'jo', 'sa', 'ri', 'el', 'har', 'pe', 'du', 'zen', 'gi', 'mar', 'sti',
+             'al', 've', 'cho', 'ny', 'fa', 'qu', 'is', 'bel']
+# Site categories; descriptions mix these with a much larger generated vocabulary
+WORDS = ['shop', 'store', 'portfolio', 'bakery', 'clinic', 'studio', 'travel', 'fitness',
+         'school', 'restaurant', 'agency', 'blog', 'fashion', 'garden', 'photography']
+
+
+def word(rng, parts):
+    return ''.join(rng.choice(SYLLABLES) for _ in range(parts))
+
+
+def make_projects(count, rng):
+    vocabulary = [word(rng, rng.randint(2, 4)) for _ in range(5000)]
+    projects = []
+    for i in range(count):
+        first, last = word(rng, 2).title(), word(rng, 3).title()
+        projects.append({
+            'id': f'PR{last[:4].upper()}{i:06d}',
+            'websiteName': f'{first} {rng.choice(WORDS).title()}',
+            'userName': f'{first} {last}',
+            'userEmail': f'{first.lower()}.{last.lower()}@example.com',
+            'description': ' '.join(rng.choice(WORDS) if rng.random() < 0.1 else rng.choice(vocabulary)
+                                for _ in range(30)),
+        })
+    return projects
+
+
+def percentile(samples, fraction):
+    return samples[min(int(len(samples) * fraction), len(samples) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--projects', type=int, default=50000)
+    parser.add_argument('--queries', type=int, default=500, help='queries per kind')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    projects = make_projects(args.projects, rng)
+    workdir = tempfile.mkdtemp(prefix='iu-search-')
+    store = storage.JsonStore(os.path.join(workdir, 'projects.json'))
+    store.replace_all(projects)
+
+    started = time.perf_counter()
+    index = store.add_index(ProjectSearchIndex())
+    build_seconds = time.perf_counter() - started
+
+    def sample(kind):
+        p = rng.choice(projects)
+        first, last = p['userName'].split()
+        if kind == 'word':
+            return rng.choice(WORDS)
+        if kind == 'prefix':
+            return last[:rng.randint(2, 4)].lower()
+        if kind == 'multi_term':
+            return f"{first[:3]} {p['websiteName'].split()[1][:4]}".lower()
+        return p['id'][:8].lower()  # id prefix
+
+    report = {
+        'projects': args.projects,
+        'index_build_seconds': round(build_seconds, 3),
+        'vocabulary': len(index._vocab),
+    }
+    for kind in ('word', 'prefix', 'multi_term', 'id_prefix'):
+        timings = []
+        for _ in range(args.queries):
+            q = sample(kind)
+            t0 = time.perf_counter()
+            index.search(q, limit=20)
+            timings.append(time.perf_counter() - t0)
+        timings.sort()
+        report[f'{kind}_ms_p50'] = round(percentile(timings, 0.5) * 1000, 3)
+        report[f'{kind}_ms_p99'] = round(percentile(timings, 0.99) * 1000, 3)
+
+    timings = []
+    for _ in range(args.queries):
+        q = sample('multi_term')
+        t0 = time.perf_counter()
+        index.match_ids(q)
+        timings.append(time.perf_counter() - t0)
+    timings.sort()
+    report['listing_filter_ms_p50'] = round(percentile(timings, 0.5) * 1000, 3)
+    report['listing_filter_ms_p99'] = round(percentile(timings, 0.99) * 1000, 3)
+
+    # What the admin page's filter did per keystroke before the index
+    q = sample('prefix')
+    t0 = time.perf_counter()
+    [p for p in store.all() if any(q in str(p.get(f, '')).lower() for f in ('id', 'userName', 'websiteName'))]
+    report['substring_scan_ms'] = round((time.perf_counter() - t0) * 1000, 3)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
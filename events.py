@@ -0,0 +1,106 @@
+"""Cross-worker event fan-out for the admin Server-Sent Events stream.
+
+Workers append events as JSON lines to a shared log file and every open
+``/api/events`` connection tails that file, so an event published by one
+gunicorn worker reaches admins connected to any other. An event's SSE id is
+``<inode>:<offset of the next line>``, which lets EventSource resume after a
+reconnect via Last-Event-ID.
+"""
+import json
+import os
+import time
+
+from storage import file_lock
+
+
+class EventLog:
+    def __init__(self, path, max_bytes=5 << 20, poll_interval=0.5, keepalive=15):
+        self.path = path
+        self.lock_path = path + '.lock'
+        self.max_bytes = max_bytes
+        self.poll_interval = poll_interval
+        self.keepalive = keepalive
+
+    def publish(self, event_type, data):
+        """Append an event for every connected admin; never fails the caller."""
+        line = json.dumps({'type': event_type, 'data': data, 'ts': time.time()},
+                          separators=(',', ':')) + '\n'
+        try:
+            with file_lock(self.lock_path):
+                if os.path.exists(self.path) and os.path.getsize(self.path) > self.max_bytes:
+                    # Subscribers notice the new inode and start from the top
+                    os.replace(self.path, self.path + '.1')
+                with open(self.path, 'a') as f:
+                    f.write(line)
+        except OSError as e:
+            print(f"⚠️ Could not publish {event_type} event: {e}")
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None, 0
+        return st.st_ino, st.st_size
+
+    def _start_position(self, last_event_id):
+        inode, size = self._stat()
+        try:
+            last_inode, last_offset = (int(part) for part in last_event_id.split(':'))
+        except (AttributeError, ValueError):
+            return inode, size  # new subscriber: only events from now on
+        if last_inode == inode and last_offset <= size:
+            return inode, last_offset
+        return inode, size
+
+    def _open(self, inode, offset):
+        """``(file, its inode, offset)``: the log opened at ``offset`` if it is
+        still ``inode``, else at its start; no file if there is no log yet."""
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return None, inode, offset
+        st = os.fstat(f.fileno())
+        if st.st_ino != inode or st.st_size < offset:
+            offset = 0
+        return f, st.st_ino, offset
+
+    def _read(self, f, offset):
+        """Yield ``(offset after it, event)`` for each complete line past ``offset``."""
+        f.seek(offset)
+        chunk = f.read()
+        # Leave a half-written last line for the next pass
+        for line in chunk[:chunk.rfind(b'\n') + 1].splitlines(keepends=True):
+            offset += len(line)
+            yield offset, json.loads(line)
+
+    def stream(self, last_event_id=None):
+        """Yield SSE-formatted chunks until the client goes away."""
+        inode, offset = self._start_position(last_event_id)
+        yield 'retry: 3000\n\n'
+        last_sent = time.monotonic()
+        f = None
+        try:
+            while True:
+                if f is None:
+                    f, inode, offset = self._open(inode, offset)
+                if f is not None:
+                    # Once rotated away nothing more is written to the old
+                    # file, so finish reading it before switching
+                    rotated = self._stat()[0] != inode
+                    for offset, event in self._read(f, offset):
+                        yield (f"id: {inode}:{offset}\nevent: {event['type']}\n"
+                               f"data: {json.dumps(event['data'])}\n\n")
+                        last_sent = time.monotonic()
+                    if rotated:
+                        f.close()
+                        f, offset = None, 0
+                        continue
+                if time.monotonic() - last_sent >= self.keepalive:
+                    # Comment line: keeps proxies from closing the connection and
+                    # lets us notice disconnected clients
+                    yield ': keepalive\n\n'
+                    last_sent = time.monotonic()
+                time.sleep(self.poll_interval)
+        finally:
+            if f is not None:
+                f.close()
@@ -0,0 +1,90 @@
+"""Streaming CSV and NDJSON exports of store records.
+
+``stream_export()`` is a generator that a Flask ``Response`` sends as it is
+produced: the header goes out first and rows follow in small chunks as they
+are read from the store, so memory stays flat and the first byte arrives
+straight away however many records there are.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+
+EXPORT_FORMATS = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+# CSV columns; NDJSON rows carry every field of the record instead
+PROJECT_EXPORT_FIELDS = (
+    'id', 'createdAt', 'userId', 'userName', 'userEmail', 'userPhone', 'phone', 'category',
+    'websiteName', 'websiteType', 'complexity', 'deliveryOption', 'deliveryDate', 'status',
+    'paymentStatus', 'totalCost', 'deliveryCharges', 'editCharges', 'advanceAmount', 'finalAmount',
+    'advancePaid', 'fullPaid', 'billGenerated', 'billDate', 'websiteUrl',
+)
+USER_EXPORT_FIELDS = ('id', 'username', 'name', 'email', 'phone', 'created_at')
+
+ROWS_PER_CHUNK = 100
+
+
+def is_secret_field(field):
+    return 'password' in field.lower()
+
+
+def parse_date_range(start, end):
+    """Validate ``from``/``to`` query values (YYYY-MM-DD, both inclusive); raises ValueError."""
+    for value in (start, end):
+        if value is not None:
+            datetime.strptime(value, '%Y-%m-%d')
+    return start, end
+
+
+def record_filter(start=None, end=None, statuses=None, date_field='createdAt'):
+    """Predicate for records whose ``date_field`` is within [start, end] and
+    whose status is one of ``statuses``."""
+    def keep(record):
+        created = (record.get(date_field) or '')[:10]
+        if start is not None and created < start:
+            return False
+        if end is not None and created > end:
+            return False
+        return statuses is None or record.get('status') in statuses
+    return keep
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    # Spreadsheets run cells starting with these as formulas
+    if isinstance(value, str) and value[:1] in ('=', '+', '-', '@'):
+        return "'" + value
+    return value
+
+
+def stream_export(records, fmt, fields):
+    """Yield ``records`` as CSV (``fields`` as columns) or NDJSON, a chunk at a time.
+
+    Password fields are never written in either format.
+    """
+    fields = [f for f in fields if not is_secret_field(f)]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == 'csv':
+        writer.writerow(fields)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    rows = 0
+    for record in records:
+        if fmt == 'csv':
+            writer.writerow([_csv_value(record.get(f)) for f in fields])
+        else:
+            buffer.write(json.dumps({k: v for k, v in record.items() if not is_secret_field(k)}))
+            buffer.write('\n')
+        rows += 1
+        if rows % ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
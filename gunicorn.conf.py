@@ -0,0 +1,32 @@
+"""Gunicorn settings, picked up automatically by `gunicorn app:app`.
+
+Threaded workers let long-lived /api/events streams sit on a cheap thread
+instead of tying up a whole sync worker per connected admin tab.
+"""
+import os
+
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 32))
+
+# Per-worker metric snapshots that /metrics adds up (see metrics.py)
+metrics_dir = os.environ.get("METRICS_DIR", "metrics")
+
+
+def on_starting(server):
+    # Snapshots left by a previous run would be counted again
+    if os.path.isdir(metrics_dir):
+        for name in os.listdir(metrics_dir):
+            if name.endswith(".json"):
+                os.remove(os.path.join(metrics_dir, name))
+
+
+def worker_exit(server, worker):
+    # Numbers recorded since the last periodic flush
+    from metrics import registry
+    registry.flush()
+
+
+def child_exit(server, worker):
+    from metrics import mark_process_dead
+    mark_process_dead(metrics_dir, worker.pid)
@@ -0,0 +1,58 @@
+"""Time-ordered ids that workers can mint without coordinating.
+
+An id is 10 Crockford base32 characters of millisecond timestamp followed by
+8 characters (40 bits) of randomness, so ids sort by creation time as plain
+strings, and two workers minting an id in the same millisecond collide with
+probability 2**-40. Ids minted by one process in the same millisecond
+increment the random part instead of drawing a new one, so they stay in
+order too.
+"""
+import os
+import threading
+import time
+
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+TIME_CHARS = 10
+RANDOM_CHARS = 8
+RANDOM_LIMIT = 32 ** RANDOM_CHARS
+
+_lock = threading.Lock()
+_last = (0, 0)  # (milliseconds, random part) of the last id minted here
+
+
+def _reset_after_fork():
+    # A forked worker must not continue the parent's sequence
+    global _last
+    _last = (0, 0)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _encode(value, length):
+    chars = []
+    for _ in range(length):
+        value, digit = divmod(value, 32)
+        chars.append(ALPHABET[digit])
+    return ''.join(reversed(chars))
+
+
+def _random_part():
+    return int.from_bytes(os.urandom(5), 'big')
+
+
+def new_id():
+    global _last
+    with _lock:
+        millis = time.time_ns() // 1_000_000
+        last_millis, last_random = _last
+        if millis <= last_millis:
+            # Same millisecond, or the clock stepped back: stay after the last id
+            millis, random_part = last_millis, last_random + 1
+            if random_part >= RANDOM_LIMIT:
+                millis, random_part = millis + 1, _random_part()
+        else:
+            random_part = _random_part()
+        _last = (millis, random_part)
+    return _encode(millis, TIME_CHARS) + _encode(random_part, RANDOM_CHARS)
@@ -0,0 +1,95 @@
+"""Keyset-paginated project listing for the admin API.
+
+``ProjectListing`` is a store index holding the projects' (createdAt, id)
+keys in sorted lists: one for all projects plus one per status and per
+payment status. A page walks the smallest list that matches the filters,
+starting just past the cursor, so its cost depends on the page size and
+not on how many projects have accumulated. A search term narrows the walk
+to the ids the search index returns.
+"""
+import base64
+import json
+from bisect import bisect_left, bisect_right, insort
+
+from storage import StoreIndex
+
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Raises ValueError for anything that isn't a cursor we handed out."""
+    try:
+        created_at, record_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception:
+        raise ValueError('invalid cursor')
+    return str(created_at), str(record_id)
+
+
+class ProjectListing(StoreIndex):
+    def __init__(self, search=None):
+        self.search = search
+
+    def reset(self):
+        # None -> every project, ('status', s) / ('paymentStatus', p) -> subsets
+        self._keys = {None: []}
+        # str(id) -> (key, status, paymentStatus, real id)
+        self._entries = {}
+
+    def _lists_for(self, status, payment_status):
+        return [None, ('status', status), ('paymentStatus', payment_status)]
+
+    def apply(self, record_id, record):
+        old = self._entries.pop(str(record_id), None)
+        if old is not None:
+            for name in self._lists_for(old[1], old[2]):
+                keys = self._keys[name]
+                del keys[bisect_left(keys, old[0])]
+        if record is None:
+            return
+        key = (record.get('createdAt') or '', str(record_id))
+        status, payment_status = record.get('status'), record.get('paymentStatus')
+        self._entries[key[1]] = (key, status, payment_status, record_id)
+        for name in self._lists_for(status, payment_status):
+            insort(self._keys.setdefault(name, []), key)
+
+    def page(self, status=None, payment_status=None, q=None, descending=True, limit=50, cursor=None):
+        """Return ``(projects, next_cursor)``; next_cursor is None on the last page."""
+        after = decode_cursor(cursor) if cursor else None
+        with self.synced():
+            candidates = [self._keys[None]]
+            matches = None  # str(id) of the projects matching q
+            if q and self.search is not None:
+                matches = {str(i) for i in self.search.match_ids(q)} & self._entries.keys()
+                candidates.append(sorted(self._entries[i][0] for i in matches))
+            if status:
+                candidates.append(self._keys.get(('status', status), []))
+            if payment_status:
+                candidates.append(self._keys.get(('paymentStatus', payment_status), []))
+            keys = min(candidates, key=len)
+
+            if descending:
+                pos = bisect_left(keys, after) - 1 if after else len(keys) - 1
+                step = -1
+            else:
+                pos = bisect_right(keys, after) if after else 0
+                step = 1
+
+            # Whichever list drives the walk, every filter is checked on each entry
+            matched = []
+            while 0 <= pos < len(keys) and len(matched) < limit:
+                key, entry_status, entry_payment, record_id = self._entries[keys[pos][1]]
+                pos += step
+                if matches is not None and key[1] not in matches:
+                    continue
+                if status and entry_status != status:
+                    continue
+                if payment_status and entry_payment != payment_status:
+                    continue
+                matched.append((key, record_id))
+
+            projects = [self.store.get(record_id) for _, record_id in matched]
+            more = 0 <= pos < len(keys)
+            next_cursor = encode_cursor(matched[-1][0]) if matched and more else None
+            return projects, next_cursor
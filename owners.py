@@ -0,0 +1,107 @@
+"""Which projects belong to which user.
+
+``ProjectOwners`` is registered as an index on the projects store and keeps
+each ``userId``'s project ids, so the "my projects" dashboard and the edit
+count at submission time don't scan every project. ``version()`` changes
+whenever one of the user's projects is added, edited or removed, and is the
+same in every worker, so it can back an ETag. Projects from before owners
+were recorded have no ``userId``; they are found by the client name or
+email stored on them, as the dashboard used to match them.
+
+Edit charges count earlier projects sharing the new one's edit prefix
+(initials plus the last four digits of the submission time). Projects keep it
+in ``editPrefix``; legacy ones were given it as their id.
+"""
+from collections import Counter
+
+from storage import SEQ_FIELD, StoreIndex, normalize_legacy_project
+
+EDIT_PREFIX_LENGTH = 10
+
+# Fields an ownerless (legacy) project is matched to its user by
+LEGACY_OWNER_FIELDS = ('userName', 'userEmail')
+
+
+def edit_prefix_of(record_id, record):
+    return (record.get('editPrefix') or str(record_id))[:EDIT_PREFIX_LENGTH]
+
+
+class ProjectOwners(StoreIndex):
+    def reset(self):
+        # userId, or (field, value) for legacy projects -> {project id: (createdAt, changeSeq)}
+        self._by_user = {}
+        self._owner = {}    # project id -> the keys above it is filed under
+        self._edit_prefixes = Counter()  # edit prefix -> projects with it
+        self._prefix_of = {}             # project id -> (edit prefix, copies of the record)
+
+    def rebuild(self, records, key):
+        self.reset()
+        for record in records:
+            record_id = record.get(key)
+            if record_id in self._prefix_of:
+                # Legacy files repeat some ids, and every copy counted as an edit
+                prefix, copies = self._prefix_of[record_id]
+                self._prefix_of[record_id] = (prefix, copies + 1)
+                self._edit_prefixes[prefix] += 1
+            self.apply(record_id, record)
+
+    def apply(self, record_id, record):
+        copies = 1
+        previous = self._prefix_of.pop(record_id, None)
+        if previous is not None:
+            prefix, copies = previous
+            self._edit_prefixes[prefix] -= copies
+            if not self._edit_prefixes[prefix]:
+                del self._edit_prefixes[prefix]
+        if record is not None:
+            prefix = edit_prefix_of(record_id, record)
+            self._prefix_of[record_id] = (prefix, copies)
+            self._edit_prefixes[prefix] += copies
+        for old in self._owner.pop(record_id, ()):
+            projects = self._by_user[old]
+            del projects[record_id]
+            if not projects:
+                del self._by_user[old]
+        if record is None:
+            return
+        if record.get('userId') is not None:
+            owners = [record['userId']]
+        else:
+            legacy = normalize_legacy_project(record)
+            owners = [(field, legacy[field]) for field in LEGACY_OWNER_FIELDS if legacy.get(field)]
+        if not owners:
+            return
+        self._owner[record_id] = owners
+        entry = (record.get('createdAt') or '', record.get(SEQ_FIELD, 0))
+        for owner in owners:
+            self._by_user.setdefault(owner, {})[record_id] = entry
+
+    def _projects_of(self, user_id, name, email):
+        projects = self._by_user.get(user_id, {})
+        legacy = [self._by_user[key] for key in (('userName', name), ('userEmail', email)) if key in self._by_user]
+        if legacy:
+            projects = dict(projects)
+            for matched in legacy:
+                projects.update(matched)
+        return projects
+
+    def _version(self, projects):
+        # Store-wide change sequences only grow, so (count, newest change)
+        # moves on every add, edit or removal
+        return f"{len(projects)}-{max((seq for _, seq in projects.values()), default=0)}"
+
+    def version(self, user_id, name=None, email=None):
+        with self.synced():
+            return self._version(self._projects_of(user_id, name, email))
+
+    def edit_count(self, prefix):
+        """How many projects have ``prefix`` as their edit prefix."""
+        with self.synced():
+            return self._edit_prefixes.get(prefix[:EDIT_PREFIX_LENGTH], 0)
+
+    def projects(self, user_id, name=None, email=None):
+        """``(version, project ids oldest first)`` for ``user_id``, plus the
+        ownerless projects stored with its ``name`` or ``email`` if given."""
+        with self.synced():
+            projects = self._projects_of(user_id, name, email)
+            return self._version(projects), sorted(projects, key=projects.get)
@@ -0,0 +1,68 @@
+"""Project pricing driven by a rules table.
+
+The rules (base price per complexity, website types with a fixed price,
+delivery surcharges, advance share and edit charges) live in
+``pricing.json`` beside the app. ``PricingEngine`` compiles them once at
+startup into a table keyed by (pricing key, delivery option), so a quote
+is a dict lookup plus a little arithmetic, and project submission, the
+single quote API and the batch API all price the same way.
+"""
+import json
+
+
+class PricingEngine:
+    def __init__(self, rules):
+        self.advance_rate = rules['advanceRate']
+        self.free_edits = rules.get('freeEdits')  # None: edits are never charged
+        self.edit_charge = rules.get('editCharge', 0)
+        default = rules['defaultDelivery']
+        self._default_delivery = (default['charge'], default['days'])
+        self._delivery = {option: (d['charge'], d['days']) for option, d in rules['delivery'].items()}
+        # Website types priced regardless of the complexity picked for them
+        self._type_costs = {('type', t): cost for t, cost in rules.get('websiteTypeCost', {}).items()}
+        self._base_costs = {('complexity', c): cost for c, cost in rules['baseCost'].items()}
+        self._base_costs.update(self._type_costs)
+        # (pricing key, delivery option) -> (base cost, delivery charge, delivery days)
+        self._table = {(key, option): (cost, *delivery)
+                       for key, cost in self._base_costs.items()
+                       for option, delivery in self._delivery.items()}
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def _key(self, website_type, complexity):
+        key = ('type', website_type)
+        return key if key in self._type_costs else ('complexity', complexity)
+
+    def quote(self, website_type, complexity, delivery_option, edit_count=0, strict=False):
+        """Price one configuration. ``edit_count`` is how many projects the
+        user submitted before this one. Unknown complexities cost nothing and
+        unknown delivery options get the default delivery, unless ``strict``,
+        which raises ValueError for either instead."""
+        key = self._key(website_type, complexity)
+        entry = self._table.get((key, delivery_option))
+        if entry is None:
+            if strict and key not in self._base_costs:
+                raise ValueError(f'Unknown complexity: {complexity}')
+            if strict and delivery_option not in self._delivery:
+                raise ValueError(f'Unknown delivery option: {delivery_option}')
+            entry = (self._base_costs.get(key, 0),
+                     *self._delivery.get(delivery_option, self._default_delivery))
+        base_cost, delivery_charges, delivery_days = entry
+
+        edit_charges = 0
+        if self.free_edits is not None:
+            edit_charges = max(0, edit_count - self.free_edits) * self.edit_charge
+        total_cost = base_cost + edit_charges + delivery_charges
+        advance_amount = total_cost * self.advance_rate
+        return {
+            'baseCost': base_cost,
+            'deliveryCharges': delivery_charges,
+            'deliveryDays': delivery_days,
+            'editCharges': edit_charges,
+            'totalCost': total_cost,
+            'advanceAmount': advance_amount,
+            'finalAmount': total_cost - advance_amount,
+        }
@@ -0,0 +1,231 @@
+"""Inverted index over project text for the admin search box.
+
+``ProjectSearchIndex`` is a store index mapping each token of a project's
+website name, client name, username, email, id and description to the
+projects containing it. Every query term is matched as a prefix (so
+type-ahead works on partial words) and results are ranked by the summed
+field weights of the matching tokens.
+
+Postings are grouped by weight, so a ranked search walks the best-scoring
+projects first and stops once no remaining project can enter the top
+``limit``; common words cost about as much as rare ones. Queries of several
+terms walk combinations of those groups, best total first, intersecting
+their id sets.
+"""
+from heapq import heappop, heappush, heappushpop
+import re
+from bisect import bisect_left, insort
+from itertools import chain
+
+from storage import StoreIndex
+
+TOKEN_RE = re.compile(r'\w+')
+
+# Matches in the fields admins usually search by count for more
+FIELD_WEIGHTS = {
+    'id': 3.0,
+    'websiteName': 3.0,
+    'userName': 2.0,
+    'username': 2.0,
+    'userEmail': 1.0,
+    'email': 1.0,
+    'description': 1.0,
+}
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(str(text).lower()) if text else []
+
+
+class ProjectSearchIndex(StoreIndex):
+    # Prefixes shorter than this only match whole tokens; longer ones expand
+    # to at most max_expansions vocabulary entries
+    min_prefix = 2
+    max_expansions = 64
+
+    def reset(self):
+        self._postings = {}   # token -> {weight: set of project ids}
+        self._doc_terms = {}  # project id -> {token: weight}
+        self._vocab = []      # sorted tokens, for prefix lookups
+        self._bulk = False
+
+    def rebuild(self, records, key):
+        # Sort the vocabulary once instead of insorting token by token
+        self.reset()
+        self._bulk = True
+        for record in records:
+            self.apply(record.get(key), record)
+        self._vocab = sorted(self._postings)
+        self._bulk = False
+
+    def _terms(self, record):
+        terms = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(record.get(field)):
+                terms[token] = terms.get(token, 0) + weight
+        return terms
+
+    def apply(self, record_id, record):
+        old = self._doc_terms.pop(record_id, None)
+        if old:
+            for token, weight in old.items():
+                buckets = self._postings[token]
+                buckets[weight].discard(record_id)
+                if not buckets[weight]:
+                    del buckets[weight]
+                    if not buckets:
+                        del self._postings[token]
+                        if not self._bulk:
+                            del self._vocab[bisect_left(self._vocab, token)]
+        if record is None:
+            return
+        terms = self._terms(record)
+        self._doc_terms[record_id] = terms
+        for token, weight in terms.items():
+            buckets = self._postings.get(token)
+            if buckets is None:
+                buckets = self._postings[token] = {}
+                if not self._bulk:
+                    insort(self._vocab, token)
+            buckets.setdefault(weight, set()).add(record_id)
+
+    def _expand(self, term):
+        """The ``(token, boost)`` pairs one query term matches."""
+        if len(term) < self.min_prefix:
+            return [(term, 1.0)] if term in self._postings else []
+        start = bisect_left(self._vocab, term)
+        expansions = []
+        for token in self._vocab[start:start + self.max_expansions]:
+            if not token.startswith(term):
+                break
+            # Whole-word matches rank above partial ones
+            expansions.append((token, 1.0 if token == term else 0.5))
+        return expansions
+
+    def _plan(self, query):
+        """Expanded query terms; empty if any term matches nothing."""
+        expanded = [self._expand(term) for term in tokenize(query)]
+        if not expanded or not all(expanded):
+            return []
+        return expanded
+
+    def _term_score(self, record_id, boosts):
+        """A project's score for one term: its best-weighted matching token."""
+        terms = self._doc_terms[record_id]
+        return max((terms[token] * boosts[token] for token in boosts.keys() & terms.keys()), default=0)
+
+    def _levels(self, expansions):
+        """One term's postings as ``(score, size, [id sets])``, best score first."""
+        levels = {}
+        for token, boost in expansions:
+            for weight, ids in self._postings[token].items():
+                levels.setdefault(weight * boost, []).append(ids)
+        return [(score, sum(map(len, sets)), sets) for score, sets in sorted(levels.items(), reverse=True)]
+
+    def match_ids(self, query):
+        with self.synced():
+            # Each term's postings, narrowest term first; every later term only
+            # has to be checked against the ids still matching
+            terms = sorted(([ids for token, _ in expansions for ids in self._postings[token].values()]
+                            for expansions in self._plan(query)), key=lambda sets: sum(map(len, sets)))
+            if not terms:
+                return set()
+            ids = set().union(*terms[0])
+            for sets in terms[1:]:
+                if not ids:
+                    break
+                ids = set().union(*(ids & term_ids for term_ids in sets))
+            return ids
+
+    def search(self, query, limit=20):
+        """Best matches first, as ``[(project id, score), ...]``.
+
+        Reads each term's weight buckets best first and stops as soon as the
+        projects not yet seen can no longer beat the current top ``limit``.
+        """
+        with self.synced():
+            plan = self._plan(query)
+            if not plan or limit <= 0:
+                return []
+            if len(plan) > 1:
+                return self._search_terms(plan, limit)
+            boosts = [dict(expansions) for expansions in plan]
+            lists = [self._levels(expansions) for expansions in plan]
+            position = [0] * len(lists)
+            # No unseen project can score more than the sum of the current levels
+            bound = sum(levels[0][0] for levels in lists)
+            seen = set()
+            top = []  # min-heap of (score, -arrival, id)
+            while True:
+                # Draining the smallest level is the cheapest way to lower the bound
+                n = min(range(len(lists)), key=lambda i: lists[i][position[i]][1])
+                level_score, _, level_ids = lists[n][position[n]]
+                others = boosts[:n] + boosts[n + 1:]
+                for record_id in chain.from_iterable(level_ids):
+                    if len(top) == limit and bound <= top[0][0]:
+                        break
+                    if record_id in seen:
+                        continue
+                    seen.add(record_id)
+                    # Seen first at this level, so this is its best score for term n
+                    total = level_score
+                    for term_boosts in others:
+                        score = self._term_score(record_id, term_boosts)
+                        if not score:
+                            break
+                        total += score
+                    else:
+                        item = (total, -len(seen), record_id)
+                        if len(top) < limit:
+                            heappush(top, item)
+                        else:
+                            heappushpop(top, item)
+                else:
+                    position[n] += 1
+                    if position[n] < len(lists[n]):
+                        bound += lists[n][position[n]][0] - lists[n][position[n] - 1][0]
+                        continue
+                # Stopped early, or every project matching term n has been seen
+                break
+            return [(record_id, score) for score, _, record_id in sorted(top, reverse=True)]
+
+    def _search_terms(self, plan, limit):
+        """``search()`` for several terms.
+
+        Walks combinations of one score level per term, best total first,
+        and intersects their id sets starting from the smallest level. A
+        project first turns up in the combination of its best level for
+        every term, so results come out in rank order and the walk stops
+        once it has ``limit`` of them.
+        """
+        lists = [self._levels(expansions) for expansions in plan]
+
+        def total(combination):
+            return sum(lists[term][level][0] for term, level in enumerate(combination))
+
+        first = (0,) * len(lists)
+        queue = [(-total(first), first)]
+        queued = {first}
+        seen = set()
+        results = []
+        while queue and len(results) < limit:
+            score, combination = heappop(queue)
+            # Set intersections only touch as many ids as the smaller side has
+            levels = sorted((lists[term][level] for term, level in enumerate(combination)), key=lambda entry: entry[1])
+            found = []
+            for ids in levels[0][2]:
+                for _, _, sets in levels[1:]:
+                    ids = set().union(*(ids & level_ids for level_ids in sets)) if len(sets) > 1 else ids & sets[0]
+                    if not ids:
+                        break
+                found.append(ids)
+            ids = set().union(*found) - seen
+            seen |= ids
+            results.extend((record_id, -score) for record_id in ids)
+            for term, level in enumerate(combination):
+                if level + 1 < len(lists[term]):
+                    following = combination[:term] + (level + 1,) + combination[term + 1:]
+                    if following not in queued:
+                        queued.add(following)
+                        heappush(queue, (-total(following), following))
+        return results[:limit]
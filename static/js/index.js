@@ -0,0 +1,517 @@
+// Session details the template renders into #pageData
+const pageData = JSON.parse(document.getElementById('pageData').textContent);
+
+let uploadedFiles = [];
+// Sent with every attempt at submitting this form, so a double click or
+// retry is answered with the first submission instead of a duplicate
+const submissionKey = Date.now().toString(36) + '-' + Math.random().toString(36).slice(2);
+let selectedWebsiteType = '';
+
+// FIXED: Website Type Selection Function
+function selectWebsiteType(type, element) {
+    // Remove selected class from all options
+    document.querySelectorAll('.website-type-option').forEach(opt => {
+        opt.classList.remove('selected');
+    });
+
+    // Add selected class to clicked option
+    element.classList.add('selected');
+
+    // Set the hidden input value
+    selectedWebsiteType = type;
+    document.getElementById('websiteType').value = type;
+
+    // Hide error message
+    hideError('websiteTypeError');
+
+    // Auto-set complexity for WWW and E-commerce
+    const complexitySelect = document.getElementById('complexity');
+    if (type === 'www' || type === 'ecommerce') {
+        complexitySelect.value = 'medium';
+        complexitySelect.disabled = true;
+    } else {
+        complexitySelect.disabled = false;
+        if (!complexitySelect.value) {
+            complexitySelect.value = '';
+        }
+    }
+    updateQuote();
+}
+
+// Live price estimate from the server's pricing rules
+let quoteTimer = null;
+function updateQuote() {
+    clearTimeout(quoteTimer);
+    quoteTimer = setTimeout(() => {
+        const delivery = document.querySelector('input[name="deliveryOption"]:checked');
+        const params = new URLSearchParams({
+            websiteType: selectedWebsiteType,
+            complexity: document.getElementById('complexity').value,
+            deliveryOption: delivery ? delivery.value : 'normal'
+        });
+        const estimate = document.getElementById('priceEstimate');
+        fetch('/api/quote?' + params)
+            .then(response => response.ok ? response.json() : null)
+            .then(quote => {
+                if (!quote) {
+                    estimate.style.display = 'none';
+                    return;
+                }
+                document.getElementById('priceEstimateText').textContent =
+                    `₹${quote.totalCost.toLocaleString('en-IN')} (₹${quote.advanceAmount.toLocaleString('en-IN')} advance, ${quote.deliveryDays}-day delivery)`;
+                estimate.style.display = '';
+            })
+            .catch(() => {
+                estimate.style.display = 'none';
+            });
+    }, 150);
+}
+
+// Helper function to show error
+function showError(fieldId, message) {
+    const errorElement = document.getElementById(fieldId + 'Error');
+    const fieldElement = document.getElementById(fieldId);
+    if (errorElement && fieldElement) {
+        errorElement.textContent = message;
+        errorElement.style.display = 'block';
+        fieldElement.parentElement.classList.add('error');
+    }
+}
+
+// Helper function to hide error
+function hideError(fieldId) {
+    const errorElement = document.getElementById(fieldId);
+    const fieldElement = document.getElementById(fieldId.replace('Error', ''));
+    if (errorElement && fieldElement) {
+        errorElement.style.display = 'none';
+        fieldElement.parentElement.classList.remove('error');
+    }
+}
+
+// Validate form function
+function validateForm() {
+    let isValid = true;
+
+    // Clear all errors first
+    document.querySelectorAll('.error-message').forEach(error => {
+        error.style.display = 'none';
+    });
+    document.querySelectorAll('.form-group').forEach(group => {
+        group.classList.remove('error');
+    });
+
+    // Check website type
+    if (!selectedWebsiteType) {
+        showError('websiteType', 'Please select a website type');
+        isValid = false;
+    }
+
+    // Check all required fields
+    const requiredFields = [
+        'userName', 'email', 'phone', 'category', 
+        'websiteName', 'description', 'complexity'
+    ];
+
+    requiredFields.forEach(field => {
+        const element = document.getElementById(field);
+        if (!element || !element.value.trim()) {
+            const fieldName = field.replace(/([A-Z])/g, ' $1').toLowerCase();
+            showError(field, `Please enter ${fieldName}`);
+            isValid = false;
+        }
+    });
+
+    // Check email format
+    const email = document.getElementById('email').value;
+    const emailRegex = /^[^\s@]+@[^\s@]+\.[^\s@]+$/;
+    if (email && !emailRegex.test(email)) {
+        showError('email', 'Please enter a valid email address');
+        isValid = false;
+    }
+
+    // Check delivery option
+    const deliveryOption = document.querySelector('input[name="deliveryOption"]:checked');
+    if (!deliveryOption) {
+        showError('deliveryOption', 'Please select a delivery option');
+        isValid = false;
+    }
+
+    return isValid;
+}
+
+// Check if user is logged in and adjust menu
+function checkAuthStatus() {
+    const authButtons = document.getElementById('authButtons');
+    const userInfo = document.getElementById('userInfo');
+    const userNameDisplay = document.getElementById('userNameDisplay');
+    const submitBtn = document.getElementById('submitBtn');
+    const loginNotice = document.getElementById('loginNotice');
+
+    const isLoggedIn = Boolean(pageData.username);
+    const username = pageData.username;
+
+    if (isLoggedIn && username) {
+        authButtons.style.display = 'none';
+        userInfo.style.display = 'flex';
+        userNameDisplay.textContent = username;
+        submitBtn.disabled = false;
+        submitBtn.style.opacity = "1";
+        submitBtn.style.cursor = "pointer";
+        loginNotice.style.display = 'none';
+
+        // Auto-fill user data if available
+        const userNameInput = document.getElementById('userName');
+        const emailInput = document.getElementById('email');
+        if (userNameInput && !userNameInput.value) {
+            userNameInput.value = pageData.userName;
+        }
+        if (emailInput && !emailInput.value) {
+            emailInput.value = pageData.userEmail;
+        }
+    } else {
+        authButtons.style.display = 'flex';
+        userInfo.style.display = 'none';
+        submitBtn.disabled = true;
+        submitBtn.style.opacity = "0.5";
+        submitBtn.style.cursor = "not-allowed";
+        loginNotice.style.display = 'block';
+    }
+}
+
+// Section navigation
+function showSection(sectionId) {
+    // Hide all sections
+    document.querySelectorAll('.page-section').forEach(section => {
+        section.classList.remove('active');
+    });
+
+    // Remove active class from all nav links
+    document.querySelectorAll('.nav-link').forEach(link => {
+        link.classList.remove('active');
+    });
+
+    // Show selected section
+    document.getElementById(sectionId).classList.add('active');
+
+    // Add active class to clicked nav link
+    event.currentTarget.classList.add('active');
+
+    // Close mobile menu if open
+    const navToggle = document.getElementById('navToggle');
+    const navMenu = document.getElementById('navMenu');
+    if (navToggle && navMenu) {
+        navToggle.classList.remove('active');
+        navMenu.classList.remove('active');
+    }
+
+    // Scroll to top
+    window.scrollTo(0, 0);
+}
+
+// Mobile menu toggle
+document.getElementById('navToggle').addEventListener('click', function() {
+    this.classList.toggle('active');
+    document.getElementById('navMenu').classList.toggle('active');
+});
+
+// File upload functionality
+const dropZone = document.getElementById('dropZone');
+const fileInput = document.createElement('input');
+fileInput.type = 'file';
+fileInput.multiple = true;
+fileInput.style.display = 'none';
+
+dropZone.addEventListener('click', () => fileInput.click());
+dropZone.addEventListener('dragover', (e) => {
+    e.preventDefault();
+    dropZone.classList.add('highlight');
+});
+dropZone.addEventListener('dragleave', () => {
+    dropZone.classList.remove('highlight');
+});
+dropZone.addEventListener('drop', (e) => {
+    e.preventDefault();
+    dropZone.classList.remove('highlight');
+    handleFiles(e.dataTransfer.files);
+});
+fileInput.addEventListener('change', (e) => handleFiles(e.target.files));
+
+function handleFiles(files) {
+    for (let file of files) {
+        if (file.size > 500 * 1024 * 1024) {
+            alert('File too large: ' + file.name + '. Maximum size is 500MB.');
+            continue;
+        }
+
+        uploadedFiles.push(file);
+        addFilePreview(file);
+    }
+}
+
+function addFilePreview(file) {
+    const preview = document.getElementById('filePreview');
+    const fileItem = document.createElement('div');
+    fileItem.className = 'file-item';
+    fileItem.innerHTML = `
+        <div class="file-info">
+            <i class="fas fa-file"></i>
+            <div class="file-details">
+                <div class="file-name">${file.name}</div>
+                <div class="file-size">${(file.size / 1024 / 1024).toFixed(2)} MB</div>
+            </div>
+        </div>
+        <button type="button" class="file-remove" onclick="removeFile('${file.name}')">
+            <i class="fas fa-times"></i>
+        </button>
+    `;
+    preview.appendChild(fileItem);
+}
+
+function removeFile(fileName) {
+    uploadedFiles = uploadedFiles.filter(file => file.name !== fileName);
+    document.getElementById('filePreview').innerHTML = '';
+    uploadedFiles.forEach(file => addFilePreview(file));
+}
+
+// Resumable uploads: each file goes up in chunks at the offset the server
+// says it has, so a dropped connection only costs the chunk in flight
+const UPLOAD_CHUNK_SIZE = 5 * 1024 * 1024;
+const UPLOAD_RETRIES = 5;
+
+async function uploadFile(file, onProgress) {
+    let response = await fetch('/api/uploads', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ name: file.name, size: file.size, type: file.type })
+    });
+    let status = await response.json();
+    if (!response.ok) {
+        throw new Error(status.error || 'Could not start the upload');
+    }
+
+    let failures = 0;
+    while (!status.complete) {
+        const end = Math.min(status.offset + Math.min(UPLOAD_CHUNK_SIZE, status.maxChunk), file.size);
+        try {
+            response = await fetch('/api/uploads/' + status.uploadId, {
+                method: 'PUT',
+                headers: { 'Upload-Offset': String(status.offset) },
+                body: file.slice(status.offset, end)
+            });
+        } catch (error) {
+            // Connection dropped: wait, ask how much arrived and carry on from there
+            if (++failures > UPLOAD_RETRIES) {
+                throw error;
+            }
+            await new Promise(resolve => setTimeout(resolve, 1000 * failures));
+            try {
+                const resume = await fetch('/api/uploads/' + status.uploadId);
+                if (resume.ok) {
+                    status = await resume.json();
+                }
+            } catch (ignored) {}
+            continue;
+        }
+
+        const data = await response.json();
+        if (response.status === 409) {
+            status.offset = data.offset;
+        } else if (!response.ok) {
+            throw new Error(data.error || 'Upload failed');
+        } else {
+            status = data;
+            failures = 0;
+        }
+        if (onProgress) {
+            onProgress(file, file.size ? status.offset / file.size : 1);
+        }
+    }
+    return status.attachment.id;
+}
+
+// Upload every selected file; resolves to the attachment ids to submit
+async function uploadAttachments(onProgress) {
+    const attachments = [];
+    for (const file of uploadedFiles) {
+        attachments.push(await uploadFile(file, onProgress));
+    }
+    return attachments;
+}
+
+// FIXED: Project form submission
+document.getElementById('projectForm').addEventListener('submit', async function(e) {
+    e.preventDefault();
+
+    const isLoggedIn = Boolean(pageData.username);
+
+    if (!isLoggedIn) {
+        alert('Please login to submit a project');
+        window.location.href = '/login';
+        return;
+    }
+
+    // Validate form
+    if (!validateForm()) {
+        return;
+    }
+
+    const deliveryOption = document.querySelector('input[name="deliveryOption"]:checked');
+
+    // Prepare form data according to backend expectations
+    const formData = {
+        userName: document.getElementById('userName').value,
+        email: document.getElementById('email').value,
+        phone: document.getElementById('phone').value,
+        category: document.getElementById('category').value,
+        websiteType: selectedWebsiteType,
+        complexity: document.getElementById('complexity').value,
+        websiteName: document.getElementById('websiteName').value,
+        description: document.getElementById('description').value,
+        deliveryOption: deliveryOption.value
+    };
+
+    // Show loading state
+    const submitBtn = document.getElementById('submitBtn');
+    const originalText = submitBtn.innerHTML;
+    submitBtn.disabled = true;
+    submitBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Submitting...';
+
+    try {
+        formData.attachments = await uploadAttachments((file, done) => {
+            submitBtn.innerHTML = `<i class="fas fa-spinner fa-spin"></i> Uploading ${file.name} (${Math.floor(done * 100)}%)...`;
+        });
+    } catch (error) {
+        alert('Upload failed: ' + error.message);
+        submitBtn.disabled = false;
+        submitBtn.innerHTML = originalText;
+        return;
+    }
+    submitBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Submitting...';
+
+    try {
+        const response = await fetch('/api/projects', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Idempotency-Key': submissionKey,
+            },
+            body: JSON.stringify(formData)
+        });
+
+        const data = await response.json();
+
+        if (data.success) {
+            // Success - redirect to success page
+            window.location.href = '/success/' + data.projectId;
+        } else {
+            // Show server error
+            alert('Error: ' + (data.error || 'Failed to submit project'));
+            submitBtn.disabled = false;
+            submitBtn.innerHTML = originalText;
+        }
+    } catch (error) {
+        console.error('Submission error:', error);
+        alert('Network error. Please check your connection and try again.');
+        submitBtn.disabled = false;
+        submitBtn.innerHTML = originalText;
+    }
+});
+
+// Load user projects
+function loadUserProjects() {
+    const isLoggedIn = Boolean(pageData.username);
+
+    if (!isLoggedIn) {
+        return;
+    }
+
+    fetch('/api/projects/user')
+        .then(response => response.json())
+        .then(projects => {
+            const container = document.getElementById('projectsContainer');
+
+            if (!projects || projects.length === 0) {
+                container.innerHTML = `
+                    <div class="no-projects">
+                        <i class="fas fa-folder-open"></i>
+                        <h3>No Projects Yet</h3>
+                        <p>You haven't submitted any projects. Start by creating your first project!</p>
+                        <a href="#" class="btn btn-primary" onclick="showSection('project-form')">
+                            <i class="fas fa-plus"></i>
+                            Start Your First Project
+                        </a>
+                    </div>
+                `;
+                return;
+            }
+
+            container.innerHTML = `
+                <div class="projects-grid">
+                    ${projects.map(project => `
+                        <div class="project-card">
+                            <div class="project-header">
+                                <h3>${project.websiteName}</h3>
+                                <span class="status-badge status-${project.status || 'submitted'}">${project.status || 'submitted'}</span>
+                            </div>
+                            <div class="project-details">
+                                <div class="detail-item">
+                                    <label>Project ID:</label>
+                                    <span>${project.id}</span>
+                                </div>
+                                <div class="detail-item">
+                                    <label>Type:</label>
+                                    <span>${project.websiteType}</span>
+                                </div>
+                                <div class="detail-item">
+                                    <label>Complexity:</label>
+                                    <span>${project.complexity}</span>
+                                </div>
+                                <div class="detail-item">
+                                    <label>Total Cost:</label>
+                                    <span class="price">₹${project.totalCost || '0'}</span>
+                                </div>
+                                <div class="detail-item">
+                                    <label>Delivery Date:</label>
+                                    <span>${project.deliveryDate || 'Not set'}</span>
+                                </div>
+                            </div>
+                            <div class="project-description">
+                                <label>Description:</label>
+                                <div class="description-content">
+                                    ${project.description}
+                                </div>
+                            </div>
+                            <div class="project-actions">
+                                <a href="/success/${project.id}" class="btn btn-primary">
+                                    <i class="fas fa-eye"></i>
+                                    View Details
+                                </a>
+                            </div>
+                        </div>
+                    `).join('')}
+                </div>
+            `;
+        })
+        .catch(error => {
+            console.error('Error loading projects:', error);
+        });
+}
+
+// Initialize page
+document.addEventListener('DOMContentLoaded', function() {
+    checkAuthStatus();
+    loadUserProjects();
+    document.getElementById('complexity').addEventListener('change', updateQuote);
+    document.querySelectorAll('input[name="deliveryOption"]').forEach(radio => {
+        radio.addEventListener('change', updateQuote);
+    });
+
+    // Add real-time validation
+    document.querySelectorAll('input, select, textarea').forEach(element => {
+        element.addEventListener('input', function() {
+            hideError(this.id + 'Error');
+        });
+    });
+});
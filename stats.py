@@ -0,0 +1,116 @@
+"""Dashboard statistics kept up to date as projects are written.
+
+``ProjectStats`` is registered as an index on the projects store, so each
+create/update/payment adjusts a handful of counters instead of the admin page
+downloading every project and adding them up in the browser. Archived
+projects are counted by a second ``ProjectStats`` on the archive index, passed
+in as ``archived``, so moving projects to cold storage leaves the totals as
+they were.
+"""
+from collections import Counter, defaultdict
+from contextlib import nullcontext
+from types import SimpleNamespace
+
+from storage import StoreIndex
+
+COMPLETED_STATUSES = ('completed', 'delivered')
+
+
+class ProjectStats(StoreIndex):
+    def __init__(self, archived=None):
+        self.archived = archived
+
+    def reset(self):
+        # id -> what that project currently contributes to the totals
+        self._contributions = {}
+        self.total = 0
+        self.statuses = Counter()
+        self.revenue = 0
+        self.clients = Counter()
+        self.daily_revenue = defaultdict(float)
+        self.monthly_revenue = defaultdict(float)
+        self.advance_paid = Counter()
+        self.full_paid = Counter()
+
+    def _contribution(self, project):
+        created = project.get('createdAt') or ''
+        if project.get('fullPaid'):
+            paid = 'full'
+        elif project.get('advancePaid'):
+            paid = 'advance'
+        else:
+            paid = None
+        return (project.get('status'), project.get('totalCost') or 0,
+                project.get('advanceAmount') or 0, project.get('userId'),
+                created[:10], created[:7], paid)
+
+    def _add(self, contribution, sign):
+        status, cost, advance, user_id, day, month, paid = contribution
+        self.total += sign
+        self.statuses[status] += sign
+        self.revenue += sign * cost
+        if user_id is not None:
+            self.clients[user_id] += sign
+            if self.clients[user_id] == 0:
+                del self.clients[user_id]
+        if day:
+            self.daily_revenue[day] += sign * cost
+            self.monthly_revenue[month] += sign * cost
+        if paid == 'full':
+            self.full_paid['count'] += sign
+            self.full_paid['amount'] += sign * cost
+        elif paid == 'advance':
+            self.advance_paid['count'] += sign
+            self.advance_paid['amount'] += sign * advance
+
+    def apply(self, record_id, record):
+        old = self._contributions.pop(record_id, None)
+        if old is not None:
+            self._add(old, -1)
+        if record is not None:
+            new = self._contribution(record)
+            self._contributions[record_id] = new
+            self._add(new, 1)
+
+    def _combined(self):
+        """Counters of this index plus the archived projects' (caller holds both synced)."""
+        parts = (self, self.archived)
+        return SimpleNamespace(
+            total=sum(p.total for p in parts),
+            statuses=sum((p.statuses for p in parts), Counter()),
+            revenue=sum(p.revenue for p in parts),
+            clients=set().union(*(p.clients for p in parts)),
+            daily_revenue=sum((Counter(p.daily_revenue) for p in parts), Counter()),
+            monthly_revenue=sum((Counter(p.monthly_revenue) for p in parts), Counter()),
+            advance_paid=sum((p.advance_paid for p in parts), Counter()),
+            full_paid=sum((p.full_paid for p in parts), Counter()),
+        )
+
+    def summary(self, days=30):
+        """JSON-ready totals plus the most recent ``days`` daily rollups."""
+        with self.synced(), self.archived.synced() if self.archived else nullcontext():
+            totals = self._combined() if self.archived else self
+            collected = totals.full_paid['amount'] + totals.advance_paid['amount']
+            return {
+                'total': totals.total,
+                'pending': totals.statuses['pending'],
+                'inProgress': totals.statuses['in-progress'],
+                'completed': sum(totals.statuses[s] for s in COMPLETED_STATUSES),
+                'byStatus': {status: n for status, n in totals.statuses.items() if n and status is not None},
+                'revenue': totals.revenue,
+                'clients': len(totals.clients),
+                'payments': {
+                    'advancePaidCount': totals.advance_paid['count'],
+                    'advancePaidAmount': totals.advance_paid['amount'],
+                    'fullPaidCount': totals.full_paid['count'],
+                    'fullPaidAmount': totals.full_paid['amount'],
+                    'collected': collected,
+                    'outstanding': totals.revenue - collected,
+                },
+                # [-0:] would be every day, so zero or fewer days means none
+                'dailyRevenue': {day: totals.daily_revenue[day]
+                                 for day in (sorted(totals.daily_revenue)[-days:] if days > 0 else ())
+                                 if totals.daily_revenue[day]},
+                'monthlyRevenue': {month: amount for month, amount in sorted(totals.monthly_revenue.items())
+                                   if amount},
+            }
@@ -0,0 +1,786 @@
+"""Record stores for the Innovators United JSON data files.
+
+The apps keep projects and users as JSON lists on disk. Parsing the whole
+file on every request gets expensive as it grows, so a store keeps the parsed
+list in memory and only re-reads the file when its on-disk signature changes
+(another gunicorn worker wrote it).
+
+Every upsert stamps the record with ``changeSeq``, a counter that increases
+across all workers, so pollers can ask for "what changed since cursor N".
+Deletes take a number from the same counter, so they are reported too.
+
+Three on-disk layouts are available, picked with ``STORAGE_BACKEND``:
+
+* ``json`` (default) - the whole list is rewritten on every change.
+* ``journal`` - each change is appended to ``<file>.journal`` and folded back
+  into the JSON snapshot by a periodic compaction.
+* ``sqlite`` - records live in ``SQLITE_PATH`` (WAL mode) with indexed
+  lookup columns. Import the existing files once with
+  ``python storage.py migrate-sqlite``.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from metrics import registry
+
+try:
+    import fcntl
+except ImportError:  # Windows (run.bat) - single process, no locking needed
+    fcntl = None
+
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'json')
+SQLITE_PATH = os.environ.get('SQLITE_PATH', 'innovators.db')
+
+SEQ_FIELD = 'changeSeq'
+
+LOAD_SECONDS = registry.histogram('store_load_seconds', 'Time spent reading and parsing store data', ('store',))
+SAVE_SECONDS = registry.histogram('store_save_seconds', 'Time spent serializing and writing store data', ('store',))
+
+# Fields copied out of each JSON document into indexed SQLite columns
+# (every table also gets an indexed SEQ_FIELD column)
+SQLITE_INDEXES = {
+    'projects': ('userId', 'userName', 'userEmail', 'status', 'createdAt'),
+    'users': ('username', 'email'),
+    'attachments': ('ownerId', 'sha256'),
+}
+
+
+@contextmanager
+def file_lock(lock_path, exclusive=True):
+    """Hold an flock on ``lock_path`` so gunicorn workers don't interleave writes."""
+    if fcntl is None:
+        yield
+        return
+    with open(lock_path, 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _write_atomic(path, text):
+    """Write ``text`` to a temp file next to ``path`` and rename it into place."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class StoreIndex:
+    """Base class for data derived from a store's records (counters, lookup
+    tables) that must never fall back to rescanning the store.
+
+    Once registered with ``store.add_index()``, the store calls ``rebuild()``
+    after a full reload and ``apply()`` for each record it writes or replays,
+    so subclasses only implement ``reset()`` and ``apply()``; ``apply()``
+    must undo whatever the previous version of the same id contributed.
+    Query methods run inside ``with self.synced():`` so they see writes made
+    by other workers.
+    """
+
+    store = None
+
+    def reset(self):
+        raise NotImplementedError
+
+    def apply(self, record_id, record):
+        raise NotImplementedError
+
+    def rebuild(self, records, key):
+        self.reset()
+        for record in records:
+            self.apply(record.get(key), record)
+
+    @contextmanager
+    def synced(self):
+        with self.store._lock:
+            self.store.refresh()
+            yield
+
+
+class Transaction:
+    """Changes staged inside ``store.transaction()``.
+
+    Reads see the store as of the moment the lock was taken plus anything
+    staged here; nothing is written until the ``with`` block exits cleanly.
+    """
+
+    def __init__(self, store):
+        self._store = store
+        self.changes = {}
+        self.deleted = set()
+
+    def get(self, record_id):
+        if record_id in self.changes:
+            return self.changes[record_id]
+        if record_id in self.deleted:
+            return None
+        return self._store._get_copy(record_id)
+
+    def all(self):
+        key = self._store.key
+        records = [self.changes.get(r.get(key), r) for r in self._store._records
+                   if r.get(key) not in self.deleted]
+        known = self._store._by_id
+        records.extend(r for record_id, r in self.changes.items() if record_id not in known)
+        return records
+
+    def find(self, field, value):
+        found = {r.get(self._store.key): r for r in self._store.find(field, value)}
+        for record_id in self.deleted:
+            found.pop(record_id, None)
+        for record_id, record in self.changes.items():
+            if record.get(field) == value:
+                found[record_id] = record
+            else:
+                found.pop(record_id, None)
+        return list(found.values())
+
+    def count(self):
+        return (self._store.count()
+                + sum(1 for record_id in self.changes if self._store._get_copy(record_id) is None)
+                - sum(1 for record_id in self.deleted if self._store._get_copy(record_id) is not None))
+
+    def upsert(self, record):
+        record_id = record.get(self._store.key)
+        self.deleted.discard(record_id)
+        self.changes[record_id] = record
+        return record
+
+    def delete(self, record_id):
+        """Remove the record with ``record_id`` when the transaction commits."""
+        self.changes.pop(record_id, None)
+        self.deleted.add(record_id)
+
+
+class SqliteTransaction(Transaction):
+    """Transaction whose reads go to the database instead of a cached list."""
+
+    def all(self):
+        key = self._store.key
+        records = [self.changes.get(r.get(key), r) for r in self._store.all()
+                   if r.get(key) not in self.deleted]
+        known = {r.get(key) for r in records}
+        records.extend(r for record_id, r in self.changes.items() if record_id not in known)
+        return records
+
+
+class JsonStore:
+    """Cached view of a JSON list file, indexed by record id.
+
+    Records returned by ``all()`` are shared with the cache and must be treated
+    as read-only; ``get()`` hands out a copy that can be edited and passed back
+    to ``upsert()``. Read-modify-write sequences go through ``transaction()``,
+    which holds an flock on ``<path>.lock`` so concurrent workers can't lose
+    each other's updates.
+    """
+
+    def __init__(self, path, key='id'):
+        self.path = path
+        self.key = key
+        self.name = os.path.splitext(os.path.basename(path))[0]  # label on the store metrics
+        self.lock_path = path + '.lock'
+        # Deletes take change sequence numbers too, but leave no record to
+        # carry them: [id, changeSeq] pairs kept here tell changes_since()
+        # about them and keep the version from going back
+        self.deleted_path = path + '.deleted'
+        self._deleted = {}
+        self._lock = threading.RLock()
+        self._signature = None
+        self._records = []
+        self._by_id = {}
+        # id -> changeSeq, oldest change first
+        self._seq_order = OrderedDict()
+        self._version = 0
+        self._indexes = []
+
+    # ---------------- internal helpers ----------------
+    def _stat_signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _read_file(self):
+        try:
+            with open(self.deleted_path) as f:
+                self._deleted = {record_id: seq for record_id, seq in json.load(f)}
+        except (FileNotFoundError, ValueError):
+            self._deleted = {}
+        if not os.path.exists(self.path):
+            return []
+        try:
+            with LOAD_SECONDS.time(self.name), open(self.path, 'r') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Could not read {self.path}: {e}")
+            return []
+        return data if isinstance(data, list) else []
+
+    def _diff(self, records):
+        """Records in ``records`` that differ from the loaded list, and ids
+        that are gone from it; None if only a full rebuild is safe."""
+        if len(self._by_id) != len(self._records):
+            return None  # duplicate ids: apply() can't tell the copies apart
+        seen = set()
+        changed = []
+        for record in records:
+            record_id = record.get(self.key)
+            if record_id in seen:
+                return None
+            seen.add(record_id)
+            seq = record.get(SEQ_FIELD, 0)
+            if seq and self._seq_order.get(record_id) == seq:
+                continue
+            # Unstamped (legacy) records have to be compared in full
+            old = self._by_id.get(record_id)
+            if not seq and old is not None and self._records[old] == record:
+                continue
+            changed.append(record)
+        removed = [record_id for record_id in self._by_id if record_id not in seen]
+        return changed, removed
+
+    def _set_records(self, records, signature, changed=None, removed=()):
+        """Swap in a new record list. Indexes are given ``changed`` (the only
+        records that differ from the previous list) and ``removed`` ids when
+        the caller knows them; otherwise the lists are diffed, and rebuilt if
+        that fails."""
+        if changed is None and self._indexes:
+            changed, removed = self._diff(records) or (None, ())
+        for record_id in removed:
+            for index in self._indexes:
+                index.apply(record_id, None)
+        self._records = records
+        self._by_id = {r.get(self.key): i for i, r in enumerate(records)}
+        self._seq_order = OrderedDict(sorted(
+            ((r.get(self.key), r.get(SEQ_FIELD, 0)) for r in records), key=lambda item: item[1]))
+        self._version = max(max(self._seq_order.values(), default=0), max(self._deleted.values(), default=0))
+        self._signature = signature
+        for index in self._indexes:
+            if changed is None:
+                index.rebuild(records, self.key)
+            else:
+                for record in changed:
+                    index.apply(record.get(self.key), record)
+
+    def _stamp(self, changes):
+        """Give each changed record the next change sequence number."""
+        for record in changes.values():
+            self._version += 1
+            record[SEQ_FIELD] = self._version
+
+    def _catch_up(self):
+        """Reload from disk if the file changed since we last saw it."""
+        signature = self._stat_signature()
+        if signature != self._signature or signature is None:
+            self._set_records(self._read_file(), signature)
+
+    def _refresh(self):
+        # Writers replace the file by rename, so an unlocked read never sees
+        # a half-written file.
+        self._catch_up()
+
+    def _get_copy(self, record_id):
+        index = self._by_id.get(record_id)
+        if index is None:
+            return None
+        return dict(self._records[index])
+
+    def _commit(self, records, changed=None, removed=()):
+        with SAVE_SECONDS.time(self.name):
+            _write_atomic(self.path, json.dumps(records, indent=2))
+        self._set_records(records, self._stat_signature(), changed, removed)
+
+    def _write_changes(self, changes, deleted=()):
+        self._stamp(changes)
+        records = list(self._records)
+        for record_id, record in changes.items():
+            index = self._by_id.get(record_id)
+            if index is None:
+                records.append(record)
+            else:
+                records[index] = record
+        removed = [record_id for record_id in deleted if record_id in self._by_id]
+        if removed:
+            records = [r for r in records if r.get(self.key) not in deleted]
+            deleted = dict(self._deleted)
+            for record_id in removed:
+                self._version += 1
+                deleted[record_id] = self._version
+            # Written before the data file, so a reader never sees the
+            # deletes without their sequence numbers
+            _write_atomic(self.deleted_path, json.dumps(list(deleted.items())))
+            self._deleted = deleted
+        self._commit(records, changed=list(changes.values()), removed=removed)
+
+    # ---------------- public API ----------------
+    @contextmanager
+    def transaction(self):
+        """Lock the file, bring the cache up to date and yield a Transaction.
+
+        Staged changes are written to a temp file, fsynced and renamed over the
+        data file before the lock is released. Keep slow work (emails, etc.)
+        outside the block so other workers aren't kept waiting.
+        """
+        with self._lock, file_lock(self.lock_path):
+            self._catch_up()
+            tx = Transaction(self)
+            yield tx
+            if tx.changes or tx.deleted:
+                self._write_changes(tx.changes, tx.deleted)
+
+    def ensure_exists(self):
+        with self._lock:
+            if not os.path.exists(self.path):
+                with file_lock(self.lock_path):
+                    if not os.path.exists(self.path):
+                        self._commit([])
+
+    def all(self):
+        with self._lock:
+            self._refresh()
+            return self._records
+
+    def get(self, record_id):
+        with self._lock:
+            self._refresh()
+            return self._get_copy(record_id)
+
+    def scan(self):
+        """Iterate over the records for streaming; read-only, like ``all()``."""
+        yield from self.all()
+
+    def find(self, field, value):
+        """Records whose ``field`` equals ``value``."""
+        return [r for r in self.all() if r.get(field) == value]
+
+    def count(self):
+        return len(self.all())
+
+    def refresh(self):
+        with self._lock:
+            self._refresh()
+
+    def add_index(self, index):
+        """Keep ``index`` (a StoreIndex) in step with this store."""
+        with self._lock:
+            self._refresh()
+            index.store = self
+            index.rebuild(self._records, self.key)
+            self._indexes.append(index)
+        return index
+
+    def version(self):
+        """Highest change sequence number in the store, deletes included."""
+        with self._lock:
+            self._refresh()
+            return self._version
+
+    def changes_since(self, cursor):
+        """Return ``(new_cursor, records changed after cursor, ids deleted after it)``.
+
+        Changed records come oldest first. An id deleted and then written
+        again is only reported as changed.
+        """
+        with self._lock:
+            self._refresh()
+            changed = []
+            for record_id in reversed(self._seq_order):
+                if self._seq_order[record_id] <= cursor:
+                    break
+                changed.append(self._records[self._by_id[record_id]])
+            removed = [record_id for record_id, seq in self._deleted.items()
+                       if seq > cursor and record_id not in self._by_id]
+            return self._version, changed[::-1], removed
+
+    def upsert(self, record):
+        """Insert a new record or replace the one with the same id."""
+        with self.transaction() as tx:
+            return tx.upsert(record)
+
+    def replace_all(self, records):
+        with self._lock, file_lock(self.lock_path):
+            self._commit(list(records))
+
+
+class JournalStore(JsonStore):
+    """JsonStore that appends each change to ``<path>.journal`` instead of
+    rewriting the whole file.
+
+    ``path`` holds the last compacted snapshot and loading replays the journal
+    on top of it. Once the journal grows past the snapshot size (and at least
+    ``compact_min_bytes``) a background thread folds it back into the
+    snapshot, so compaction is amortized over the writes that caused it.
+    """
+
+    def __init__(self, path, key='id', compact_min_bytes=1 << 20):
+        super().__init__(path, key)
+        self.journal_path = path + '.journal'
+        self.compact_min_bytes = compact_min_bytes
+        self._journal_inode = None
+        self._journal_offset = 0
+        self._compacting = False
+
+    def _journal_signature(self):
+        try:
+            st = os.stat(self.journal_path)
+        except FileNotFoundError:
+            return None, 0
+        return st.st_ino, st.st_size
+
+    def _apply(self, entry):
+        record = entry.get('put')
+        if record is None:
+            return
+        record_id = record.get(self.key)
+        index = self._by_id.get(record_id)
+        if index is None:
+            self._by_id[record_id] = len(self._records)
+            self._records.append(record)
+        else:
+            self._records[index] = record
+        seq = record.get(SEQ_FIELD, 0)
+        self._seq_order[record_id] = seq
+        self._seq_order.move_to_end(record_id)
+        self._version = max(self._version, seq)
+        for index in self._indexes:
+            index.apply(record_id, record)
+
+    def _replay_journal(self):
+        inode, size = self._journal_signature()
+        if inode != self._journal_inode:
+            self._journal_inode, self._journal_offset = inode, 0
+        if inode is None or size <= self._journal_offset:
+            return
+        with LOAD_SECONDS.time(self.name):
+            with open(self.journal_path, 'rb') as f:
+                f.seek(self._journal_offset)
+                chunk = f.read(size - self._journal_offset)
+            # Only consume complete lines; a half-written tail is picked up next time
+            end = chunk.rfind(b'\n') + 1
+            for line in chunk[:end].splitlines():
+                if line.strip():
+                    self._apply(json.loads(line))
+        self._journal_offset += end
+
+    def _refresh(self):
+        signature = self._stat_signature()
+        journal_inode, journal_size = self._journal_signature()
+        if (signature == self._signature and journal_inode == self._journal_inode
+                and journal_size == self._journal_offset):
+            return
+        with file_lock(self.lock_path, exclusive=False):
+            self._catch_up()
+
+    def _catch_up(self):
+        """Reload the snapshot if it was replaced, then replay new journal lines.
+
+        Caller holds the lock file, so a compaction can't swap files midway.
+        """
+        signature = self._stat_signature()
+        if signature != self._signature or signature is None:
+            self._set_records(self._read_file(), signature)
+            self._journal_inode, self._journal_offset = None, 0
+        self._replay_journal()
+
+    def _write_changes(self, changes, deleted=()):
+        if deleted:
+            # Deletes are rare (archival), so they rewrite the snapshot rather
+            # than adding a journal entry type every reader has to replay
+            super()._write_changes(changes, deleted)
+            return
+        self._stamp(changes)
+        entries = [{'put': record} for record in changes.values()]
+        with SAVE_SECONDS.time(self.name), open(self.journal_path, 'a') as f:
+            f.write(''.join(json.dumps(e, separators=(',', ':')) + '\n' for e in entries))
+            f.flush()
+            os.fsync(f.fileno())
+        for entry in entries:
+            self._apply(entry)
+        self._journal_inode, self._journal_offset = self._journal_signature()
+        self._maybe_compact()
+
+    def _maybe_compact(self):
+        snapshot_size = self._signature[1] if self._signature else 0
+        if self._compacting or self._journal_offset < max(self.compact_min_bytes, snapshot_size):
+            return
+        self._compacting = True
+        threading.Thread(target=self.compact, daemon=True).start()
+
+    def _commit(self, records, changed=None, removed=()):
+        """Replace snapshot and journal; caller holds both locks."""
+        super()._commit(records, changed, removed)
+        # A fresh journal gets a new inode, which tells readers to start over
+        _write_atomic(self.journal_path, '')
+        self._journal_inode, self._journal_offset = self._journal_signature()
+
+    def compact(self):
+        """Fold the journal into the snapshot file."""
+        try:
+            with self._lock, file_lock(self.lock_path):
+                self._catch_up()
+                # Same records, so indexes need no rebuild
+                self._commit(list(self._records), changed=[])
+        except Exception as e:
+            print(f"⚠️ Journal compaction failed for {self.path}: {e}")
+        finally:
+            self._compacting = False
+
+
+class SqliteStore:
+    """Store backed by one table in an SQLite database.
+
+    Each record is kept as a JSON document next to copies of the fields listed
+    in ``SQLITE_INDEXES``, so ``get()`` and ``find()`` on those fields are
+    index lookups instead of list scans. Connections are per thread and run
+    in WAL mode, so readers in other workers aren't blocked by a writer.
+    Deleted ids are kept in ``<table>_deleted`` with the change sequence of
+    the delete, so other workers can drop them from their indexes.
+    """
+
+    def __init__(self, db_path, table, key='id'):
+        self.path = db_path
+        self.table = table
+        self.tombstones = f'{table}_deleted'
+        self.key = key
+        self.name = table
+        self.columns = SQLITE_INDEXES.get(table, ()) + (SEQ_FIELD,)
+        self._local = threading.local()
+        self._lock = threading.RLock()
+        self._indexes = []
+        self._index_seq = 0
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._create_schema(conn)
+            self._local.conn = conn
+        return conn
+
+    def _create_schema(self, conn):
+        columns = ''.join(f', "{c}"' for c in self.columns)
+        conn.execute(f'CREATE TABLE IF NOT EXISTS {self.table} '
+                     f'("{self.key}" PRIMARY KEY{columns}, data TEXT NOT NULL)')
+        existing = {row[1] for row in conn.execute(f'PRAGMA table_info({self.table})')}
+        for column in self.columns:
+            if column not in existing:
+                conn.execute(f'ALTER TABLE {self.table} ADD COLUMN "{column}"')
+            conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{self.table}_{column} '
+                         f'ON {self.table} ("{column}")')
+        conn.execute(f'CREATE TABLE IF NOT EXISTS {self.tombstones} '
+                     f'("{self.key}" PRIMARY KEY, "{SEQ_FIELD}" NOT NULL)')
+
+    def _write_rows(self, conn, records):
+        names = (self.key,) + self.columns
+        quoted = ', '.join(f'"{n}"' for n in names)
+        placeholders = ', '.join('?' * (len(names) + 1))
+        updates = ', '.join(f'"{n}" = excluded."{n}"' for n in names[1:] + ('data',))
+        # ON CONFLICT keeps the rowid, so updated records keep their position
+        with SAVE_SECONDS.time(self.name):
+            conn.executemany(
+                f'INSERT INTO {self.table} ({quoted}, data) VALUES ({placeholders}) '
+                f'ON CONFLICT("{self.key}") DO UPDATE SET {updates}',
+                [[r.get(n) for n in names] + [json.dumps(r)] for r in records])
+            conn.executemany(f'DELETE FROM {self.tombstones} WHERE "{self.key}" = ?',
+                             [(r.get(self.key),) for r in records])
+
+    def _delete_rows(self, conn, record_ids):
+        seq = self._max_seq(conn)
+        for record_id in record_ids:
+            if conn.execute(f'DELETE FROM {self.table} WHERE "{self.key}" = ?', (record_id,)).rowcount:
+                seq += 1
+                conn.execute(f'INSERT OR REPLACE INTO {self.tombstones} VALUES (?, ?)', (record_id, seq))
+
+    def _stamp(self, conn, records):
+        seq = self._max_seq(conn)
+        for record in records:
+            seq += 1
+            record[SEQ_FIELD] = seq
+
+    def _max_seq(self, conn):
+        return conn.execute(f'SELECT MAX((SELECT COALESCE(MAX("{SEQ_FIELD}"), 0) FROM {self.table}), '
+                            f'(SELECT COALESCE(MAX("{SEQ_FIELD}"), 0) FROM {self.tombstones}))').fetchone()[0]
+
+    def _select(self, where='', params=(), order='rowid'):
+        with LOAD_SECONDS.time(self.name):
+            rows = self._connect().execute(
+                f'SELECT data FROM {self.table} {where} ORDER BY {order}', params)
+            return [json.loads(data) for (data,) in rows]
+
+    def _get_copy(self, record_id):
+        records = self._select(f'WHERE "{self.key}" = ?', (record_id,))
+        return records[0] if records else None
+
+    @contextmanager
+    def _begin(self, mode='IMMEDIATE'):
+        conn = self._connect()
+        if conn.in_transaction:
+            # Reads made from inside transaction() join the open transaction
+            yield conn
+            return
+        conn.execute(f'BEGIN {mode}')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    # ---------------- public API ----------------
+    @contextmanager
+    def transaction(self):
+        with self._begin() as conn:
+            tx = SqliteTransaction(self)
+            yield tx
+            if tx.changes:
+                self._stamp(conn, tx.changes.values())
+                self._write_rows(conn, tx.changes.values())
+            if tx.deleted:
+                self._delete_rows(conn, tx.deleted)
+
+    def ensure_exists(self):
+        self._connect()
+
+    def all(self):
+        return self._select()
+
+    def get(self, record_id):
+        return self._get_copy(record_id)
+
+    def scan(self, batch_size=500):
+        """Iterate over the records a batch of rows per query, so a caller
+        streaming the table never holds all of it."""
+        last_rowid = 0
+        while True:
+            rows = self._connect().execute(
+                f'SELECT rowid, data FROM {self.table} WHERE rowid > ? ORDER BY rowid LIMIT ?',
+                (last_rowid, batch_size)).fetchall()
+            for _, data in rows:
+                yield json.loads(data)
+            if len(rows) < batch_size:
+                return
+            last_rowid = rows[-1][0]
+
+    def find(self, field, value):
+        if field == self.key or field in self.columns:
+            return self._select(f'WHERE "{field}" = ?', (value,))
+        return [r for r in self.all() if r.get(field) == value]
+
+    def count(self):
+        return self._connect().execute(f'SELECT COUNT(*) FROM {self.table}').fetchone()[0]
+
+    def version(self):
+        return self._max_seq(self._connect())
+
+    def changes_since(self, cursor):
+        # Read all three in one transaction so the cursor matches the rows returned
+        with self._begin('DEFERRED') as conn:
+            removed = [record_id for (record_id,) in conn.execute(
+                f'SELECT "{self.key}" FROM {self.tombstones} WHERE "{SEQ_FIELD}" > ? '
+                f'ORDER BY "{SEQ_FIELD}"', (cursor,))]
+            return (self.version(), self._select(f'WHERE "{SEQ_FIELD}" > ?', (cursor,), order=f'"{SEQ_FIELD}"'),
+                    removed)
+
+    def refresh(self):
+        """Feed rows changed by any connection since the last call to the indexes."""
+        if not self._indexes:
+            return
+        with self._lock:
+            cursor, changed, removed = self.changes_since(self._index_seq)
+            for record_id in removed:
+                for index in self._indexes:
+                    index.apply(record_id, None)
+            for record in changed:
+                for index in self._indexes:
+                    index.apply(record.get(self.key), record)
+            self._index_seq = cursor
+
+    def add_index(self, index):
+        with self._lock:
+            self.refresh()
+            with self._begin('DEFERRED'):
+                self._index_seq = self.version()
+                index.store = self
+                index.rebuild(self.all(), self.key)
+            self._indexes.append(index)
+        return index
+
+    def upsert(self, record):
+        with self._begin() as conn:
+            self._stamp(conn, [record])
+            self._write_rows(conn, [record])
+        return record
+
+    def replace_all(self, records):
+        with self._begin() as conn:
+            conn.execute(f'DELETE FROM {self.table}')
+            self._write_rows(conn, records)
+
+
+def open_store(path, key='id', backend=None):
+    """Create the store for ``path`` using the configured backend."""
+    backend = backend or STORAGE_BACKEND
+    if backend == 'journal':
+        return JournalStore(path, key)
+    if backend == 'sqlite':
+        table = os.path.splitext(os.path.basename(path))[0]
+        return SqliteStore(SQLITE_PATH, table, key)
+    return JsonStore(path, key)
+
+
+def normalize_legacy_project(project):
+    """Older submissions stored fullName/email instead of userName/userEmail."""
+    project = dict(project)
+    if 'userName' not in project and 'fullName' in project:
+        project['userName'] = project['fullName']
+    if 'userEmail' not in project and 'email' in project:
+        project['userEmail'] = project['email']
+    return project
+
+
+def _dedupe_ids(records, label):
+    """Keep the last record under a repeated id (what JsonStore.get returns) and
+    give earlier copies a numbered suffix so the primary key accepts them."""
+    last_index = {r.get('id'): i for i, r in enumerate(records)}
+    result, seen = [], {}
+    for i, record in enumerate(records):
+        record_id = record.get('id')
+        if last_index[record_id] != i:
+            seen[record_id] = seen.get(record_id, 0) + 1
+            record = dict(record, id=f"{record_id}-{seen[record_id]}")
+            print(f"⚠️ Duplicate {label} id {record_id} imported as {record['id']}")
+        result.append(record)
+    return result
+
+
+def migrate_json_to_sqlite(projects_file, users_file, db_path):
+    """One-shot import of the JSON data files into the SQLite backend."""
+    projects = [normalize_legacy_project(p) for p in JsonStore(projects_file).all()]
+    users = JsonStore(users_file).all()
+    SqliteStore(db_path, 'projects').replace_all(_dedupe_ids(projects, 'project'))
+    SqliteStore(db_path, 'users').replace_all(_dedupe_ids(users, 'user'))
+    print(f"📦 Imported {len(projects)} projects and {len(users)} users into {db_path}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Innovators United storage tools')
+    commands = parser.add_subparsers(dest='command', required=True)
+    migrate = commands.add_parser('migrate-sqlite', help='import projects.json/users.json into SQLite')
+    migrate.add_argument('--projects', default='projects.json')
+    migrate.add_argument('--users', default='users.json')
+    migrate.add_argument('--db', default=SQLITE_PATH)
+    args = parser.parse_args()
+    if args.command == 'migrate-sqlite':
+        migrate_json_to_sqlite(args.projects, args.users, args.db)
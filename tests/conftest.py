@@ -0,0 +1,108 @@
+import importlib.util
+import os
+import sys
+import uuid
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Modules shared by both deployables are identical copies, so the root ones
+# serve for both; archive.py, invoices.py etc. only exist in Innovators United
+IU_DIR = os.path.join(ROOT, 'Innovators United')
+sys.path.insert(0, ROOT)
+sys.path.append(IU_DIR)
+
+import storage  # noqa: E402
+
+
+@pytest.fixture(params=['json', 'journal', 'sqlite'])
+def backend(request):
+    return request.param
+
+
+@pytest.fixture
+def make_store(tmp_path, backend):
+    """Opens a fresh instance (as another worker would) of a store in ``tmp_path``."""
+    def make(name='projects'):
+        if backend == 'sqlite':
+            return storage.SqliteStore(str(tmp_path / 'innovators.db'), name)
+        return storage.open_store(str(tmp_path / f'{name}.json'), backend=backend)
+    return make
+
+
+@pytest.fixture
+def store(make_store):
+    store = make_store()
+    store.ensure_exists()
+    return store
+
+
+# Side directories of both apps, moved out of the working directory
+APP_DIRS = {'OUTBOX_DIR': 'outbox', 'EVENTS_FILE': 'events.log', 'UPLOAD_DIR': 'uploads',
+            'IDEMPOTENCY_DIR': 'idempotency', 'METRICS_DIR': 'metrics', 'ASSET_DIR': 'assets',
+            'PROFILE_DIR': 'profiles', 'INVOICE_DIR': 'invoices', 'ARCHIVE_DIR': 'archive'}
+
+
+def load_app(path, name, workdir):
+    """Import an app.py under ``name`` with its data files in ``workdir``."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.chdir(workdir)
+        for variable, location in APP_DIRS.items():
+            mp.setenv(variable, str(workdir / location))
+        # Nothing listens here, so queued emails stay in the outbox
+        mp.setenv('SMTP_SERVER', '127.0.0.1')
+        mp.setenv('SMTP_PORT', '9')
+        mp.setenv('SMTP_USE_TLS', '0')
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = sys.modules[name] = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    module.workdir = workdir
+    return module
+
+
+@pytest.fixture(scope='session')
+def iu_module(tmp_path_factory):
+    return load_app(os.path.join(IU_DIR, 'app.py'), 'iu_app', tmp_path_factory.mktemp('iu'))
+
+
+@pytest.fixture(scope='session')
+def root_module(tmp_path_factory):
+    return load_app(os.path.join(ROOT, 'app.py'), 'root_app', tmp_path_factory.mktemp('root'))
+
+
+@pytest.fixture
+def iu_app(iu_module, monkeypatch):
+    """The Innovators United app; its data files are relative to the working directory."""
+    monkeypatch.chdir(iu_module.workdir)
+    return iu_module
+
+
+@pytest.fixture
+def root_app(root_module, monkeypatch):
+    """The root app; its data files are relative to the working directory."""
+    monkeypatch.chdir(root_module.workdir)
+    return root_module
+
+
+def sign_up(app_module, name):
+    """A test client logged in as a new user called ``name``."""
+    username = 'u' + uuid.uuid4().hex[:12]
+    client = app_module.app.test_client()
+    client.post('/signup', data={'name': name, 'username': username, 'email': f'{username}@gmail.com',
+                                 'password': 'pw', 'phone': '1234567890'})
+    response = client.post('/login', data={'username': username, 'password': 'pw'})
+    assert response.status_code == 302
+    return client
+
+
+@pytest.fixture
+def user_client(iu_app):
+    """Signs up a new user of the Innovators United app and returns a test
+    client logged in as them."""
+    return lambda name='Test User': sign_up(iu_app, name)
+
+
+@pytest.fixture
+def root_user_client(root_app):
+    """Signs up a new user of the root app and returns a test client logged in as them."""
+    return lambda name='Test User': sign_up(root_app, name)
@@ -0,0 +1,18 @@
+def test_legacy_bill_is_not_served_without_an_owner(iu_app, user_client):
+    # Projects from before userId was recorded
+    iu_app.projects_store.upsert({'id': 'LEGACY0001', 'userName': 'Old Client', 'status': 'completed',
+                                  'billGenerated': True, 'totalCost': 11000})
+    anonymous = iu_app.app.test_client()
+    assert anonymous.get('/api/projects/LEGACY0001/invoice').status_code == 404
+    assert user_client().get('/api/projects/LEGACY0001/invoice').status_code == 404
+
+
+def test_attachments_are_only_served_to_their_owner(iu_app, user_client):
+    owner = user_client()
+    upload = owner.post('/api/uploads', json={'name': 'a.txt', 'size': 3}).get_json()
+    attachment = owner.put(f"/api/uploads/{upload['uploadId']}", data=b'abc',
+                           headers={'Upload-Offset': '0'}).get_json()['attachment']
+    url = f"/api/attachments/{attachment['id']}"
+    assert owner.get(url).data == b'abc'
+    assert user_client().get(url).status_code == 404
+    assert iu_app.app.test_client().get(url).status_code == 404
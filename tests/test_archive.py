@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from archive import ProjectArchive
+
+NOW = datetime(2026, 6, 15)
+
+
+def project(project_id, days_old, status='completed', full_paid=True):
+    return {'id': project_id, 'userId': 'u1', 'createdAt': (NOW - timedelta(days=days_old)).isoformat(),
+            'status': status, 'fullPaid': full_paid, 'totalCost': 11000, 'editPrefix': 'TESUSE1234'}
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return ProjectArchive(str(tmp_path / 'archive'))
+
+
+def test_only_old_finished_and_fully_paid_projects_move(store, archive):
+    with store.transaction() as tx:
+        tx.upsert(project('done', 120))
+        tx.upsert(project('delivered', 100, status='delivered'))
+        tx.upsert(project('unpaid', 120, full_paid=False))
+        tx.upsert(project('running', 120, status='in-progress'))
+        tx.upsert(project('recent', 10))
+    assert archive.archive(store, 90, now=NOW) == 2
+    assert {p['id'] for p in store.all()} == {'unpaid', 'running', 'recent'}
+    assert archive.get('done')['status'] == 'completed'
+    assert archive.get('delivered')['status'] == 'delivered'
+    assert archive.get('unpaid') is None
+
+
+def test_archived_projects_are_partitioned_by_month(store, archive):
+    with store.transaction() as tx:
+        tx.upsert(dict(project('feb', 0), createdAt='2026-02-03T10:00:00'))
+        tx.upsert(dict(project('mar-1', 0), createdAt='2026-03-01T10:00:00'))
+        tx.upsert(dict(project('mar-2', 0), createdAt='2026-03-20T10:00:00'))
+    assert archive.archive(store, 0, now=NOW) == 3
+    assert archive.partitions() == {'2026-03': 2, '2026-02': 1}
+    assert [p['id'] for p in archive.projects('2026-03')] == ['mar-2', 'mar-1']
+    assert archive.projects('2025-01') == []
+    assert {p['id'] for p in archive.scan()} == {'feb', 'mar-1', 'mar-2'}
+
+
+def test_index_keeps_the_fields_indexes_need(store, archive):
+    store.upsert(project('done', 120))
+    archive.archive(store, 90, now=NOW)
+    entry = archive.index.get('done')
+    assert entry['partition'] == (NOW - timedelta(days=120)).isoformat()[:7]
+    assert entry['userId'] == 'u1'
+    assert entry['editPrefix'] == 'TESUSE1234'
+
+
+def test_archiving_is_reported_as_removals(store, archive):
+    store.upsert(project('done', 120))
+    cursor = store.version()
+    archive.archive(store, 90, now=NOW)
+    assert store.changes_since(cursor)[2] == ['done']
+
+
+def test_nothing_to_archive(store, archive):
+    store.upsert(project('recent', 10))
+    assert archive.archive(store, 90, now=NOW) == 0
+    assert archive.partitions() == {}
+
+
+def test_archived_project_stays_reachable_through_the_api(iu_app, user_client):
+    client = user_client()
+    project_id = client.post('/api/projects', json={
+        'websiteType': 'normal', 'complexity': 'simple', 'websiteName': 'Site',
+        'description': 'a shop for cakes', 'deliveryOption': 'normal'}).get_json()['projectId']
+
+    admin = iu_app.app.test_client()
+    admin.post('/admin/login', data={'username': 'admin', 'password': 'ABPPS12345'})
+    admin.post(f'/api/projects/{project_id}/payment', json={'type': 'full'})
+    admin.put(f'/api/projects/{project_id}', json={'status': 'completed'})
+    response = admin.post('/api/projects/archive', json={'olderThanDays': 0})
+    assert response.get_json()['archived'] >= 1
+
+    assert iu_app.projects_store.get(project_id) is None
+    assert admin.get(f'/api/projects/{project_id}').get_json()['status'] == 'completed'
+    assert [p['id'] for p in client.get('/api/projects/user').get_json()] == [project_id]
+    assert admin.post('/api/projects/archive', json={'olderThanDays': -1}).status_code == 400
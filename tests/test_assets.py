@@ -0,0 +1,22 @@
+import gzip
+import os
+
+from assets import AssetManifest
+
+
+def test_build_without_static_files(tmp_path):
+    manifest = AssetManifest(str(tmp_path / 'static'), str(tmp_path / 'build')).build()
+    assert manifest.urls == {}
+    assert (tmp_path / 'build' / 'manifest.json').read_text() == '{}'
+
+
+def test_build_fingerprints_and_compresses(tmp_path):
+    (tmp_path / 'static' / 'js').mkdir(parents=True)
+    (tmp_path / 'static' / 'js' / 'admin.js').write_text('console.log("admin");\n' * 100)
+    manifest = AssetManifest(str(tmp_path / 'static'), str(tmp_path / 'build')).build()
+    fingerprinted = manifest.url_name('js/admin.js')
+    assert fingerprinted != 'js/admin.js' and fingerprinted.startswith('js/admin.')
+    asset = manifest.lookup(fingerprinted)
+    with open(asset.variants['gzip'], 'rb') as f:
+        assert gzip.decompress(f.read()) == (tmp_path / 'static' / 'js' / 'admin.js').read_bytes()
+    assert os.path.exists(asset.path)
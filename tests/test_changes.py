@@ -0,0 +1,59 @@
+def ids(records):
+    return [r['id'] for r in records]
+
+
+def test_changes_since_returns_newer_records_oldest_first(store):
+    store.upsert({'id': 'a'})
+    cursor = store.version()
+    store.upsert({'id': 'b'})
+    store.upsert({'id': 'a', 'edited': True})
+    new_cursor, changed, removed = store.changes_since(cursor)
+    assert ids(changed) == ['b', 'a']
+    assert changed[1]['edited'] is True
+    assert removed == []
+    assert new_cursor == store.version() > cursor
+    assert store.changes_since(new_cursor)[1:] == ([], [])
+
+
+def test_changes_since_reports_deletes(store):
+    store.upsert({'id': 'a'})
+    store.upsert({'id': 'b'})
+    cursor = store.version()
+    with store.transaction() as tx:
+        tx.delete('a')
+    new_cursor, changed, removed = store.changes_since(cursor)
+    assert changed == []
+    assert removed == ['a']
+    assert new_cursor > cursor
+    assert store.changes_since(new_cursor)[2] == []
+
+
+def test_delete_seen_by_another_instance(store, make_store):
+    store.upsert({'id': 'a'})
+    cursor = store.version()
+    with store.transaction() as tx:
+        tx.delete('a')
+    other = make_store()
+    assert other.changes_since(cursor)[2] == ['a']
+    assert other.version() == store.version()
+
+
+def test_version_never_goes_back_after_deleting_the_newest_record(store, make_store):
+    store.upsert({'id': 'a'})
+    store.upsert({'id': 'b'})
+    before = store.version()
+    with store.transaction() as tx:
+        tx.delete('b')
+    assert store.version() > before
+    assert make_store().version() == store.version()
+
+
+def test_recreated_id_is_only_reported_as_changed(store):
+    store.upsert({'id': 'a'})
+    cursor = store.version()
+    with store.transaction() as tx:
+        tx.delete('a')
+    store.upsert({'id': 'a', 'again': True})
+    _, changed, removed = store.changes_since(cursor)
+    assert ids(changed) == ['a']
+    assert removed == []
@@ -0,0 +1,97 @@
+from datetime import datetime
+
+import pytest
+
+from owners import ProjectOwners, edit_prefix_of
+from pricing import PricingEngine
+from storage import JsonStore
+
+RULES = {'baseCost': {'simple': 11000}, 'delivery': {'normal': {'charge': 0, 'days': 5}},
+         'defaultDelivery': {'charge': 0, 'days': 5}, 'advanceRate': 0.5, 'freeEdits': 2, 'editCharge': 5000}
+
+BODY = {'websiteType': 'normal', 'complexity': 'simple', 'websiteName': 'Site',
+        'description': 'a shop for cakes', 'deliveryOption': 'normal'}
+
+
+@pytest.mark.parametrize('edit_count, charges', [(0, 0), (1, 0), (2, 0), (3, 5000), (5, 15000)])
+def test_edits_past_the_free_ones_are_charged(edit_count, charges):
+    quote = PricingEngine(RULES).quote('normal', 'simple', 'normal', edit_count)
+    assert quote['editCharges'] == charges
+    assert quote['totalCost'] == 11000 + charges
+    assert quote['advanceAmount'] == (11000 + charges) / 2
+
+
+def test_edits_are_free_without_free_edits_rule():
+    rules = {k: v for k, v in RULES.items() if k != 'freeEdits'}
+    assert PricingEngine(rules).quote('normal', 'simple', 'normal', 10)['editCharges'] == 0
+
+
+def test_edit_prefix_falls_back_to_legacy_ids():
+    assert edit_prefix_of('0190f1c2a3b4', {'editPrefix': 'TESUSE1234'}) == 'TESUSE1234'
+    assert edit_prefix_of('TESUSE1234', {}) == 'TESUSE1234'
+
+
+def test_owner_index_counts_edit_prefixes(tmp_path):
+    path = str(tmp_path / 'projects.json')
+    with open(path, 'w') as f:
+        # Legacy projects used the prefix as their id, and some ids repeat
+        f.write('[{"id": "TESUSE1234"}, {"id": "TESUSE1234"}, {"id": "OTHERX1234"}]')
+    store = JsonStore(path)
+    owners = store.add_index(ProjectOwners())
+    assert owners.edit_count('TESUSE1234') == 2
+
+    store.upsert({'id': 'p1', 'userId': 'u1', 'editPrefix': 'TESUSE1234'})
+    store.upsert({'id': 'p1', 'userId': 'u1', 'editPrefix': 'TESUSE1234', 'status': 'completed'})
+    assert owners.edit_count('TESUSE1234') == 3  # editing a project isn't another edit
+    with store.transaction() as tx:
+        tx.delete('p1')
+    assert owners.edit_count('TESUSE1234') == 2
+    assert owners.edit_count('OTHERX1234') == 1
+    assert owners.edit_count('NOBODY1234') == 0
+
+
+@pytest.fixture
+def frozen_time(iu_app, monkeypatch):
+    """Every submission lands in the same second, so they share an edit prefix."""
+    now = datetime(2026, 3, 4, 5, 6, 7)
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return now
+
+    monkeypatch.setattr(iu_app, 'datetime', FrozenDatetime)
+    return now
+
+
+def test_submissions_in_the_same_second_are_charged_as_edits(iu_app, user_client, frozen_time):
+    client = user_client('Zed Quinn')
+    free_edits = iu_app.pricing.free_edits
+    edit_charge = iu_app.pricing.edit_charge
+    for n in range(free_edits + 2):
+        result = client.post('/api/projects', json=BODY).get_json()
+        assert result['editCount'] == n + 1
+        assert result['project']['editCharges'] == max(0, n - free_edits) * edit_charge
+        assert result['project']['editPrefix'] == f'ZEDQUI{str(int(frozen_time.timestamp()))[-4:]}'
+
+    quote = client.get('/api/quote?complexity=simple').get_json()
+    assert quote['editCharges'] == 2 * edit_charge
+    # Someone else submitting in the same second starts from zero
+    other = user_client('Amy Brook')
+    assert other.post('/api/projects', json=BODY).get_json()['project']['editCharges'] == 0
+
+
+def test_archived_projects_still_count_as_edits(iu_app, user_client, frozen_time):
+    client = user_client('Kim Vale')
+    for _ in range(iu_app.pricing.free_edits + 1):
+        project_id = client.post('/api/projects', json=BODY).get_json()['projectId']
+        with iu_app.projects_store.transaction() as tx:
+            project = tx.get(project_id)
+            project.update(status='completed', fullPaid=True)
+            tx.upsert(project)
+    assert iu_app.project_archive.archive(iu_app.projects_store, 0, now=datetime.now()) >= 1
+    assert client.get('/api/quote?complexity=simple').get_json()['editCharges'] == iu_app.pricing.edit_charge
+
+
+def test_anonymous_quote_has_no_edit_charges(iu_app):
+    assert iu_app.app.test_client().get('/api/quote?complexity=simple').get_json()['editCharges'] == 0
@@ -0,0 +1,90 @@
+import os
+import time
+
+import pytest
+
+from idempotency import IdempotencyError, IdempotencyStore
+
+BODY = {'websiteType': 'normal', 'complexity': 'simple', 'websiteName': 'Site',
+        'description': 'a shop for cakes', 'deliveryOption': 'normal'}
+
+
+@pytest.fixture
+def keys(tmp_path):
+    return IdempotencyStore(str(tmp_path / 'idempotency'), wait=0.2)
+
+
+def test_finished_response_is_replayed(keys):
+    claim = keys.begin('u1', 'k1', b'body')
+    assert claim.replay is None
+    claim.finish(200, 'application/json', '{"ok": true}')
+    assert keys.begin('u1', 'k1', b'body').replay == (200, 'application/json', '{"ok": true}')
+
+
+def test_keys_are_scoped_per_user(keys):
+    keys.begin('u1', 'k1', b'body').finish(200, 'application/json', '{}')
+    assert keys.begin('u2', 'k1', b'body').replay is None
+
+
+def test_key_reused_for_another_body_is_refused(keys):
+    keys.begin('u1', 'k1', b'body').finish(200, 'application/json', '{}')
+    with pytest.raises(IdempotencyError) as error:
+        keys.begin('u1', 'k1', b'other body')
+    assert error.value.status == 422
+
+
+def test_duplicate_of_a_request_in_flight_gets_409(keys):
+    keys.begin('u1', 'k1', b'body')
+    with pytest.raises(IdempotencyError) as error:
+        keys.begin('u1', 'k1', b'body')
+    assert error.value.status == 409
+
+
+def test_abandoned_claim_runs_again(keys):
+    keys.begin('u1', 'k1', b'body').abandon()
+    assert keys.begin('u1', 'k1', b'body').replay is None
+
+
+def test_expired_entries_run_again(keys):
+    claim = keys.begin('u1', 'k1', b'body')
+    claim.finish(200, 'application/json', '{}')
+    old = time.time() - keys.ttl - 60
+    os.utime(claim.path, (old, old))
+    assert keys.begin('u1', 'k1', b'body').replay is None
+
+
+def test_eviction_keeps_claims_in_flight(tmp_path):
+    keys = IdempotencyStore(str(tmp_path / 'idempotency'), max_entries=2, purge_interval=0, wait=0.2)
+    in_flight = keys.begin('u1', 'running', b'body')
+    for n in range(4):
+        keys.begin('u1', f'done-{n}', b'body').finish(200, 'application/json', '{}')
+        time.sleep(0.01)  # distinct mtimes, oldest first
+    keys.begin('u1', 'trigger', b'body')
+    assert os.path.exists(in_flight.path)
+    with pytest.raises(IdempotencyError) as error:
+        keys.begin('u1', 'running', b'body')
+    assert error.value.status == 409
+
+
+def test_retried_submission_is_replayed(iu_app, user_client):
+    client = user_client()
+    headers = {'Idempotency-Key': 'submit-1'}
+    count = iu_app.projects_store.count()
+    first = client.post('/api/projects', json=BODY, headers=headers)
+    retry = client.post('/api/projects', json=BODY, headers=headers)
+    assert first.status_code == retry.status_code == 200
+    assert retry.headers['Idempotent-Replayed'] == 'true'
+    assert retry.get_json()['projectId'] == first.get_json()['projectId']
+    assert iu_app.projects_store.count() == count + 1
+
+    changed = client.post('/api/projects', json=dict(BODY, websiteName='Other'), headers=headers)
+    assert changed.status_code == 422
+
+
+def test_failed_submission_is_not_replayed(iu_app, user_client):
+    client = user_client()
+    headers = {'Idempotency-Key': 'submit-1'}
+    assert client.post('/api/projects', json={'websiteType': 'normal'}, headers=headers).status_code == 400
+    response = client.post('/api/projects', json={'websiteType': 'normal'}, headers=headers)
+    assert response.status_code == 400
+    assert 'Idempotent-Replayed' not in response.headers
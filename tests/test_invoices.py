@@ -0,0 +1,17 @@
+from datetime import datetime
+
+
+def test_batch_includes_archived_bills(iu_app):
+    project = {'id': 'ARCHIVEDBILL1', 'userId': 'someone', 'userName': 'Old Client', 'websiteName': 'Site',
+               'status': 'completed', 'fullPaid': True, 'billGenerated': True, 'totalCost': 11000,
+               'createdAt': '2025-01-10T10:00:00', 'billDate': '2025-02-01T10:00:00'}
+    iu_app.projects_store.upsert(project)
+    iu_app.project_archive.archive(iu_app.projects_store, 30, now=datetime(2025, 6, 1))
+    assert iu_app.projects_store.get(project['id']) is None
+    iu_app.invoices.render(iu_app.find_project(project['id']), 'html')  # cached, so nothing is queued
+
+    admin = iu_app.app.test_client()
+    admin.post('/admin/login', data={'username': 'admin', 'password': 'ABPPS12345'})
+    for request in ({'projectIds': [project['id']]}, {'month': '2025-02'}):
+        results = admin.post('/api/invoices/batch', json=dict(request, format='html')).get_json()['invoices']
+        assert [(r['projectId'], r.get('ready')) for r in results] == [(project['id'], True)]
@@ -0,0 +1,51 @@
+import pytest
+
+from listing import ProjectListing
+from search import ProjectSearchIndex
+
+
+@pytest.fixture
+def listing(store):
+    search = store.add_index(ProjectSearchIndex())
+    listing = store.add_index(ProjectListing(search=search))
+    with store.transaction() as tx:
+        for n in range(30):
+            tx.upsert({'id': f'p{n:02d}', 'createdAt': f'2026-01-{n + 1:02d}',
+                       'websiteName': 'alpha shop' if n % 3 else 'beta shop',
+                       'status': 'completed' if n % 2 == 0 else 'pending',
+                       'paymentStatus': 'paid' if n < 5 else 'pending'})
+    return listing
+
+
+def ids(projects):
+    return [p['id'] for p in projects]
+
+
+def test_pages_walk_every_project_once(listing):
+    seen, cursor = [], None
+    while True:
+        projects, cursor = listing.page(limit=7, cursor=cursor)
+        seen.extend(ids(projects))
+        if cursor is None:
+            break
+    assert seen == [f'p{n:02d}' for n in reversed(range(30))]
+
+
+@pytest.mark.parametrize('filters', [
+    {'status': 'completed'},               # status list shorter than the matches
+    {'payment_status': 'paid'},            # payment list shortest
+    {'status': 'completed', 'payment_status': 'pending'},
+])
+def test_search_combines_with_other_filters(listing, filters):
+    projects, cursor = listing.page(q='alpha', descending=False, **filters)
+    expected = [f'p{n:02d}' for n in range(30) if n % 3
+                and (filters.get('status') is None or (n % 2 == 0) == (filters['status'] == 'completed'))
+                and (filters.get('payment_status') is None or (n < 5) == (filters['payment_status'] == 'paid'))]
+    assert ids(projects) == expected
+    assert cursor is None
+
+
+def test_search_narrower_than_status(listing):
+    projects, _ = listing.page(q='p06', status='completed')
+    assert ids(projects) == ['p06']
+    assert listing.page(q='p07', status='completed')[0] == []
@@ -0,0 +1,39 @@
+import pytest
+
+from pricing import PricingEngine
+
+RULES = {'baseCost': {'simple': 11000}, 'websiteTypeCost': {'ecommerce': 25000},
+         'delivery': {'1day': {'charge': 5500, 'days': 1}, 'normal': {'charge': 0, 'days': 5}},
+         'defaultDelivery': {'charge': 0, 'days': 5}, 'advanceRate': 0.5}
+
+
+def test_quote_prices_from_the_rules():
+    quote = PricingEngine(RULES).quote('normal', 'simple', '1day')
+    assert (quote['baseCost'], quote['deliveryCharges'], quote['deliveryDays']) == (11000, 5500, 1)
+    assert quote['totalCost'] == 16500
+    assert PricingEngine(RULES).quote('ecommerce', 'simple', 'normal')['baseCost'] == 25000
+
+
+def test_lenient_quotes_fall_back_to_defaults():
+    engine = PricingEngine(RULES)
+    assert engine.quote('normal', 'huge', 'normal')['baseCost'] == 0
+    quote = engine.quote('normal', 'simple', 'overnight')
+    assert (quote['deliveryCharges'], quote['deliveryDays']) == (0, 5)
+
+
+def test_strict_quotes_reject_unknown_options():
+    engine = PricingEngine(RULES)
+    with pytest.raises(ValueError, match='complexity'):
+        engine.quote('normal', 'huge', 'normal', strict=True)
+    with pytest.raises(ValueError, match='delivery option'):
+        engine.quote('normal', 'simple', 'overnight', strict=True)
+    with pytest.raises(ValueError, match='delivery option'):
+        engine.quote('ecommerce', 'simple', 'overnight', strict=True)
+
+
+def test_quote_api_rejects_unknown_delivery_options(iu_app):
+    client = iu_app.app.test_client()
+    response = client.get('/api/quote?complexity=simple&deliveryOption=overnight')
+    assert response.status_code == 400
+    assert 'delivery option' in response.get_json()['error']
+    assert client.get('/api/quote?complexity=simple&deliveryOption=1day').status_code == 200
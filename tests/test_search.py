@@ -0,0 +1,32 @@
+from search import ProjectSearchIndex
+
+
+def index_of(store, projects):
+    with store.transaction() as tx:
+        for project in projects:
+            tx.upsert(project)
+    return store.add_index(ProjectSearchIndex())
+
+
+def test_multi_term_results_match_every_term_best_first(store):
+    index = index_of(store, [
+        {'id': 'p1', 'websiteName': 'Alpha Bakery', 'userName': 'Ravi Shah'},
+        {'id': 'p2', 'websiteName': 'Alpha Shop', 'description': 'a bakery'},
+        {'id': 'p3', 'websiteName': 'Alpha Studio', 'description': 'bakeries nearby'},
+        {'id': 'p4', 'websiteName': 'Beta Bakery'},
+        {'id': 'p5', 'websiteName': 'Alphabet Bakery'},
+    ])
+    # Website name words weigh 3, descriptions 1; a partial word counts half
+    assert index.search('alpha bakery') == [('p1', 6.0), ('p5', 4.5), ('p2', 4.0)]
+    results = index.search('alpha bak')
+    assert dict(results) == {'p1': 4.5, 'p2': 3.5, 'p3': 3.5, 'p5': 3.0}
+    assert [score for _, score in results] == [4.5, 3.5, 3.5, 3.0]
+    assert index.match_ids('alpha bak') == {'p1', 'p2', 'p3', 'p5'}
+    assert index.match_ids('alpha zzz') == set()
+
+
+def test_multi_term_search_stops_at_limit(store):
+    index = index_of(store, [{'id': f'p{n}', 'websiteName': f'Alpha Shop {n}'} for n in range(50)])
+    results = index.search('alpha shop', limit=5)
+    assert len(results) == 5
+    assert {score for _, score in results} == {6.0}
@@ -0,0 +1,13 @@
+import os
+import runpy
+
+IU_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Innovators United')
+
+
+def test_pool_processes_importing_the_app_start_nothing(tmp_path, monkeypatch):
+    # What a spawn/forkserver child does when the app was started with `python app.py`
+    monkeypatch.chdir(tmp_path)
+    module = runpy.run_path(os.path.join(IU_DIR, 'app.py'), run_name='__mp_main__')
+    assert module['outbox']._thread is None
+    assert not os.path.exists('metrics')
+    assert not os.path.exists('assets')
@@ -0,0 +1,75 @@
+import threading
+
+import pytest
+
+
+def test_transaction_commits_on_exit(store):
+    with store.transaction() as tx:
+        tx.upsert({'id': 'a', 'name': 'first'})
+        tx.upsert({'id': 'b', 'name': 'second'})
+        assert tx.get('a')['name'] == 'first'
+        assert tx.count() == 2
+    assert store.get('a')['name'] == 'first'
+    assert {r['id'] for r in store.all()} == {'a', 'b'}
+
+
+def test_transaction_discards_changes_on_error(store):
+    store.upsert({'id': 'a', 'name': 'kept'})
+    with pytest.raises(RuntimeError):
+        with store.transaction() as tx:
+            tx.upsert({'id': 'a', 'name': 'lost'})
+            tx.upsert({'id': 'b', 'name': 'lost'})
+            tx.delete('a')
+            raise RuntimeError('abort')
+    assert store.get('a')['name'] == 'kept'
+    assert store.get('b') is None
+
+
+def test_transaction_sees_staged_changes(store):
+    store.upsert({'id': 'a', 'userId': 'u1'})
+    store.upsert({'id': 'b', 'userId': 'u1'})
+    with store.transaction() as tx:
+        tx.delete('a')
+        tx.upsert({'id': 'c', 'userId': 'u1'})
+        assert tx.get('a') is None
+        assert {r['id'] for r in tx.all()} == {'b', 'c'}
+        assert {r['id'] for r in tx.find('userId', 'u1')} == {'b', 'c'}
+        assert tx.count() == 2
+    assert {r['id'] for r in store.find('userId', 'u1')} == {'b', 'c'}
+
+
+def test_get_returns_a_copy(store):
+    store.upsert({'id': 'a', 'name': 'original'})
+    record = store.get('a')
+    record['name'] = 'edited'
+    assert store.get('a')['name'] == 'original'
+
+
+def test_other_instance_sees_commits(make_store):
+    writer = make_store()
+    reader = make_store()
+    writer.upsert({'id': 'a', 'name': 'first'})
+    assert reader.get('a')['name'] == 'first'
+    with writer.transaction() as tx:
+        tx.delete('a')
+    assert reader.get('a') is None
+    assert reader.count() == 0
+
+
+def test_concurrent_transactions_lose_no_updates(make_store):
+    make_store().upsert({'id': 'counter', 'value': 0})
+
+    def bump():
+        store = make_store()
+        for _ in range(20):
+            with store.transaction() as tx:
+                record = tx.get('counter')
+                record['value'] += 1
+                tx.upsert(record)
+
+    threads = [threading.Thread(target=bump) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert make_store().get('counter')['value'] == 80
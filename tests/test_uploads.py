@@ -0,0 +1,99 @@
+import hashlib
+import io
+import os
+import time
+
+import pytest
+
+from storage import JsonStore
+from uploads import UploadError, UploadStore
+
+DATA = b'0123456789' * 100
+
+
+@pytest.fixture
+def uploads(tmp_path):
+    return UploadStore(str(tmp_path / 'uploads'), JsonStore(str(tmp_path / 'attachments.json')), max_chunk=400)
+
+
+def send(uploads, upload_id, offset, data, owner='u1'):
+    return uploads.write_chunk(upload_id, owner, offset, io.BytesIO(data), len(data))
+
+
+def test_chunks_complete_into_a_blob(uploads):
+    upload_id = uploads.start('u1', 'site.zip', len(DATA))['uploadId']
+    for offset in range(0, len(DATA), 400):
+        status = send(uploads, upload_id, offset, DATA[offset:offset + 400])
+    assert status['complete'] is True
+    attachment = status['attachment']
+    assert attachment['sha256'] == hashlib.sha256(DATA).hexdigest()
+    record, path = uploads.attachment(attachment['id'])
+    assert record['name'] == 'site.zip'
+    with open(path, 'rb') as f:
+        assert f.read() == DATA
+
+
+def test_wrong_offset_is_refused_with_the_offset_to_resume_from(uploads):
+    upload_id = uploads.start('u1', 'site.zip', len(DATA))['uploadId']
+    send(uploads, upload_id, 0, DATA[:400])
+    with pytest.raises(UploadError) as error:
+        send(uploads, upload_id, 0, DATA[:400])  # the response to the first chunk was lost
+    assert error.value.status == 409
+    assert error.value.details == {'offset': 400}
+    assert uploads.status(upload_id, 'u1')['offset'] == 400
+
+
+def test_resume_after_dropped_connection(uploads):
+    upload_id = uploads.start('u1', 'site.zip', len(DATA))['uploadId']
+    # The client announced 400 bytes but went away after 150
+    uploads.write_chunk(upload_id, 'u1', 0, io.BytesIO(DATA[:150]), 400)
+    offset = uploads.status(upload_id, 'u1')['offset']
+    assert offset == 150
+    while offset < len(DATA):
+        status = send(uploads, upload_id, offset, DATA[offset:offset + 400])
+        offset = status['offset']
+    assert status['attachment']['sha256'] == hashlib.sha256(DATA).hexdigest()
+
+
+def test_same_content_is_stored_once(uploads, tmp_path):
+    attachments = []
+    for owner in ('u1', 'u2'):
+        upload_id = uploads.start(owner, 'a.txt', 400)['uploadId']
+        attachments.append(send(uploads, upload_id, 0, DATA[:400], owner)['attachment'])
+    assert attachments[0]['id'] != attachments[1]['id']
+    blobs = [name for _, _, names in os.walk(tmp_path / 'uploads' / 'blobs') for name in names]
+    assert blobs == [attachments[0]['sha256']]
+
+
+def test_other_users_cannot_see_an_upload(uploads):
+    upload_id = uploads.start('u1', 'site.zip', len(DATA))['uploadId']
+    with pytest.raises(UploadError) as error:
+        send(uploads, upload_id, 0, DATA[:400], owner='u2')
+    assert error.value.status == 404
+
+
+def test_stale_uploads_are_purged_whole(uploads, tmp_path):
+    upload_id = uploads.start('u1', 'site.zip', len(DATA))['uploadId']
+    send(uploads, upload_id, 0, DATA[:400])
+    partial = tmp_path / 'uploads' / 'partial'
+    old = time.time() - uploads.stale_after - 60
+    for path in partial.iterdir():
+        os.utime(path, (old, old))
+    uploads._next_purge = 0  # the first start() just ran it
+    uploads.start('u1', 'other.zip', 10)  # starting an upload runs the purge
+    assert not [p for p in partial.iterdir() if p.name.startswith(upload_id)]
+    with pytest.raises(UploadError) as error:
+        uploads.status(upload_id, 'u1')
+    assert error.value.status == 404
+
+
+def test_upload_api_returns_409_with_offset(user_client):
+    client = user_client()
+    upload_id = client.post('/api/uploads', json={'name': 'a.txt', 'size': 800}).get_json()['uploadId']
+    response = client.put(f'/api/uploads/{upload_id}', data=DATA[:400], headers={'Upload-Offset': '0'})
+    assert response.get_json()['offset'] == 400
+    response = client.put(f'/api/uploads/{upload_id}', data=DATA[:400], headers={'Upload-Offset': '0'})
+    assert response.status_code == 409
+    assert response.get_json()['offset'] == 400
+    response = client.put(f'/api/uploads/{upload_id}', data=DATA[400:800], headers={'Upload-Offset': '400'})
+    assert response.get_json()['complete'] is True
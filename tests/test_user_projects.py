@@ -0,0 +1,35 @@
+from owners import ProjectOwners
+
+
+def test_legacy_projects_are_matched_by_name_or_email(store):
+    owners = store.add_index(ProjectOwners())
+    with store.transaction() as tx:
+        tx.upsert({'id': 'new', 'userId': 'u1', 'userName': 'Ravi Shah', 'createdAt': '2026-02-01'})
+        tx.upsert({'id': 'by-name', 'userName': 'Ravi Shah', 'createdAt': '2025-01-01'})
+        tx.upsert({'id': 'by-email', 'userEmail': 'ravi@gmail.com', 'createdAt': '2025-02-01'})
+        tx.upsert({'id': 'oldest-format', 'fullName': 'Ravi Shah', 'email': 'x@gmail.com', 'createdAt': '2024-01-01'})
+        tx.upsert({'id': 'someone-else', 'userName': 'Ravi Shah', 'userId': 'u2', 'createdAt': '2025-03-01'})
+    assert owners.projects('u1')[1] == ['new']
+    version, ids = owners.projects('u1', 'Ravi Shah', 'ravi@gmail.com')
+    assert ids == ['oldest-format', 'by-name', 'by-email', 'new']
+
+    store.upsert({'id': 'by-name', 'userName': 'Ravi Shah', 'createdAt': '2025-01-01', 'status': 'completed'})
+    assert owners.version('u1', 'Ravi Shah', 'ravi@gmail.com') != version
+    store.upsert({'id': 'by-name', 'userName': 'Ravi Shah', 'userId': 'u3', 'createdAt': '2025-01-01'})
+    assert 'by-name' not in owners.projects('u1', 'Ravi Shah', 'ravi@gmail.com')[1]
+
+
+def test_dashboard_lists_projects_from_before_owner_ids(root_app, root_user_client):
+    client = root_user_client('Legacy Person')
+    with root_app.projects_store.transaction() as tx:
+        tx.upsert({'id': 'IUPLEGACY01', 'userName': 'Legacy Person', 'websiteName': 'Old Site',
+                   'createdAt': '2024-05-01T10:00:00', 'status': 'completed'})
+        tx.upsert({'id': 'IUPLEGACY02', 'userName': 'Somebody Else', 'createdAt': '2024-05-02T10:00:00'})
+    response = client.get('/api/projects/user')
+    assert [p['id'] for p in response.get_json()] == ['IUPLEGACY01']
+
+    etag = response.headers['ETag']
+    assert client.get('/api/projects/user', headers={'If-None-Match': etag}).status_code == 304
+    root_app.projects_store.upsert({'id': 'IUPLEGACY01', 'userName': 'Legacy Person', 'websiteName': 'Old Site',
+                                    'createdAt': '2024-05-01T10:00:00', 'status': 'delivered'})
+    assert client.get('/api/projects/user', headers={'If-None-Match': etag}).status_code == 200
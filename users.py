@@ -0,0 +1,52 @@
+"""Username and email lookups for login and signup.
+
+``UserDirectory`` is registered as an index on the users store, so login
+finds an account by username, and signup checks whether a username is taken
+and how many accounts share an email, with dict lookups instead of scanning
+every user.
+"""
+from storage import StoreIndex
+
+
+class UserDirectory(StoreIndex):
+    def reset(self):
+        self._by_username = {}  # username -> ids of accounts using it
+        self._by_email = {}     # email -> ids of accounts registered with it
+        self._filed = {}        # id -> (username, email) it's filed under
+
+    def _unfile(self, table, value, user_id):
+        ids = table.get(value)
+        if ids is not None:
+            ids.discard(user_id)
+            if not ids:
+                del table[value]
+
+    def apply(self, record_id, record):
+        old = self._filed.pop(record_id, None)
+        if old is not None:
+            self._unfile(self._by_username, old[0], record_id)
+            self._unfile(self._by_email, old[1], record_id)
+        if record is None:
+            return
+        username, email = record.get('username'), record.get('email')
+        self._filed[record_id] = (username, email)
+        self._by_username.setdefault(username, set()).add(record_id)
+        self._by_email.setdefault(email, set()).add(record_id)
+
+    def find_by_username(self, username):
+        """Accounts registered under ``username`` (normally at most one)."""
+        with self.synced():
+            return [self.store.get(user_id) for user_id in self._by_username.get(username, ())]
+
+    def authenticate(self, username, password):
+        """The account with this username and password, or None."""
+        return next((u for u in self.find_by_username(username) if u.get('password') == password), None)
+
+    def username_taken(self, username):
+        with self.synced():
+            return username in self._by_username
+
+    def email_count(self, email):
+        """How many accounts are registered with ``email``."""
+        with self.synced():
+            return len(self._by_email.get(email, ()))